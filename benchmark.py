@@ -0,0 +1,802 @@
+# Warehouse benchmark - synthetic load plus timed analytical queries
+
+import argparse
+import html
+import http.client
+import json
+import os
+import random
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from cricket_datawarehouse import CricketDataWarehouse
+from synthetic_data import generate_matches, generate_player_names
+
+
+# Fixed query set covering the star schema's common access patterns
+BENCH_QUERIES = {
+    "player_career_by_format": ("""
+        SELECT m.match_type_id, COUNT(*), SUM(b.runs), SUM(b.balls)
+        FROM fact_batting b JOIN fact_matches m ON m.match_id = b.match_id
+        WHERE b.player_id = ? GROUP BY m.match_type_id
+    """, (25,)),
+    "player_bowling_in_format": ("""
+        SELECT SUM(w.wickets), SUM(w.runs_conceded)
+        FROM fact_bowling w JOIN fact_matches m ON m.match_id = w.match_id
+        WHERE w.player_id = ? AND m.match_type_id = ?
+    """, (25, 2)),
+    "team_first_innings_runs": ("""
+        SELECT AVG(runs), MAX(runs) FROM (
+            SELECT match_id, SUM(runs) AS runs FROM fact_batting
+            WHERE team_id = ? AND innings_number = 1 GROUP BY match_id
+        )
+    """, (3,)),
+    "team_form": ("""
+        SELECT match_id, winner_id FROM fact_matches
+        WHERE team1_id = ? OR team2_id = ? ORDER BY match_id DESC LIMIT 10
+    """, (3, 3)),
+    "matches_in_date_range": ("""
+        SELECT COUNT(*), SUM(team1_runs) FROM fact_matches WHERE date_id BETWEEN ? AND ?
+    """, (20160101, 20161231)),
+    "team_runs_in_year": ("""
+        SELECT SUM(b.runs) FROM fact_matches m JOIN fact_batting b ON b.match_id = m.match_id
+        WHERE m.date_id BETWEEN ? AND ? AND b.team_id = ?
+    """, (20160101, 20161231, 3)),
+    "head_to_head": ("""
+        SELECT COUNT(*), SUM(winner_id = ?) FROM fact_matches
+        WHERE (team1_id = ? AND team2_id = ?) OR (team1_id = ? AND team2_id = ?)
+    """, (1, 1, 2, 2, 1)),
+    "venue_top_scorers": ("""
+        SELECT b.player_id, SUM(b.runs) AS runs
+        FROM fact_matches m JOIN fact_batting b ON b.match_id = m.match_id
+        WHERE m.venue_id = ? GROUP BY b.player_id ORDER BY runs DESC LIMIT 10
+    """, (4,)),
+    "top_run_scorers": ("""
+        SELECT player_id, SUM(runs) AS runs FROM fact_batting
+        GROUP BY player_id ORDER BY runs DESC LIMIT 20
+    """, ()),
+    "match_scorecard": ("""
+        SELECT * FROM fact_batting WHERE match_id = ? ORDER BY innings_number, batting_position
+    """, (500,)),
+    "match_over_by_over": ("""
+        SELECT over_number, SUM(runs_batter + runs_extras), SUM(is_wicket) FROM fact_deliveries
+        WHERE match_id = ? AND innings_number = ? GROUP BY over_number
+    """, (500, 1)),
+    "batter_vs_bowler": ("""
+        SELECT COUNT(*), SUM(runs_batter), SUM(is_wicket) FROM fact_deliveries
+        WHERE batter_id = ? AND bowler_id = ?
+    """, (25, 40)),
+}
+
+# Typed-so-far lookups the search index must answer in single-digit milliseconds
+SEARCH_TERMS = ["v", "vi", "vir", "virat", "ra", "rak", "virat ra", "kam", "eden", "mel", "india", "ind aus", "zz"]
+SEARCH_BUDGET_MS = 10
+
+# Every full-warehouse leaderboard, computed from the cached fact columns
+STATS_BUDGET_MS = 1000
+
+# Load test of the HTTP query service
+SERVICE_P99_BUDGET_MS = 50
+
+# Sharded queries attach the season files, but may not run more than this much slower
+# than on the single file; the floor keeps sub-millisecond queries from failing on noise
+SHARDS_SLOWDOWN_LIMIT = 2.0
+SHARDS_SLOWDOWN_FLOOR_MS = 1.0
+# Raw joins against the views read every season (SQLite cannot push a join key into a
+# UNION ALL view); they are only checked for rows, and the partition-wise method that
+# replaces each one is held to the limit instead
+SHARDS_VIEW_JOINS = {"venue_top_scorers": "venue_records"}
+
+# Peak traced memory: parsing one page of any kind, and loading a match file, whose
+# matches are all decoded before the first is written
+MEMORY_PARSE_BUDGET_MB = 4
+MEMORY_LOAD_BUDGET_MB = 4
+MEMORY_LOAD_BUDGET_KB_PER_MATCH = {False: 50, True: 600}  # without / with commentary
+
+# Only the browser-driving CLI subcommands may import these
+SCRAPING_MODULES = {"selenium", "bs4"}
+
+
+def build_warehouse(db_path, matches, workers=0, commentary=False):
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    warehouse = CricketDataWarehouse(db_path)
+    warehouse.create_schema()
+    cursor = warehouse.connect()
+
+    start = time.perf_counter()
+    loaded, _ = warehouse.load_matches(cursor, generate_matches(matches, commentary=commentary), "synthetic", workers)
+    elapsed = time.perf_counter() - start
+    return warehouse, {"matches": loaded, "seconds": round(elapsed, 3),
+                       "matches_per_sec": round(loaded / elapsed, 1) if elapsed else None}
+
+
+def time_queries(conn, repeat=5):
+    results = {}
+    for name, (sql, params) in BENCH_QUERIES.items():
+        plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            "median_ms": round(statistics.median(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "plan": plan
+        }
+    return results
+
+
+def time_stats(db_path, repeat=5):
+    # The fact columns are read once per warehouse version; each leaderboard is then
+    # recomputed from them with the per-version metric tables cleared
+    from stats import METRICS, StatsEngine
+
+    try:
+        engine = StatsEngine(db_path=db_path)
+    except ImportError as e:
+        return {"skipped": str(e)}
+    try:
+        start = time.perf_counter()
+        engine.refresh()
+        read_ms = (time.perf_counter() - start) * 1000
+
+        leaderboards = {}
+        for metric in METRICS:
+            timings = []
+            for _ in range(repeat):
+                engine._tables.clear()
+                start = time.perf_counter()
+                engine.leaderboard(metric)
+                timings.append((time.perf_counter() - start) * 1000)
+            leaderboards[metric] = round(statistics.median(timings), 3)
+    finally:
+        engine.close()
+    total_ms = sum(leaderboards.values())
+    return {"read_ms": round(read_ms, 1), "leaderboards_ms": leaderboards,
+            "total_ms": round(total_ms, 1), "ok": total_ms < STATS_BUDGET_MS}
+
+
+def print_report(report):
+    load = report["load"]
+    print("\n" + "=" * 60)
+    print("WAREHOUSE BENCHMARK")
+    print("=" * 60)
+    print(f"  Load: {load['matches']:,} matches in {load['seconds']}s ({load['matches_per_sec']}/s)")
+    if report["dropped_indexes"]:
+        print(f"  Dropped indexes: {', '.join(report['dropped_indexes'])}")
+    for name, result in report["queries"].items():
+        print(f"\n  {name:28}: {result['median_ms']:>9.3f} ms (max {result['max_ms']:.3f})")
+        for step in result["plan"]:
+            print(f"      {step}")
+    stats = report["stats"]
+    if "skipped" in stats:
+        print(f"\n  Stats engine skipped: {stats['skipped']}")
+    else:
+        print(f"\n  Stats engine column read: {stats['read_ms']} ms (once per warehouse version)")
+        print(f"  All leaderboards: {stats['total_ms']} ms ({'ok' if stats['ok'] else 'FAIL'}, "
+              f"budget {STATS_BUDGET_MS} ms)")
+        for metric, ms in stats["leaderboards_ms"].items():
+            print(f"  {metric:28}: {ms:>9.3f} ms")
+    print("=" * 60)
+
+
+def run_warehouse_benchmark(args):
+    warehouse, load = build_warehouse(args.db, args.matches, args.workers, args.commentary)
+    for index in args.drop_index:
+        warehouse.conn.execute(f"DROP INDEX IF EXISTS {index}")
+    warehouse.conn.execute("ANALYZE")
+    report = {
+        "load": load,
+        "dropped_indexes": args.drop_index,
+        "queries": time_queries(warehouse.conn, args.repeat),
+        "stats": time_stats(args.db, args.repeat)
+    }
+    warehouse.close()
+    return report
+
+
+def _parse_variant(text):
+    # "label:VAR=value,VAR=value" -> (label, {VAR: value})
+    label, _, assignments = text.partition(":")
+    env = dict(item.split("=", 1) for item in assignments.split(",") if "=" in item)
+    return label, env
+
+
+def run_e2e_benchmark(args):
+    from mock_server import MockCricbuzzServer
+
+    server = MockCricbuzzServer(port=0, matches=args.matches, latency=args.latency,
+                                jitter=args.jitter, fail_rate=args.fail_rate,
+                                fail_mode=args.fail_mode).start()
+    repo_dir = Path(__file__).resolve().parent
+    results = []
+    try:
+        for label, variant_env in (args.variant or [("default", {})]):
+            output = repo_dir / f"bench_{label}.json"
+            env = dict(os.environ,
+                       CRICBUZZ_RECENT_URL=server.recent_url,
+                       CRICBUZZ_OUTPUT_FILE=str(output),
+                       CRICBUZZ_HEADLESS="1",
+                       CRICBUZZ_WAIT_TIME=str(args.wait_time),
+                       **variant_env)
+            requests_before = server.requests
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "main.py"], cwd=repo_dir, env=env,
+                           stdout=subprocess.DEVNULL if args.quiet else None, check=False)
+            elapsed = time.perf_counter() - start
+
+            scraped = 0
+            if output.exists():
+                with open(output, encoding="utf-8") as f:
+                    scraped = len(json.load(f))
+                output.unlink()
+            results.append({
+                "variant": label,
+                "env": variant_env,
+                "matches": scraped,
+                "seconds": round(elapsed, 2),
+                "matches_per_minute": round(60 * scraped / elapsed, 2) if elapsed else None,
+                "requests": server.requests - requests_before
+            })
+    finally:
+        server.stop()
+
+    print("\n" + "=" * 60)
+    print("END-TO-END BENCHMARK (mock server)")
+    print("=" * 60)
+    print(f"  latency={args.latency}s jitter={args.jitter}s fail_rate={args.fail_rate} ({args.fail_mode})")
+    for r in results:
+        print(f"  {r['variant']:20}: {r['matches']:>4} matches in {r['seconds']:>8}s "
+              f"= {r['matches_per_minute']} /min ({r['requests']} requests)")
+    print("=" * 60)
+    return {"e2e": results}
+
+
+def _time_command(cmd, cwd, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _imported_packages(cmd, cwd):
+    # Top-level packages a command imports, read from -X importtime
+    result = subprocess.run([sys.executable, "-X", "importtime", *cmd[1:]], cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return {line.rsplit("|", 1)[1].strip().split(".")[0]
+            for line in result.stderr.splitlines() if line.startswith("import time:")}
+
+
+def run_startup_benchmark(args):
+    # Guards the lazy imports in cli.py: warehouse commands must not load the scraping stack
+    if not os.path.exists(args.db):
+        build_warehouse(args.db, args.matches)[0].close()
+    else:
+        # query refuses a warehouse from an older version; upgrading it is quicker than a rebuild
+        warehouse = CricketDataWarehouse(args.db)
+        try:
+            warehouse.create_schema()
+        finally:
+            warehouse.close()
+    repo_dir = Path(__file__).resolve().parent
+    interpreter = _time_command([sys.executable, "-c", "pass"], repo_dir, args.repeat)
+
+    results = []
+    for name, cli_args in (("summary", ["summary", "--db", args.db]),
+                           ("query", ["query", "--db", args.db, "player", "Player 1"])):
+        cmd = [sys.executable, "-m", "cli", *cli_args]
+        overhead_ms = (_time_command(cmd, repo_dir, args.repeat) - interpreter) * 1000
+        scraping = sorted(_imported_packages(cmd, repo_dir) & SCRAPING_MODULES)
+        results.append({
+            "command": name,
+            "overhead_ms": round(overhead_ms, 1),
+            "scraping_imports": scraping,
+            "ok": overhead_ms <= args.budget_ms and not scraping
+        })
+
+    print("\n" + "=" * 60)
+    print("CLI STARTUP BENCHMARK")
+    print("=" * 60)
+    print(f"  Interpreter startup: {interpreter * 1000:.1f} ms (subtracted), budget {args.budget_ms} ms")
+    for r in results:
+        note = f"imports {', '.join(r['scraping_imports'])}" if r["scraping_imports"] else ""
+        print(f"  {r['command']:20}: {r['overhead_ms']:>7.1f} ms  {'ok' if r['ok'] else 'FAIL'} {note}")
+    print("=" * 60)
+    return {"interpreter_ms": round(interpreter * 1000, 1), "budget_ms": args.budget_ms, "startup": results}
+
+
+def run_search_benchmark(args):
+    # Grows the player dimension with made-up names, then times autocomplete lookups
+    from warehouse_queries import WarehouseQueries
+
+    warehouse, load = build_warehouse(args.db, args.matches)
+    cursor = warehouse.conn.cursor()
+    start = time.perf_counter()
+    for name in generate_player_names(args.players):
+        warehouse.get_or_create_player(cursor, name)
+    warehouse.conn.commit()
+    insert_seconds = time.perf_counter() - start
+    players = cursor.execute("SELECT COUNT(*) FROM dim_players").fetchone()[0]
+    warehouse.close()
+
+    # The result cache would answer repeats, so every run goes to the index
+    queries = WarehouseQueries(db_path=args.db, cache_size=0)
+    results = []
+    try:
+        for term in SEARCH_TERMS:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                hits = queries.search(term, limit=args.limit)
+                timings.append((time.perf_counter() - start) * 1000)
+            median_ms = statistics.median(timings)
+            results.append({"term": term, "hits": len(hits), "median_ms": round(median_ms, 3),
+                            "max_ms": round(max(timings), 3), "ok": median_ms < SEARCH_BUDGET_MS})
+    finally:
+        queries.close()
+
+    print("\n" + "=" * 60)
+    print("SEARCH BENCHMARK")
+    print("=" * 60)
+    print(f"  {players:,} players, {load['matches']:,} matches; "
+          f"indexed {args.players:,} extra players in {insert_seconds:.2f}s")
+    for r in results:
+        print(f"  {r['term']!r:14}: {r['median_ms']:>7.3f} ms (max {r['max_ms']:.3f}), "
+              f"{r['hits']:>2} hits  {'ok' if r['ok'] else 'FAIL'}")
+    print("=" * 60)
+    return {"players": players, "budget_ms": SEARCH_BUDGET_MS, "search": results}
+
+
+def run_interchange_benchmark(args):
+    # Indented JSON against .msgpack records on the same synthetic matches
+    from interchange import msgpack, read_matches, untyped, write_matches
+
+    matches = list(generate_matches(args.matches, commentary=args.commentary))
+    formats = [("json", ".json")] + ([("msgpack", ".msgpack")] if msgpack else [])
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, suffix in formats:
+            path = Path(tmp) / f"matches{suffix}"
+            encode, decode = [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                write_matches(path, matches)
+                encode.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                loaded = read_matches(path)
+                decode.append(time.perf_counter() - start)
+            # Every format must give back the scraper's strings exactly
+            same = [untyped(match) for match in loaded] == matches
+            results.append({"format": name, "bytes": path.stat().st_size,
+                            "encode_s": round(statistics.median(encode), 3),
+                            "decode_s": round(statistics.median(decode), 3), "ok": same})
+
+    print("\n" + "=" * 60)
+    print("INTERCHANGE BENCHMARK")
+    print("=" * 60)
+    print(f"  {args.matches:,} matches{' with commentary' if args.commentary else ''}")
+    if not msgpack:
+        print("  msgpack not installed, JSON only")
+    baseline = results[0]
+    for r in results:
+        print(f"  {r['format']:8}: {r['bytes'] / 1e6:>8.2f} MB ({r['bytes'] / baseline['bytes']:.0%}), "
+              f"encode {r['encode_s']:.3f}s, decode {r['decode_s']:.3f}s  "
+              f"{'ok' if r['ok'] else 'FAIL round trip'}")
+    print("=" * 60)
+    return {"matches": args.matches, "interchange": results}
+
+
+def _service_paths(conn, count, seed=0):
+    # A fixed population of distinct requests over the warehouse's ids
+    rng = random.Random(seed)
+    ids = {table: conn.execute(f"SELECT MAX({key}) FROM {table}").fetchone()[0] or 1
+           for table, key in (("fact_matches", "match_id"), ("dim_players", "player_id"),
+                              ("dim_teams", "team_id"), ("dim_venues", "venue_id"))}
+    makers = [
+        lambda: f"/matches/{rng.randint(1, ids['fact_matches'])}",
+        lambda: f"/players/{rng.randint(1, ids['dim_players'])}",
+        lambda: f"/teams/{rng.randint(1, ids['dim_teams'])}",
+        lambda: f"/teams/{rng.randint(1, ids['dim_teams'])}/h2h/{rng.randint(1, ids['dim_teams'])}",
+        lambda: f"/venues/{rng.randint(1, ids['dim_venues'])}",
+        lambda: f"/search?q={rng.choice(SEARCH_TERMS).replace(' ', '+')}",
+        lambda: f"/leaders/{rng.choice(('runs', 'wickets', 'strike_rate', 'economy'))}"
+    ]
+    paths = set()
+    while len(paths) < count:
+        paths.add(rng.choice(makers)())
+    return sorted(paths)
+
+
+def _drive_service(port, paths, clients, conditional, seed=0):
+    # Each client keeps one connection open and remembers the ETag of every path it saw;
+    # returns per-request latencies in ms and the status counts
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+
+    def client(worker):
+        rng = random.Random(seed * 1000 + worker)
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        etags, mine, counts = {}, [], {}
+        for path in paths[worker::clients]:
+            headers = {"If-None-Match": etags[path]} if path in etags and rng.random() < conditional else {}
+            start = time.perf_counter()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            mine.append((time.perf_counter() - start) * 1000)
+            etags[path] = response.getheader("ETag")
+            counts[response.status] = counts.get(response.status, 0) + 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            for status, n in counts.items():
+                statuses[status] = statuses.get(status, 0) + n
+
+    threads = [threading.Thread(target=client, args=(worker,)) for worker in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    p50, p99 = (statistics.quantiles(latencies, n=100)[i] for i in (49, 98))
+    return {"requests": len(latencies), "seconds": round(elapsed, 3),
+            "requests_per_sec": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(p50, 3), "p99_ms": round(p99, 3), "statuses": statuses}
+
+
+def run_service_benchmark(args):
+    # Cold pass over every distinct request, then a random mix that revisits them
+    from query_service import QueryService
+
+    warehouse, load = build_warehouse(args.db, args.matches)
+    paths = _service_paths(warehouse.conn, args.paths)
+    warehouse.close()
+
+    service = QueryService(args.db, port=0).start()
+    try:
+        cold = _drive_service(service.port, paths, args.clients, 0.0)
+        rng = random.Random(1)
+        mixed = [rng.choice(paths) for _ in range(args.requests)]
+        warm = _drive_service(service.port, mixed, args.clients, args.conditional)
+    finally:
+        service.stop()
+    for phase in (cold, warm):
+        phase["ok"] = phase["p99_ms"] < SERVICE_P99_BUDGET_MS and not set(phase["statuses"]) - {200, 304, 404}
+
+    print("\n" + "=" * 60)
+    print("QUERY SERVICE LOAD TEST")
+    print("=" * 60)
+    print(f"  {load['matches']:,} matches, {len(paths):,} distinct requests, {args.clients} clients, "
+          f"{args.conditional:.0%} conditional")
+    for name, phase in (("cold", cold), ("mixed", warm)):
+        statuses = ", ".join(f"{status}: {n}" for status, n in sorted(phase["statuses"].items()))
+        print(f"  {name:6}: {phase['requests']:>6} requests, {phase['requests_per_sec']:>8.1f} req/s, "
+              f"p50 {phase['p50_ms']:.2f} ms, p99 {phase['p99_ms']:.2f} ms ({statuses})  "
+              f"{'ok' if phase['ok'] else 'FAIL'}")
+    print(f"  p99 budget: {SERVICE_P99_BUDGET_MS} ms")
+    print("=" * 60)
+    return {"matches": load["matches"], "budget_ms": SERVICE_P99_BUDGET_MS, "service": [cold, warm]}
+
+
+def _timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, round(statistics.median(timings), 3)
+
+
+def _query_snapshot(db_path, repeat):
+    # BENCH_QUERIES through a pooled connection, which sees closed seasons through its views
+    from warehouse_queries import WarehouseQueries
+
+    queries = WarehouseQueries(db_path=db_path, cache_size=0)
+    queries.check_version()
+    results, timings = {}, {}
+    try:
+        with queries.pool.connection() as conn:
+            for name, (sql, params) in BENCH_QUERIES.items():
+                rows, timings[name] = _timed(lambda: conn.execute(sql, params).fetchall(), repeat)
+                results[name] = sorted(tuple(row) for row in rows)
+        # One season year of run scorers, read with and without partition pruning
+        pruned, timings["top_batters_one_year"] = _timed(
+            lambda: queries.top_batters_between("2016-05-01", "2017-04-30"), repeat)
+        results["top_batters_one_year"] = pruned
+        venue, timings["venue_records"] = _timed(lambda: queries.venue_records(4, top_n=10), repeat)
+        results["venue_records"] = venue
+    finally:
+        queries.close()
+    return results, timings
+
+
+def run_shards_benchmark(args):
+    # Whole-file maintenance and query times before and after closing seasons; every
+    # query must return the same rows from the sharded warehouse, within the slowdown limit
+    warehouse, load = build_warehouse(args.db, args.matches, commentary=args.commentary)
+    warehouse.close()
+    db_path = Path(args.db)
+    for stale in db_path.parent.glob(f"{db_path.stem}_*{db_path.suffix}"):
+        os.chmod(stale, 0o644)
+        stale.unlink()
+
+    def vacuum(path):
+        conn = sqlite3.connect(path)
+        conn.execute("VACUUM")
+        conn.close()
+
+    before, before_ms = _query_snapshot(args.db, args.repeat)
+    _, vacuum_before = _timed(lambda: vacuum(args.db), 1)
+    size_before = db_path.stat().st_size
+
+    warehouse = CricketDataWarehouse(args.db)
+    start = time.perf_counter()
+    shards = warehouse.close_seasons(args.keep, args.span)
+    close_seconds = time.perf_counter() - start
+    warehouse.close()
+    _, vacuum_after = _timed(lambda: vacuum(args.db), 1)
+    after, after_ms = _query_snapshot(args.db, args.repeat)
+
+    results = []
+    for name in before:
+        same_rows = before[name] == after[name]
+        budget_ms = None if name in SHARDS_VIEW_JOINS else before_ms[name] * args.slowdown_limit + SHARDS_SLOWDOWN_FLOOR_MS
+        results.append({"query": name, "before_ms": before_ms[name], "after_ms": after_ms[name],
+                        "budget_ms": budget_ms, "same_rows": same_rows,
+                        "ok": same_rows and (budget_ms is None or after_ms[name] <= budget_ms)})
+    print("\n" + "=" * 60)
+    print("SEASON SHARDS BENCHMARK")
+    print("=" * 60)
+    print(f"  {load['matches']:,} matches; closed {len(shards)} season files in {close_seconds:.2f}s, "
+          f"{sum(s['bytes'] for s in shards) / 1e6:.1f} MB")
+    print(f"  Main file: {size_before / 1e6:.1f} MB -> {db_path.stat().st_size / 1e6:.1f} MB, "
+          f"VACUUM {vacuum_before:.0f} ms -> {vacuum_after:.0f} ms")
+    for r in results:
+        if not r["same_rows"]:
+            verdict = "FAIL rows differ"
+        elif not r["ok"]:
+            verdict = f"FAIL over {r['budget_ms']:.3f} ms"
+        elif r["budget_ms"] is None:
+            verdict = f"ok (view join, see {SHARDS_VIEW_JOINS[r['query']]})"
+        else:
+            verdict = "ok"
+        print(f"  {r['query']:28}: {r['before_ms']:>9.3f} ms -> {r['after_ms']:>9.3f} ms  {verdict}")
+    print("=" * 60)
+    return {"matches": load["matches"], "shard_files": shards, "vacuum_ms": [vacuum_before, vacuum_after],
+            "shards": results}
+
+
+class _PageDriver:
+    # Just enough WebDriver for the extractors to read one rendered mock page
+
+    def __init__(self, page_source):
+        self.page_source = page_source
+
+    def find_element(self, by, tag):
+        if tag == "h1":
+            match = re.search(r"<h1>(.*?)</h1>", self.page_source)
+            if match is None:
+                raise LookupError("no h1")
+            return _Element(html.unescape(match.group(1)))
+        return _Element("\n".join(_page_lines(self.page_source)))
+
+
+class _Element:
+
+    def __init__(self, text):
+        self.text = text
+
+
+def _page_lines(page_source):
+    # body.text of a mock page: every element's text on its own line
+    return [line.strip() for line in html.unescape(re.sub(r"<[^>]+>", "\n", page_source)).split("\n")
+            if line.strip()]
+
+
+def _traced_peak(fn, *args):
+    # (peak, retained) bytes above what was allocated when fn started
+    start = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    result = fn(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    return peak - start, current - start, result
+
+
+def _parse_page(section, page_source, match_data):
+    # Every extractor of one page; the arguments are passed in rather than closed
+    # over, so deleting them afterwards really releases the match
+    from scraper import EXTRACTOR_RUNNERS, SECTION_EXTRACTORS
+
+    driver = _PageDriver(page_source)
+    lines = _page_lines(page_source)
+    for name in SECTION_EXTRACTORS[section]:
+        EXTRACTOR_RUNNERS[name](driver, lines, match_data)
+
+
+def run_memory_benchmark(args):
+    # Peak memory of the extractors over rendered mock pages, one match at a time,
+    # and of loading a synthetic match file; each is held to a budget
+    from extractors import create_empty_match_data
+    from interchange import write_matches
+    from mock_server import RENDERERS
+    from scraper import SECTIONS
+    from synthetic_data import synthetic_match
+
+    sections = SECTIONS + (["commentary"] if args.commentary and "commentary" not in SECTIONS else [])
+    parse = {section: {"peak": 0, "retained": 0} for section in sections}
+    tracemalloc.start()
+    try:
+        parse_start = tracemalloc.get_traced_memory()[0]
+        for match_no in range(args.pages):
+            match = synthetic_match(match_no)
+            match_data = create_empty_match_data(match["match_url"])
+            for section in sections:
+                page_source = RENDERERS[section](match)
+                peak, retained, _ = _traced_peak(_parse_page, section, page_source, match_data)
+                parse[section]["peak"] = max(parse[section]["peak"], peak)
+                parse[section]["retained"] += retained
+            del match, match_data, page_source
+        # Whatever survives every match is a leak, e.g. an unbounded cache
+        parse_leak = tracemalloc.get_traced_memory()[0] - parse_start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = Path(tmp) / "matches.json"
+            write_matches(json_path, list(generate_matches(args.matches, commentary=args.commentary)))
+            json_bytes = json_path.stat().st_size
+
+            def load():
+                warehouse = CricketDataWarehouse(str(Path(tmp) / "warehouse.db"))
+                try:
+                    warehouse.create_schema()
+                    warehouse.load_json_data(json_path)
+                finally:
+                    warehouse.close()
+
+            load_peak, _, _ = _traced_peak(load)
+    finally:
+        tracemalloc.stop()
+
+    from memory_profile import peak_rss_bytes
+
+    mb = 1024 * 1024
+    load_budget = MEMORY_LOAD_BUDGET_MB + args.matches * MEMORY_LOAD_BUDGET_KB_PER_MATCH[args.commentary] / 1024
+    # retained_kb: allocated after a page was parsed, per page; BeautifulSoup trees are
+    # reference cycles, so it includes trees the cycle collector has not freed yet
+    results = [{"phase": f"parse[{section}]", "count": args.pages, "peak_mb": round(p["peak"] / mb, 3),
+                "retained_kb": round(p["retained"] / 1024 / max(args.pages, 1), 1),
+                "budget_mb": MEMORY_PARSE_BUDGET_MB, "ok": p["peak"] / mb < MEMORY_PARSE_BUDGET_MB}
+               for section, p in parse.items()]
+    results.append({"phase": "parse leak", "count": args.pages, "peak_mb": None,
+                    "retained_kb": round(parse_leak / 1024, 1), "budget_mb": MEMORY_PARSE_BUDGET_MB,
+                    "ok": parse_leak / mb < MEMORY_PARSE_BUDGET_MB})
+    results.append({"phase": "load", "count": args.matches, "peak_mb": round(load_peak / mb, 3),
+                    "retained_kb": None, "budget_mb": round(load_budget, 1), "ok": load_peak / mb < load_budget})
+    rss = peak_rss_bytes()
+
+    print("\n" + "=" * 60)
+    print("MEMORY BENCHMARK")
+    print("=" * 60)
+    print(f"  {args.pages:,} matches' pages parsed, {args.matches:,} matches loaded "
+          f"({json_bytes / 1e6:.1f} MB JSON{', with commentary' if args.commentary else ''})")
+    for r in results:
+        if r["phase"] == "parse leak":
+            size = f"{r['retained_kb']:>8.1f} KB still allocated after every match"
+        else:
+            size = f"peak {r['peak_mb']:>8.3f} MB"
+            size += f", {r['retained_kb']:>7.1f} KB left per page" if r["retained_kb"] is not None else ""
+        print(f"  {r['phase']:18}: {size} (budget {r['budget_mb']} MB)  {'ok' if r['ok'] else 'FAIL'}")
+    print(f"  Process peak RSS: {rss / mb:.1f} MB" if rss is not None else "  Process peak RSS: unknown")
+    print("=" * 60)
+    return {"pages": args.pages, "matches": args.matches, "json_bytes": json_bytes,
+            "peak_rss_mb": round(rss / mb, 1) if rss is not None else None, "memory": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scraper and warehouse")
+    sub = parser.add_subparsers(dest="suite", required=True)
+
+    wh = sub.add_parser("warehouse", help="synthetic load and analytical query timings")
+    wh.add_argument("--matches", type=int, default=10000, help="synthetic matches to generate")
+    wh.add_argument("--db", default="bench_warehouse.db", help="scratch database path")
+    wh.add_argument("--workers", type=int, default=0, help="transform worker processes")
+    wh.add_argument("--repeat", type=int, default=5, help="runs per query")
+    wh.add_argument("--drop-index", action="append", default=[], help="index to drop before timing")
+    wh.add_argument("--commentary", action="store_true", help="also load ball-by-ball deliveries")
+
+    e2e = sub.add_parser("e2e", help="full main.main run against the local mock server")
+    e2e.add_argument("--matches", type=int, default=10, help="matches listed on the mock recent page")
+    e2e.add_argument("--latency", type=float, default=0.05, help="mock response latency in seconds")
+    e2e.add_argument("--jitter", type=float, default=0.0)
+    e2e.add_argument("--fail-rate", type=float, default=0.0)
+    e2e.add_argument("--fail-mode", choices=("error", "hang", "drop"), default="error")
+    e2e.add_argument("--wait-time", type=float, default=0.5, help="CRICBUZZ_WAIT_TIME for the scraper")
+    e2e.add_argument("--variant", action="append", type=_parse_variant,
+                     help="pipeline configuration as label:VAR=value,VAR=value (repeatable)")
+    e2e.add_argument("--quiet", action="store_true", help="hide scraper output")
+
+    startup = sub.add_parser("startup", help="CLI start-up time of the warehouse commands")
+    startup.add_argument("--db", default="bench_warehouse.db", help="warehouse to query, built if missing")
+    startup.add_argument("--matches", type=int, default=200, help="synthetic matches if the warehouse is built")
+    startup.add_argument("--repeat", type=int, default=5, help="runs per command")
+    startup.add_argument("--budget-ms", type=float, default=60, help="allowed time over bare interpreter start-up")
+
+    search = sub.add_parser("search", help="autocomplete lookups against a large player dimension")
+    search.add_argument("--db", default="bench_search.db", help="scratch database path")
+    search.add_argument("--matches", type=int, default=2000, help="synthetic matches to generate")
+    search.add_argument("--players", type=int, default=50000, help="extra made-up players to index")
+    search.add_argument("--limit", type=int, default=10, help="results per lookup")
+    search.add_argument("--repeat", type=int, default=20, help="runs per lookup")
+
+    interchange = sub.add_parser("interchange", help="file size and encode/decode time of JSON and msgpack output")
+    interchange.add_argument("--matches", type=int, default=5000, help="synthetic matches to generate")
+    interchange.add_argument("--repeat", type=int, default=3, help="runs per format")
+    interchange.add_argument("--commentary", action="store_true", help="include ball-by-ball deliveries")
+
+    service = sub.add_parser("service", help="requests per second and p99 latency of the HTTP query service")
+    service.add_argument("--db", default="bench_service.db", help="scratch database path")
+    service.add_argument("--matches", type=int, default=5000, help="synthetic matches to generate")
+    service.add_argument("--paths", type=int, default=2000, help="distinct requests in the mix")
+    service.add_argument("--requests", type=int, default=20000, help="requests in the mixed phase")
+    service.add_argument("--clients", type=int, default=8, help="concurrent keep-alive clients")
+    service.add_argument("--conditional", type=float, default=0.5,
+                         help="share of repeat requests sent with If-None-Match")
+
+    shards = sub.add_parser("shards", help="maintenance and query times before and after closing seasons")
+    shards.add_argument("--db", default="bench_shards.db", help="scratch database path, shard files beside it")
+    shards.add_argument("--matches", type=int, default=3000, help="synthetic matches (about 450 per season year)")
+    shards.add_argument("--keep", type=int, default=1, help="season years left in the main file")
+    shards.add_argument("--span", type=int, default=1, help="season years per shard file")
+    shards.add_argument("--repeat", type=int, default=5, help="runs per query")
+    shards.add_argument("--commentary", action="store_true", help="also load ball-by-ball deliveries")
+    shards.add_argument("--slowdown-limit", type=float, default=SHARDS_SLOWDOWN_LIMIT,
+                        help="allowed sharded/single-file query time ratio")
+
+    memory = sub.add_parser("memory", help="peak memory of page parsing and loading against budgets")
+    memory.add_argument("--pages", type=int, default=200, help="synthetic matches whose pages are parsed")
+    memory.add_argument("--matches", type=int, default=1000, help="synthetic matches to load")
+    memory.add_argument("--commentary", action="store_true", help="also parse and load ball-by-ball commentary")
+
+    for p in (wh, e2e, startup, search, interchange, service, shards, memory):
+        p.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.suite == "warehouse":
+        report = run_warehouse_benchmark(args)
+        print_report(report)
+    elif args.suite == "e2e":
+        report = run_e2e_benchmark(args)
+    elif args.suite == "search":
+        report = run_search_benchmark(args)
+    elif args.suite == "interchange":
+        report = run_interchange_benchmark(args)
+    elif args.suite == "service":
+        report = run_service_benchmark(args)
+    elif args.suite == "shards":
+        report = run_shards_benchmark(args)
+    elif args.suite == "memory":
+        report = run_memory_benchmark(args)
+    else:
+        report = run_startup_benchmark(args)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+    if args.suite in ("startup", "search", "interchange", "service", "shards", "memory") and not all(r["ok"] for r in report[args.suite]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
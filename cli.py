@@ -0,0 +1,366 @@
+# Command line interface - one entry point for scraping and warehouse commands
+#
+# driver, collector, scraper and the extractors import Selenium and BeautifulSoup
+# at module load, so they are only imported inside the subcommands that drive a
+# browser. Warehouse commands never pay for the scraping stack.
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from config import (
+    DATABASE_FILE, OUTPUT_FILE, LOAD_WORKERS, LOAD_BATCH_SIZE, QUEUE_FILE, STATS_FORM_WINDOW, STATS_MIN_INNINGS,
+    SERVICE_HOST, SERVICE_PORT, SHARD_SPAN_YEARS, SHARD_KEEP_OPEN, EXPORT_DIR, EXPORT_BATCH_ROWS
+)
+
+
+def cmd_collect(args):
+    from config import HEADLESS
+    from driver import driver_manager
+    from collector import collect_international_matches
+
+    try:
+        driver, wait = driver_manager.setup(headless=HEADLESS)
+        match_urls = collect_international_matches(driver, wait)
+    finally:
+        driver_manager.quit()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write("\n".join(match_urls) + "\n")
+        print(f"Saved {len(match_urls)} URLs to: {args.output}")
+    else:
+        for url in match_urls:
+            print(url)
+
+
+def _enable_metrics(args):
+    # Must run before the stages it measures; metrics.write_all reports it
+    if args.metrics or getattr(args, "memory_profile", False):
+        from metrics import metrics
+
+        metrics.enable(memory=getattr(args, "memory_profile", False))
+
+
+def cmd_scrape(args):
+    import main
+
+    _enable_metrics(args)
+    if args.retry_missing:
+        main.retry_missing()
+    else:
+        main.main(args.fields)
+
+
+def cmd_enqueue(args):
+    import main
+    from work_queue import WorkQueue
+
+    main.enqueue_matches(WorkQueue(args.queue), args.job)
+
+
+def cmd_work(args):
+    import main
+    from work_queue import WorkQueue
+
+    _enable_metrics(args)
+    main.scrape_from_queue(WorkQueue(args.queue), args.worker, args.job, args.fields)
+
+
+def cmd_queue(args):
+    from work_queue import WorkQueue
+
+    queue = WorkQueue(args.queue)
+    if args.action == "export":
+        import main
+
+        main.export_queue_results(queue, args.job)
+        return
+    if args.action == "requeue":
+        print(f"Re-queued {queue.requeue_failed(args.job)} failed matches")
+    print(json.dumps(queue.status(args.job)))
+
+
+def cmd_live(args):
+    import live
+
+    _enable_metrics(args)
+    live.main()
+
+
+def cmd_load(args):
+    from cricket_datawarehouse import CricketDataWarehouse
+    from metrics import metrics
+
+    _enable_metrics(args)
+    warehouse = CricketDataWarehouse(args.db)
+    try:
+        warehouse.create_schema()
+        warehouse.load_json_data(args.json, workers=args.workers, batch_size=args.batch_size)
+        warehouse.print_summary()
+    finally:
+        warehouse.close()
+        metrics.write_all()
+
+
+def cmd_convert(args):
+    from interchange import convert
+
+    try:
+        count = convert(args.source, args.target)
+    except ImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Converted {count} matches to: {args.target}")
+
+
+def _require_db(db_path):
+    if not Path(db_path).exists():
+        print(f"Error: {db_path} not found")
+        sys.exit(1)
+
+
+def _require_schema(db_path):
+    # Query-side commands read the current schema; a load is what upgrades it
+    import sqlite3
+
+    from cricket_datawarehouse import OutdatedWarehouseError, check_schema
+
+    _require_db(db_path)
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        check_schema(conn)
+    except OutdatedWarehouseError as e:
+        print(f"Error: {db_path}: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+def cmd_summary(args):
+    from cricket_datawarehouse import CricketDataWarehouse
+
+    _require_db(args.db)
+    warehouse = CricketDataWarehouse(args.db)
+    try:
+        warehouse.print_summary()
+    finally:
+        warehouse.close()
+
+
+def cmd_shards(args):
+    from cricket_datawarehouse import CricketDataWarehouse, read_shards
+
+    _require_db(args.db)
+    warehouse = CricketDataWarehouse(args.db)
+    try:
+        if args.action == "close":
+            try:
+                closed = warehouse.close_seasons(args.keep, args.span)
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+            print(f"Closed {len(closed)} season files")
+        warehouse.connect()
+        for first_year, path, first_date_id, last_date_id in read_shards(warehouse.conn):
+            print(f"  {path}: {first_date_id} - {last_date_id}")
+    finally:
+        warehouse.close()
+
+
+def cmd_export(args):
+    from cricket_datawarehouse import CricketDataWarehouse
+
+    _require_schema(args.db)
+    warehouse = CricketDataWarehouse(args.db)
+    try:
+        result = warehouse.export_snapshot(args.output, args.format, args.batch_rows, args.full)
+    except (ImportError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(json.dumps(result, indent=4))
+
+
+def _leaderboard(queries, args):
+    # stats pulls in numpy, so it is only imported for this query
+    try:
+        from stats import StatsEngine
+
+        return StatsEngine(queries).leaderboard(args.metric, args.by, args.match_type, args.top,
+                                                args.min_innings, args.window)
+    except (ImportError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def cmd_query(args):
+    from warehouse_queries import WarehouseQueries
+
+    _require_schema(args.db)
+    queries = WarehouseQueries(db_path=args.db)
+    try:
+        if args.query == "leaders":
+            result = _leaderboard(queries, args)
+        elif args.query == "player":
+            result = queries.find_player(args.name)
+        elif args.query == "search":
+            result = queries.search(args.text, args.kind, args.limit)
+        elif args.query == "career":
+            result = queries.player_career(args.player_id, args.match_type)
+        elif args.query == "form":
+            result = queries.team_form(args.team_id, args.last)
+        elif args.query == "matches":
+            result = queries.matches_between(args.start, args.end, args.team)
+        elif args.query == "batters":
+            result = queries.top_batters_between(args.start, args.end, args.top)
+        elif args.query == "venue":
+            result = queries.venue_records(args.venue_id, args.top)
+        else:
+            result = queries.head_to_head(args.team_a, args.team_b)
+    finally:
+        queries.close()
+    print(json.dumps(result, indent=4, ensure_ascii=False, default=str))
+
+
+def cmd_serve(args):
+    import query_service
+
+    _require_schema(args.db)
+    query_service.main(["--db", args.db, "--host", args.host, "--port", str(args.port)])
+
+
+def cmd_bench(args):
+    import benchmark
+
+    benchmark.main(args.bench_args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Cricbuzz scraper and warehouse")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    collect = sub.add_parser("collect", help="list international match URLs from the recent page")
+    collect.add_argument("--output", help="write the URLs to this file")
+    collect.set_defaults(func=cmd_collect)
+
+    scrape = sub.add_parser("scrape", help="collect and scrape matches to JSON")
+    scrape.add_argument("--retry-missing", action="store_true", help="re-fetch only the pages missing from the last run")
+    scrape.set_defaults(func=cmd_scrape)
+
+    enqueue = sub.add_parser("enqueue", help="collect match URLs into the shared scrape queue")
+    enqueue.set_defaults(func=cmd_enqueue)
+
+    work = sub.add_parser("work", help="scrape matches leased from the shared queue until it is empty")
+    work.add_argument("--worker", help="worker name, defaults to host:pid")
+    work.set_defaults(func=cmd_work)
+
+    queue = sub.add_parser("queue", help="status of the scrape queue, export its results or re-queue failures")
+    queue.add_argument("action", choices=("status", "export", "requeue"))
+    queue.set_defaults(func=cmd_queue)
+
+    for p in (scrape, work):
+        p.add_argument("--fields", type=lambda text: [f.strip() for f in text.split(",") if f.strip()],
+                       help="comma-separated match fields; only the pages that produce them are loaded")
+
+    for p in (enqueue, work, queue):
+        p.add_argument("--queue", default=QUEUE_FILE, help="queue database")
+        p.add_argument("--job", default="default", help="job name, one queue can hold several")
+
+    live = sub.add_parser("live", help="track in-progress matches into the warehouse")
+    live.set_defaults(func=cmd_live)
+
+    load = sub.add_parser("load", help="load scraped JSON into the warehouse")
+    load.add_argument("--json", default=OUTPUT_FILE, help="scraped match file, JSON or .msgpack")
+    load.add_argument("--workers", type=int, default=LOAD_WORKERS, help="transform worker processes")
+    load.add_argument("--batch-size", type=int, default=LOAD_BATCH_SIZE, help="matches per commit")
+    load.set_defaults(func=cmd_load)
+
+    for p in (scrape, work, live, load):
+        p.add_argument("--metrics", action="store_true",
+                       help="time every stage into run_report.json and the Prometheus textfile")
+    for p in (scrape, work, load):
+        p.add_argument("--memory-profile", action="store_true",
+                       help="trace allocations per stage into the run report (slow)")
+
+    convert = sub.add_parser("convert", help="rewrite a scraped match file, JSON or .msgpack by suffix")
+    convert.add_argument("source")
+    convert.add_argument("target")
+    convert.set_defaults(func=cmd_convert)
+
+    shards = sub.add_parser("shards", help="list closed seasons, or move closed seasons to their own files")
+    shards.add_argument("action", choices=("list", "close"))
+    shards.add_argument("--keep", type=int, default=SHARD_KEEP_OPEN, help="latest season years left open")
+    shards.add_argument("--span", type=int, default=SHARD_SPAN_YEARS, help="season years per file")
+    shards.set_defaults(func=cmd_shards)
+
+    export = sub.add_parser("export", help="write every table as Parquet, Arrow or gzipped CSV files")
+    export.add_argument("--output", default=EXPORT_DIR, help="export directory")
+    export.add_argument("--format", choices=("parquet", "arrow", "csv"),
+                        help="defaults to parquet, or csv without pyarrow")
+    export.add_argument("--batch-rows", type=int, default=EXPORT_BATCH_ROWS, help="rows per batch")
+    export.add_argument("--full", action="store_true", help="export every match, not only new ones")
+    export.set_defaults(func=cmd_export)
+
+    summary = sub.add_parser("summary", help="row counts of the warehouse tables")
+    summary.set_defaults(func=cmd_summary)
+
+    query = sub.add_parser("query", help="run an analytical query and print JSON")
+    queries = query.add_subparsers(dest="query", required=True)
+    player = queries.add_parser("player", help="find players by name or alias")
+    player.add_argument("name")
+    search = queries.add_parser("search", help="ranked prefix search over player, team, venue and match names")
+    search.add_argument("text")
+    search.add_argument("--kind", choices=("player", "team", "venue", "match"))
+    search.add_argument("--limit", type=int, default=10)
+    career = queries.add_parser("career", help="batting and bowling career of a player")
+    career.add_argument("player_id", type=int)
+    career.add_argument("--match-type", type=int, help="restrict to one match_type_id")
+    form = queries.add_parser("form", help="recent results of a team")
+    form.add_argument("team_id", type=int)
+    form.add_argument("--last", type=int, default=10)
+    matches = queries.add_parser("matches", help="matches played between two dates")
+    matches.add_argument("start", help="first day, YYYY-MM-DD")
+    matches.add_argument("end", help="last day, YYYY-MM-DD")
+    matches.add_argument("--team", type=int, help="only matches of this team_id")
+    batters = queries.add_parser("batters", help="top run scorers between two dates")
+    batters.add_argument("start", help="first day, YYYY-MM-DD")
+    batters.add_argument("end", help="last day, YYYY-MM-DD")
+    batters.add_argument("--top", type=int, default=10)
+    venue = queries.add_parser("venue", help="scoring record and top batters at a venue")
+    venue.add_argument("venue_id", type=int)
+    venue.add_argument("--top", type=int, default=5)
+    h2h = queries.add_parser("h2h", help="head-to-head record of two teams")
+    h2h.add_argument("team_a", type=int)
+    h2h.add_argument("team_b", type=int)
+    leaders = queries.add_parser("leaders", help="leaderboard of a batting or bowling metric (needs numpy)")
+    leaders.add_argument("metric", help="runs, batting_average, strike_rate, boundary_pct, form, wickets, "
+                                        "economy, bowling_average or bowling_strike_rate")
+    leaders.add_argument("--by", choices=("player", "team", "match_type"), default="player")
+    leaders.add_argument("--match-type", type=int, help="restrict to one match_type_id")
+    leaders.add_argument("--top", type=int, default=10)
+    leaders.add_argument("--min-innings", type=int, default=STATS_MIN_INNINGS)
+    leaders.add_argument("--window", type=int, default=STATS_FORM_WINDOW, help="innings in the form window")
+    query.set_defaults(func=cmd_query)
+
+    serve = sub.add_parser("serve", help="serve warehouse queries as JSON over HTTP")
+    serve.add_argument("--host", default=SERVICE_HOST)
+    serve.add_argument("--port", type=int, default=SERVICE_PORT)
+    serve.set_defaults(func=cmd_serve)
+
+    bench = sub.add_parser("bench", help="run benchmark.py with the remaining arguments")
+    bench.add_argument("bench_args", nargs=argparse.REMAINDER)
+    bench.set_defaults(func=cmd_bench)
+
+    for p in (load, summary, query, serve, shards, export):
+        p.add_argument("--db", default=DATABASE_FILE, help="warehouse database")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,13 +4,18 @@ import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 
-from config import RECENT_URL, WAIT_TIME, SKIP_PATTERNS, LIVE_INDICATORS, COMPLETED_INDICATORS
+from config import (
+    RECENT_URL, LIVE_URL, WAIT_TIME, SKIP_PATTERNS, LIVE_INDICATORS, COMPLETED_INDICATORS
+)
+from metrics import metrics
 
 
 def collect_international_matches(driver, wait):
     print("\nOpening Recent Matches page...")
-    driver.get(RECENT_URL)
-    time.sleep(WAIT_TIME)
+    with metrics.span("driver.get", "recent"):
+        driver.get(RECENT_URL)
+    with metrics.span("sleep", "recent"):
+        time.sleep(WAIT_TIME)
     
     print("Clicking International filter...")
     try:
@@ -26,7 +31,8 @@ def collect_international_matches(driver, wait):
     print("Collecting COMPLETED International matches...")
     
     match_urls = []
-    all_links = driver.find_elements(By.XPATH, "//a[contains(@href, '/live-cricket-scores/')]")
+    with metrics.span("collect.links", "recent"):
+        all_links = driver.find_elements(By.XPATH, "//a[contains(@href, '/live-cricket-scores/')]")
     
     for link in all_links:
         try:
@@ -42,6 +48,49 @@ def collect_international_matches(driver, wait):
     return match_urls
 
 
+def collect_live_matches(driver):
+    print("\nOpening Live Scores page...")
+    with metrics.span("driver.get", "live"):
+        driver.get(LIVE_URL)
+    with metrics.span("sleep", "live"):
+        time.sleep(WAIT_TIME)
+    
+    match_urls = []
+    all_links = driver.find_elements(By.XPATH, "//a[contains(@href, '/live-cricket-scores/')]")
+    
+    for link in all_links:
+        try:
+            url = _extract_live_url(link)
+            if url and url not in match_urls:
+                match_urls.append(url)
+                print(f"    {url.split('/')[-1][:50]}")
+        except:
+            continue
+    
+    print(f"\nFound {len(match_urls)} LIVE matches")
+    return match_urls
+
+
+def _extract_live_url(link):
+    href = link.get_attribute("href")
+    link_text = link.text.strip() if link.text else ""
+    
+    if not href or "/live-cricket-scores/" not in href or not link_text:
+        return None
+    
+    text_lower = link_text.lower()
+    if "preview" in text_lower or " won" in text_lower:
+        return None
+    
+    if not any(word in text_lower for word in LIVE_INDICATORS):
+        return None
+    
+    if _should_skip_match(href, link_text):
+        return None
+    
+    return href
+
+
 def _extract_valid_url(link):
     href = link.get_attribute("href")
     link_text = link.text.strip() if link.text else ""
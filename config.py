@@ -1,14 +1,25 @@
 # Config settings
 
-# URLs
-RECENT_URL = "https://www.cricbuzz.com/cricket-match/live-scores/recent-matches"
+import os
+
+# URLs (overridable to point the scraper at a local mock server)
+RECENT_URL = os.environ.get(
+    "CRICBUZZ_RECENT_URL", "https://www.cricbuzz.com/cricket-match/live-scores/recent-matches"
+)
+
+LIVE_URL = os.environ.get(
+    "CRICBUZZ_LIVE_URL", "https://www.cricbuzz.com/cricket-match/live-scores"
+)
 
 # Output files
-OUTPUT_FILE = "international_data.json"
+OUTPUT_FILE = os.environ.get("CRICBUZZ_OUTPUT_FILE", "international_data.json")
 DATABASE_FILE = "cricket_warehouse.db"
 
+# Browser
+HEADLESS = os.environ.get("CRICBUZZ_HEADLESS", "") == "1"
+
 # Timing
-WAIT_TIME = 3
+WAIT_TIME = float(os.environ.get("CRICBUZZ_WAIT_TIME", 3))
 PAGE_LOAD_TIMEOUT = 30
 WEBDRIVER_WAIT = 15
 
@@ -48,3 +59,87 @@ LIVE_INDICATORS = ['opt to', 'need ', 'trail', 'lead', ' - live', 'day ', 'sessi
 
 # Completed match indicators
 COMPLETED_INDICATORS = [' won', ')', 'wickets', 'runs']
+
+# Warehouse loading
+LOAD_WORKERS = 0          # >1 runs the transform stage in a process pool
+LOAD_BATCH_SIZE = 200     # matches per commit
+
+# Season shards: closed seasons' per-innings facts move to files of their own
+SHARD_SPAN_YEARS = 1      # season years per shard file (a season year runs May-April)
+SHARD_KEEP_OPEN = 1       # latest season years kept in the main file
+
+# Columnar snapshot export
+EXPORT_DIR = "warehouse_export"
+EXPORT_BATCH_ROWS = 50000  # rows per fetch and per Parquet row group / Arrow record batch
+
+# Query API
+QUERY_POOL_SIZE = 4       # read-only connections
+QUERY_CACHE_SIZE = 256    # cached query results
+SEARCH_CANDIDATES = 1000  # name matches ranked per search; broad prefixes stop here
+
+# Query service
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8766
+SERVICE_CACHE_SIZE = 1024  # encoded responses kept until the next load
+MAX_LIMIT = 1000           # largest limit, top, last or window one request may ask for
+
+# Statistics engine (needs the optional numpy package)
+STATS_FORM_WINDOW = 10    # innings in the rolling form window
+STATS_MIN_INNINGS = 10    # innings needed to appear on a leaderboard
+
+# Run metrics
+METRICS_ENABLED = os.environ.get("CRICBUZZ_METRICS", "") == "1"
+RUN_REPORT_FILE = "run_report.json"
+PROMETHEUS_FILE = "cricbuzz_scraper.prom"
+
+# Memory profiling: tracemalloc over every metrics span, added to the run report
+MEMORY_PROFILE = os.environ.get("CRICBUZZ_MEMORY_PROFILE", "") == "1"
+MEMORY_PROFILE_SAMPLES = 3   # calls per stage whose retained allocations are traced to source lines
+MEMORY_PROFILE_TOP = 10      # allocation sites reported per stage and for the whole run
+
+# Mock server
+MOCK_HOST = "127.0.0.1"
+MOCK_PORT = 8765
+FIXTURES_DIR = "fixtures"
+
+# Load-time validation
+VALIDATION_XI_SIZE = 11
+RESCRAPE_FILE = "rescrape_list.json"   # failing pages per match, read by --retry-missing
+
+# Page retries
+PAGE_RETRIES = 3          # attempts per page
+RETRY_BACKOFF = 2         # seconds, doubled after each failed attempt
+BREAKER_THRESHOLD = 5     # consecutive failures before a page type is skipped
+BREAKER_COOLDOWN = 120    # seconds before a tripped page type is tried again
+
+# Browser recycling
+DRIVER_RECYCLE_NAVIGATIONS = 150  # restart Chrome after this many page loads
+DRIVER_RECYCLE_RSS_MB = 1500      # or once its processes exceed this RSS (needs psutil)
+DRIVER_WARM_STANDBY = True        # start the replacement browser ahead of the swap
+DRIVER_STANDBY_LEAD = 10          # page loads before the recycle point to start it
+
+# Live tracking (seconds between scorecard polls)
+LIVE_POLL_FAST = 20        # last overs of an innings or a collapse
+LIVE_POLL_NORMAL = 60
+LIVE_POLL_SLOW = 120       # early overs of a Test innings
+LIVE_POLL_BREAK = 300      # innings break, drinks, lunch, tea, stumps, rain
+LIVE_DISCOVERY_INTERVAL = 600
+LIVE_BREAK_MARKERS = ['innings break', 'drinks', 'lunch', 'tea', 'stumps', 'rain', 'delayed']
+
+# Load a match's pages in parallel tabs of the one browser
+PARALLEL_TABS = os.environ.get("CRICBUZZ_PARALLEL_TABS", "1") == "1"
+
+# Unchanged-page detection
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_FILE = "page_cache.db"
+
+# Ball-by-ball commentary (one extra page per match, paged with "Load More")
+SCRAPE_COMMENTARY = os.environ.get("CRICBUZZ_COMMENTARY", "") == "1"
+COMMENTARY_MAX_PAGES = 200        # "Load More" clicks per match, a Test needs well over 100
+COMMENTARY_PAGE_WAIT = 1          # seconds for each appended page to render
+
+# Distributed scrape queue
+QUEUE_FILE = "scrape_queue.db"
+QUEUE_LEASE_SECONDS = 180  # a lease not renewed for this long goes back to the queue
+QUEUE_HEARTBEAT = 30       # seconds between lease renewals while a match is scraped
+QUEUE_MAX_ATTEMPTS = 3     # leases per URL before it is parked as failed
@@ -2,18 +2,432 @@
 
 import sqlite3
 import json
+import os
 import re
+from datetime import date
 from pathlib import Path
 
+from config import (
+    LOAD_WORKERS, LOAD_BATCH_SIZE, RESCRAPE_FILE, SHARD_SPAN_YEARS, SHARD_KEEP_OPEN, EXPORT_DIR, EXPORT_BATCH_ROWS,
+    TEAM_ABBREVIATIONS
+)
+from metrics import metrics
+from utils import TeamIndex, normalize_player_alias, normalize_team_alias
+from validation import validate_match
+from interchange import read_matches
+
+
+# search_index rowid = entity_id * len(SEARCH_KINDS) + kind code
+SEARCH_KINDS = {"player": 0, "team": 1, "venue": 2, "match": 3}
+
+MONTHS = {name: number for number, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1
+)}
+MONTH_DAY_RE = re.compile(r"\b([a-z]{3})[a-z]*\.?\s+(\d{1,2})\b")
+DAY_MONTH_RE = re.compile(r"\b(\d{1,2})\s+([a-z]{3})[a-z]*\b")
+YEAR_RE = re.compile(r"\b((?:19|20)\d{2})\b")
+ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+
+
+# Per-innings facts that a closed season moves to its shard file; fact_matches,
+# the dimensions and the ETL tables stay in the main file
+SHARDED_TABLES = ("fact_batting", "fact_bowling", "fact_playing_xi", "fact_deliveries")
+
+# Every table create_schema makes and every column it adds to an older table. A
+# warehouse missing one was written by an earlier version and is upgraded by a load.
+SCHEMA_TABLES = (
+    "dim_teams", "dim_team_aliases", "dim_players", "dim_player_aliases", "dim_venues", "dim_match_types",
+    "dim_dates", "fact_matches", "fact_batting", "fact_bowling", "fact_playing_xi", "fact_deliveries",
+    "search_index", "etl_validation_flags", "etl_shards", "etl_loads", "etl_replacements"
+)
+SCHEMA_COLUMNS = (("dim_players", "cricbuzz_id"), ("fact_matches", "missing_sections"), ("fact_matches", "date_id"))
+
+# Season year of a dim_dates row: "2014/15" and "2015" both start in their first year,
+# so a season year runs May to April and holds one winter and one summer season
+SEASON_YEAR_SQL = "CAST(SUBSTR(d.season, 1, 4) AS INTEGER)"
+
+
+class OutdatedWarehouseError(Exception):
+    pass
+
+
+def check_schema(conn):
+    # Readers never migrate, so an old warehouse gets one clear error instead of
+    # a "no such table" from whichever query runs first
+    tables = {row[0] for row in conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+    missing = [table for table in SCHEMA_TABLES if table not in tables]
+    for table, column in SCHEMA_COLUMNS:
+        if table in tables and column not in {row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")}:
+            missing.append(f"{table}.{column}")
+    if missing:
+        raise OutdatedWarehouseError(
+            f"warehouse predates this version (missing {', '.join(missing)}); "
+            f"run `load` or create_schema() on it first"
+        )
+
+
+def shard_label(first_year, span=SHARD_SPAN_YEARS):
+    return str(first_year) if span == 1 else f"{first_year}-{first_year + span - 1}"
+
+
+def shard_schema(first_year):
+    # Name a shard is attached under
+    return f"season_{first_year}"
+
+
+def shard_path(db_path, first_year, span=SHARD_SPAN_YEARS):
+    # cricket_warehouse.db -> cricket_warehouse_2014.db, next to the main file
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}_{shard_label(first_year, span)}{db_path.suffix}")
+
+
+def read_shards(conn):
+    # [(first_year, file name, first_date_id, last_date_id)] of the closed seasons
+    try:
+        return [tuple(row) for row in conn.execute(
+            "SELECT first_year, path, first_date_id, last_date_id FROM etl_shards ORDER BY first_year"
+        )]
+    except sqlite3.OperationalError:
+        return []
+
+
+def attach_shards(conn, db_path, shards=None):
+    # Attaches every shard read-only and shadows each sharded table with a TEMP view
+    # over main and the shards, so unqualified queries see all seasons.
+    # Returns [(schema, first_date_id, last_date_id)].
+    shards = read_shards(conn) if shards is None else shards
+    base = Path(db_path).resolve().parent
+    attached = []
+    for first_year, path, first_date_id, last_date_id in shards:
+        schema = shard_schema(first_year)
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", ((base / path).as_uri() + "?mode=ro",))
+        attached.append((schema, first_date_id, last_date_id))
+    if attached:
+        for table in SHARDED_TABLES:
+            union = " UNION ALL ".join(f"SELECT * FROM {schema}.{table}"
+                                       for schema in ["main"] + [a[0] for a in attached])
+            conn.execute(f"CREATE TEMP VIEW {table} AS {union}")
+    return attached
+
+
+# Transform stage: pure functions so they can run in worker processes
+
+def parse_score(score_text):
+    if not score_text:
+        return None, None, None
+    
+    match = re.search(r'(\d+)/(\d+)\s*\(?([\d.]+)?\s*[Oo]v\)?', str(score_text))
+    if match:
+        return int(match.group(1)), int(match.group(2)), float(match.group(3)) if match.group(3) else None
+    
+    match = re.search(r'(\d+)', str(score_text))
+    if match:
+        return int(match.group(1)), None, None
+    
+    return None, None, None
+
+
+def parse_match_date(text):
+    # "Saturday, March 09, 2024", "Mar 9, 2024", "9 Mar 2024" or "2024-03-09";
+    # a Test span such as "Dec 26 - Dec 30, 2023" gives its first day
+    if not text:
+        return None
+    text = str(text).lower()
+    iso = ISO_DATE_RE.search(text)
+    if iso:
+        year, month, day = map(int, iso.groups())
+    else:
+        days = [(MONTHS[m.group(1)], int(m.group(2)), m.end())
+                for m in MONTH_DAY_RE.finditer(text) if m.group(1) in MONTHS]
+        if not days:
+            days = [(MONTHS[m.group(2)], int(m.group(1)), m.end())
+                    for m in DAY_MONTH_RE.finditer(text) if m.group(2) in MONTHS]
+        years = [(int(m.group(1)), m.start()) for m in YEAR_RE.finditer(text)]
+        if not days or not years:
+            return None
+        month, day, end = days[0]
+        year = next((y for y, pos in years if pos >= end), years[-1][0])
+        # "Dec 28 - Jan 1, 2024" gives the year once, for the last day of the span
+        if len(days) > 1 and days[1][0] < month and not any(end <= pos < days[1][2] for _, pos in years):
+            year -= 1
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def cricket_season(match_date):
+    # Split-year seasons for the October-April summers, the calendar year for May-September
+    if match_date.month >= 10:
+        return f"{match_date.year}/{(match_date.year + 1) % 100:02d}"
+    if match_date.month <= 4:
+        return f"{match_date.year - 1}/{match_date.year % 100:02d}"
+    return str(match_date.year)
+
+
+def date_row(match_date):
+    # dim_dates row; date_id is YYYYMMDD so date ranges are integer ranges
+    if match_date is None:
+        return None
+    return (
+        match_date.year * 10000 + match_date.month * 100 + match_date.day, match_date.isoformat(),
+        match_date.day, match_date.month, match_date.strftime("%B"), match_date.year,
+        cricket_season(match_date), match_date.isoweekday(), match_date.strftime("%A")
+    )
+
+
+def classify_match_type(match_title):
+    if not match_title:
+        return None
+    title_lower = match_title.lower()
+    
+    if 't20i' in title_lower or 't20' in title_lower:
+        return 'T20I'
+    elif 'odi' in title_lower:
+        return 'ODI'
+    elif 'test' in title_lower:
+        return 'Test'
+    return 'T20'
+
+
+def parse_batting_stats(entry):
+    runs = _safe_int(entry.get('runs', 0))
+    balls = _safe_int(entry.get('balls', 0))
+    fours = _safe_int(entry.get('fours', entry.get('4s', 0)))
+    sixes = _safe_int(entry.get('sixes', entry.get('6s', 0)))
+    sr = _safe_float(entry.get('strike_rate', entry.get('sr', 0)))
+    
+    dismissal = entry.get('dismissal', '')
+    is_not_out = 'not out' in str(dismissal).lower() if dismissal else False
+    
+    return runs, balls, fours, sixes, sr, is_not_out, dismissal
+
+
+def parse_bowling_stats(entry):
+    overs = _safe_float(entry.get('overs', 0))
+    maidens = _safe_int(entry.get('maidens', 0))
+    runs = _safe_int(entry.get('runs', 0))
+    wickets = _safe_int(entry.get('wickets', 0))
+    economy = _safe_float(entry.get('economy', 0))
+    return overs, maidens, runs, wickets, economy
+
+
+def _safe_int(val):
+    try:
+        return int(val)
+    except:
+        return 0
+
+
+def _safe_float(val):
+    try:
+        return float(val)
+    except:
+        return 0.0
+
+
+def _playing_xi_players(team_data):
+    if isinstance(team_data, dict):
+        return team_data.get('players', [])
+    return team_data if isinstance(team_data, list) else []
+
+
+def _build_xi_index(playing_xi):
+    by_alias, by_surname = {}, {}
+    for slot, player_name, designation, profile_id in playing_xi:
+        entry = (slot, profile_id, player_name)
+        alias = normalize_player_alias(player_name)
+        if not alias:
+            continue
+        by_alias[alias] = entry
+        by_surname.setdefault(alias.split()[-1], []).append(entry)
+    return by_alias, by_surname
+
+
+def _resolve_xi_player(player_name, xi_index, preferred_slot=None):
+    # (slot, profile_id, name): the Playing XI spelling, so "Kohli" and "Virat Kohli" share a player
+    entry = _resolve_xi_entry(player_name, xi_index, preferred_slot)
+    return entry if entry else (None, None, player_name.strip())
+
+
+def _resolve_xi_entry(player_name, xi_index, preferred_slot=None):
+    # Exact spelling first, then a unique surname match ("Kohli" -> "Virat Kohli")
+    by_alias, by_surname = xi_index
+    alias = normalize_player_alias(player_name)
+    if alias in by_alias:
+        return by_alias[alias]
+    if not alias:
+        return None
+
+    # A surname from the other side's XI would credit the row to the wrong team
+    candidates = by_surname.get(alias.split()[-1], [])
+    if preferred_slot is not None:
+        candidates = [c for c in candidates if c[0] == preferred_slot]
+    if len(candidates) == 1:
+        return candidates[0]
+    return None
+
+
+def _delivery_player(player_name, xi_index, slot):
+    # Commentary names players by surname; use the Playing XI spelling when it is unambiguous
+    entry = _resolve_xi_entry(player_name, xi_index, slot)
+    if entry:
+        return entry
+    return (slot, None, player_name.strip())
+
+
+def _note_alias(aliases, observed, slot, profile_id, player_name):
+    # A scorecard or commentary spelling of an XI player is kept as one of their aliases
+    if slot is not None and normalize_player_alias(observed) != normalize_player_alias(player_name):
+        aliases[slot, player_name, profile_id, observed.strip()] = None
+
+
+def transform_match(match):
+    with metrics.span("load.transform"):
+        return _transform_match(match)
+
+
+def _transform_match(match):
+    match_info = match.get('match_info', {})
+    playing_11 = match.get('playing_11', {})
+    scorecard = match.get('scorecard', [])
+    
+    match_key = match.get('match_url', f"{match_info.get('team1_name')}_{match_info.get('team2_name')}_{match.get('match_title')}")
+    
+    t1_score = match_info.get('team1_score')
+    t2_score = match_info.get('team2_score')
+    
+    rows = {
+        "match_key": match_key,
+        "match_title": match.get('match_title', match_info.get('match_title', 'Unknown')),
+        "team1": match_info.get('team1_name') or playing_11.get('team1', {}).get('name'),
+        "team2": match_info.get('team2_name') or playing_11.get('team2', {}).get('name'),
+        "winner": match_info.get('winner'),
+        "venue": match_info.get('venue'),
+        "match_type": classify_match_type(match.get('match_title', '')),
+        "match_date": date_row(parse_match_date(match_info.get('date'))),
+        "team1_score": (t1_score,) + parse_score(t1_score),
+        "team2_score": (t2_score,) + parse_score(t2_score),
+        "result": match_info.get('result'),
+        "potm": match_info.get('player_of_match', ''),
+        "potm_profile_id": None,
+        "missing_sections": ",".join(
+            (match.get('missing_sections') or []) + (match.get('skipped_sections') or [])
+        ) or None,
+        "team_aliases": [],
+        "player_aliases": [],
+        "playing_xi": [],
+        "batting": [],
+        "bowling": [],
+        "deliveries": [],
+        "flags": validate_match(match)
+    }
+    
+    # Build player-team mapping from Playing XI (1 = team1, 2 = team2)
+    for slot, team_key in ((1, 'team1'), (2, 'team2')):
+        team_data = playing_11.get(team_key, {})
+        if isinstance(team_data, dict) and team_data.get('squad_header'):
+            rows["team_aliases"].append((slot, team_data['squad_header']))
+        for player_entry in _playing_xi_players(playing_11.get(team_key, {})):
+            if isinstance(player_entry, dict):
+                player_name = player_entry.get('name', '')
+                designation = player_entry.get('designation', 'Player')
+                profile_id = player_entry.get('profile_id')
+            else:
+                player_name = str(player_entry) if player_entry else ''
+                designation = 'Player'
+                profile_id = None
+            
+            if player_name:
+                rows["playing_xi"].append((slot, player_name, designation, profile_id))
+    
+    xi_index = _build_xi_index(rows["playing_xi"])
+    aliases = {}
+    if rows["potm"]:
+        slot, rows["potm_profile_id"], player_name = _resolve_xi_player(rows["potm"], xi_index)
+        _note_alias(aliases, rows["potm"], slot, rows["potm_profile_id"], player_name)
+        rows["potm"] = player_name
+    
+    for inn_idx, innings in enumerate(scorecard, 1):
+        batting_slot = 1 if inn_idx % 2 == 1 else 2
+        bowling_slot = 3 - batting_slot
+        
+        for bat_pos, bat_entry in enumerate(innings.get('batting', []), 1):
+            player_name = bat_entry.get('batsman', bat_entry.get('player', ''))
+            if not player_name:
+                continue
+            
+            observed = player_name
+            slot, profile_id, player_name = _resolve_xi_player(observed, xi_index, batting_slot)
+            _note_alias(aliases, observed, slot, profile_id, player_name)
+            runs, balls, fours, sixes, sr, is_not_out, dismissal = parse_batting_stats(bat_entry)
+            rows["batting"].append((slot or batting_slot, player_name, profile_id, (
+                inn_idx, bat_pos, runs, balls, fours, sixes, sr, dismissal, is_not_out
+            )))
+        
+        for bowl_entry in innings.get('bowling', []):
+            player_name = bowl_entry.get('bowler', bowl_entry.get('player', ''))
+            if not player_name:
+                continue
+            
+            observed = player_name
+            slot, profile_id, player_name = _resolve_xi_player(observed, xi_index, bowling_slot)
+            _note_alias(aliases, observed, slot, profile_id, player_name)
+            rows["bowling"].append((
+                slot or bowling_slot, player_name, profile_id, (inn_idx,) + parse_bowling_stats(bowl_entry)
+            ))
+    
+    # Thousands of deliveries name the same ~22 players, so resolve each name once
+    resolved = {}
+    for delivery in match.get('commentary') or []:
+        batting_slot = 1 if delivery['innings'] % 2 == 1 else 2
+        players = []
+        for player_name, slot in ((delivery['bowler'], 3 - batting_slot), (delivery['batter'], batting_slot)):
+            if (player_name, slot) not in resolved:
+                resolved[player_name, slot] = _delivery_player(player_name, xi_index, slot)
+                _note_alias(aliases, player_name, *resolved[player_name, slot])
+            players.append(resolved[player_name, slot])
+        rows["deliveries"].append((
+            players[0],
+            players[1],
+            (delivery['innings'], delivery['over'], delivery['seq'], delivery['ball'],
+             delivery['runs'], delivery['extras'], delivery['extra_type'], delivery['wicket'])
+        ))
+    
+    rows["player_aliases"] = list(aliases)
+    return rows
+
+
+def _section_count(missing_sections):
+    return len(missing_sections.split(",")) if missing_sections else 0
+
+
+def iter_transformed(matches, workers=None):
+    if not workers or workers < 2:
+        for match in matches:
+            yield transform_match(match)
+        return
+    
+    # Imported here so warehouse commands that never fan out skip the multiprocessing import
+    from concurrent.futures import ProcessPoolExecutor
+    
+    chunksize = max(1, len(matches) // (workers * 4)) if hasattr(matches, '__len__') else 32
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(transform_match, matches, chunksize=chunksize)
+
 
 class CricketDataWarehouse:
     def __init__(self, db_path="cricket_warehouse.db"):
         self.db_path = db_path
         self.conn = None
+        self._player_index = None
+        self._team_index = None
         
     def connect(self):
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        self._player_index = None
+        self._team_index = None
         return self.conn.cursor()
     
     def close(self):
@@ -41,6 +455,37 @@ class CricketDataWarehouse:
             )
         """)
         
+        self._ensure_column(cursor, "dim_players", "cricbuzz_id", "INTEGER")
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_players_cricbuzz ON dim_players(cricbuzz_id)"
+        )
+        
+        # Every observed spelling of a player, normalised, mapped to one player row
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dim_player_aliases (
+                alias TEXT PRIMARY KEY,
+                player_id INTEGER NOT NULL,
+                FOREIGN KEY (player_id) REFERENCES dim_players(player_id)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            SELECT player_id, player_name FROM dim_players
+            WHERE player_id NOT IN (SELECT player_id FROM dim_player_aliases)
+        """)
+        cursor.executemany(
+            "INSERT OR IGNORE INTO dim_player_aliases (alias, player_id) VALUES (?, ?)",
+            [(normalize_player_alias(name), player_id) for player_id, name in cursor.fetchall()]
+        )
+        
+        # Squad-page spellings of a team, normalised, that the alias index cannot resolve
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dim_team_aliases (
+                alias TEXT PRIMARY KEY,
+                team_id INTEGER NOT NULL,
+                FOREIGN KEY (team_id) REFERENCES dim_teams(team_id)
+            ) WITHOUT ROWID
+        """)
+        
         # Dimension: Venues
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS dim_venues (
@@ -73,6 +518,21 @@ class CricketDataWarehouse:
             match_types
         )
         
+        # Dimension: Dates
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dim_dates (
+                date_id INTEGER PRIMARY KEY,
+                full_date TEXT UNIQUE NOT NULL,
+                day INTEGER,
+                month INTEGER,
+                month_name TEXT,
+                year INTEGER,
+                season TEXT,
+                weekday INTEGER,
+                weekday_name TEXT
+            )
+        """)
+        
         # Fact: Matches
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS fact_matches (
@@ -103,6 +563,10 @@ class CricketDataWarehouse:
             )
         """)
         
+        # Sections the scraper could not fetch; such rows are replaced by a fuller re-scrape
+        self._ensure_column(cursor, "fact_matches", "missing_sections", "TEXT")
+        self._ensure_column(cursor, "fact_matches", "date_id", "INTEGER REFERENCES dim_dates(date_id)")
+        
         # Fact: Batting Performance
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS fact_batting (
@@ -159,48 +623,245 @@ class CricketDataWarehouse:
             )
         """)
         
+        # Fact: Deliveries - one row per ball from the commentary, integer-coded and
+        # clustered on (match, innings, over) so over-by-over reads are range scans
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS fact_deliveries (
+                match_id INTEGER NOT NULL,
+                innings_number INTEGER NOT NULL,
+                over_number INTEGER NOT NULL,
+                ball_seq INTEGER NOT NULL,
+                ball_number INTEGER NOT NULL,
+                bowler_id INTEGER,
+                batter_id INTEGER,
+                runs_batter INTEGER NOT NULL DEFAULT 0,
+                runs_extras INTEGER NOT NULL DEFAULT 0,
+                extra_type INTEGER NOT NULL DEFAULT 0,
+                is_wicket INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (match_id, innings_number, over_number, ball_seq),
+                FOREIGN KEY (match_id) REFERENCES fact_matches(match_id),
+                FOREIGN KEY (bowler_id) REFERENCES dim_players(player_id),
+                FOREIGN KEY (batter_id) REFERENCES dim_players(player_id)
+            ) WITHOUT ROWID
+        """)
+        
+        # Full-text index over player, team, venue and match names. The rowid encodes
+        # the entity, so an entry is replaced or deleted without a scan.
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+            )
+        """)
+        cursor.execute("SELECT COUNT(*) FROM search_index")
+        if cursor.fetchone()[0] == 0:
+            for kind, table, id_column, name_column in (
+                ("player", "dim_players", "player_id", "player_name"),
+                ("team", "dim_teams", "team_id", "team_name"),
+                ("venue", "dim_venues", "venue_id", "full_venue"),
+                ("match", "fact_matches", "match_id", "match_title")
+            ):
+                cursor.execute(
+                    f"INSERT INTO search_index (rowid, name) SELECT {id_column} * ? + ?, {name_column} "
+                    f"FROM {table} WHERE {name_column} IS NOT NULL",
+                    (len(SEARCH_KINDS), SEARCH_KINDS[kind])
+                )
+        
+        # Failed consistency checks per match, each naming the page to re-scrape
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS etl_validation_flags (
+                match_id INTEGER NOT NULL,
+                section TEXT NOT NULL,
+                check_name TEXT NOT NULL,
+                part INTEGER,
+                detail TEXT,
+                FOREIGN KEY (match_id) REFERENCES fact_matches(match_id)
+            )
+        """)
+        
+        # Closed season years whose per-innings facts live in their own read-only file
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS etl_shards (
+                first_year INTEGER PRIMARY KEY,
+                span_years INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                first_date_id INTEGER,
+                last_date_id INTEGER,
+                matches INTEGER,
+                fact_rows INTEGER,
+                closed_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Load log: MAX(load_id) is the warehouse version readers cache against
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS etl_loads (
+                load_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT,
+                matches_loaded INTEGER,
+                loaded_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Matches replaced in place by a more complete copy; they keep their match_id,
+        # so incremental exports cannot tell them apart from unchanged rows otherwise
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS etl_replacements (
+                replacement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                match_id INTEGER NOT NULL,
+                replaced_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
         # Performance indexes
         indexes = [
             "CREATE INDEX IF NOT EXISTS idx_batting_match ON fact_batting(match_id)",
-            "CREATE INDEX IF NOT EXISTS idx_batting_player ON fact_batting(player_id)",
+            "CREATE INDEX IF NOT EXISTS idx_batting_player_match ON fact_batting(player_id, match_id)",
+            "CREATE INDEX IF NOT EXISTS idx_batting_team_innings ON fact_batting(team_id, innings_number)",
             "CREATE INDEX IF NOT EXISTS idx_bowling_match ON fact_bowling(match_id)",
-            "CREATE INDEX IF NOT EXISTS idx_bowling_player ON fact_bowling(player_id)",
+            "CREATE INDEX IF NOT EXISTS idx_bowling_player_match ON fact_bowling(player_id, match_id)",
+            "CREATE INDEX IF NOT EXISTS idx_bowling_team_innings ON fact_bowling(team_id, innings_number)",
             "CREATE INDEX IF NOT EXISTS idx_matches_winner ON fact_matches(winner_id)",
-            "CREATE INDEX IF NOT EXISTS idx_playing_xi_match ON fact_playing_xi(match_id)"
+            "CREATE INDEX IF NOT EXISTS idx_matches_team1 ON fact_matches(team1_id, team2_id)",
+            "CREATE INDEX IF NOT EXISTS idx_matches_team2 ON fact_matches(team2_id)",
+            "CREATE INDEX IF NOT EXISTS idx_matches_venue ON fact_matches(venue_id)",
+            "CREATE INDEX IF NOT EXISTS idx_matches_type ON fact_matches(match_type_id)",
+            "CREATE INDEX IF NOT EXISTS idx_matches_date ON fact_matches(date_id)",
+            "CREATE INDEX IF NOT EXISTS idx_playing_xi_match ON fact_playing_xi(match_id)",
+            "CREATE INDEX IF NOT EXISTS idx_deliveries_batter_bowler ON fact_deliveries(batter_id, bowler_id)",
+            "CREATE INDEX IF NOT EXISTS idx_validation_match ON etl_validation_flags(match_id)"
         ]
         for idx in indexes:
             cursor.execute(idx)
         
+        # Single-column player indexes are prefixes of the composites above
+        cursor.execute("DROP INDEX IF EXISTS idx_batting_player")
+        cursor.execute("DROP INDEX IF EXISTS idx_bowling_player")
+        
+        self._respell_teams(cursor)
         self.conn.commit()
         print("Schema created successfully")
         
+    def _respell_teams(self, cursor):
+        # Older loads title-cased every name ("Uae"); give those rows the canonical spelling
+        teams = TeamIndex(TEAM_ABBREVIATIONS)
+        cursor.execute("SELECT team_id, team_name FROM dim_teams")
+        rows = cursor.fetchall()
+        taken = {team_name for _, team_name in rows}
+        for team_id, team_name in rows:
+            display = teams.display(team_name)
+            if display not in taken:
+                cursor.execute("UPDATE dim_teams SET team_name = ? WHERE team_id = ?", (display, team_id))
+                self._index_name(cursor, "team", team_id, display)
+                taken.add(display)
+    
+    def _load_team_index(self, cursor):
+        # Every spelling -> canonical alias -> team_id; an alias stored under several
+        # spellings by older loads resolves to its first row
+        teams, team_ids = TeamIndex(TEAM_ABBREVIATIONS), {}
+        cursor.execute("SELECT team_id, team_name FROM dim_teams ORDER BY team_id")
+        for team_id, team_name in cursor.fetchall():
+            team_ids.setdefault(teams.resolve(team_name), team_id)
+        cursor.execute("SELECT alias, team_id FROM dim_team_aliases")
+        for alias, team_id in cursor.fetchall():
+            team_ids.setdefault(teams.resolve(alias), team_id)
+        self._team_index = (teams, team_ids)
+        return self._team_index
+    
     def get_or_create_team(self, cursor, team_name):
-        if not team_name:
+        if not team_name or not team_name.strip():
             return None
-        team_name = team_name.strip().title()
-        cursor.execute("SELECT team_id FROM dim_teams WHERE team_name = ?", (team_name,))
-        row = cursor.fetchone()
-        if row:
-            return row[0]
-        cursor.execute("INSERT INTO dim_teams (team_name) VALUES (?)", (team_name,))
-        return cursor.lastrowid
+        teams, team_ids = self._team_index or self._load_team_index(cursor)
+        alias = teams.resolve(team_name)
+        team_id = team_ids.get(alias)
+        if team_id is None:
+            team_name = teams.display(team_name)
+            cursor.execute("INSERT INTO dim_teams (team_name) VALUES (?)", (team_name,))
+            team_id = team_ids[alias] = cursor.lastrowid
+            self._index_name(cursor, "team", team_id, team_name)
+        return team_id
+    
+    def add_team_alias(self, cursor, alias_name, team_id):
+        # A squad header the index cannot resolve names this team from now on
+        teams, team_ids = self._team_index or self._load_team_index(cursor)
+        alias = teams.resolve(alias_name)
+        if team_id is None or not alias or alias != normalize_team_alias(alias_name) or alias in team_ids:
+            return
+        cursor.execute("INSERT OR IGNORE INTO dim_team_aliases (alias, team_id) VALUES (?, ?)", (alias, team_id))
+        team_ids[alias] = team_id
+    
+    def _index_name(self, cursor, kind, entity_id, name):
+        if name:
+            cursor.execute("INSERT OR REPLACE INTO search_index (rowid, name) VALUES (?, ?)",
+                           (entity_id * len(SEARCH_KINDS) + SEARCH_KINDS[kind], name))
     
-    def get_or_create_player(self, cursor, player_name, team_id=None):
+    def _ensure_column(self, cursor, table, column, definition):
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    
+    def _load_player_index(self, cursor):
+        by_profile, by_alias, team_ids = {}, {}, {}
+        cursor.execute("SELECT player_id, cricbuzz_id, team_id FROM dim_players")
+        for player_id, cricbuzz_id, team_id in cursor.fetchall():
+            team_ids[player_id] = team_id
+            if cricbuzz_id is not None:
+                by_profile[cricbuzz_id] = player_id
+        cursor.execute("SELECT alias, player_id FROM dim_player_aliases")
+        for alias, player_id in cursor.fetchall():
+            by_alias[alias] = player_id
+        self._player_index = (by_profile, by_alias, team_ids)
+        return self._player_index
+    
+    def get_or_create_player(self, cursor, player_name, team_id=None, profile_id=None):
         if not player_name:
             return None
         player_name = player_name.strip()
+        alias = normalize_player_alias(player_name)
+        by_profile, by_alias, team_ids = self._player_index or self._load_player_index(cursor)
         
-        cursor.execute("SELECT player_id, team_id FROM dim_players WHERE player_name = ?", (player_name,))
-        row = cursor.fetchone()
+        player_id = by_profile.get(profile_id) if profile_id is not None else None
+        if player_id is None:
+            player_id = by_alias.get(alias)
+            if player_id is not None and profile_id is not None:
+                # Same spelling already belongs to a different profile: a namesake
+                cursor.execute("SELECT cricbuzz_id FROM dim_players WHERE player_id = ?", (player_id,))
+                if cursor.fetchone()[0] is None:
+                    cursor.execute("UPDATE dim_players SET cricbuzz_id = ? WHERE player_id = ?",
+                                   (profile_id, player_id))
+                    by_profile[profile_id] = player_id
+                else:
+                    player_id = None
+                    player_name = f"{player_name} ({profile_id})"
         
-        if row:
-            player_id, existing_team_id = row
-            if existing_team_id is None and team_id is not None:
-                cursor.execute("UPDATE dim_players SET team_id = ? WHERE player_id = ?", (team_id, player_id))
-            return player_id
+        if player_id is None:
+            cursor.execute("INSERT INTO dim_players (player_name, team_id, cricbuzz_id) VALUES (?, ?, ?)",
+                           (player_name, team_id, profile_id))
+            player_id = cursor.lastrowid
+            team_ids[player_id] = team_id
+            self._index_name(cursor, "player", player_id, player_name)
+            if profile_id is not None:
+                by_profile[profile_id] = player_id
+        elif team_ids.get(player_id) is None and team_id is not None:
+            cursor.execute("UPDATE dim_players SET team_id = ? WHERE player_id = ?", (team_id, player_id))
+            team_ids[player_id] = team_id
         
-        cursor.execute("INSERT INTO dim_players (player_name, team_id) VALUES (?, ?)", (player_name, team_id))
-        return cursor.lastrowid
+        self.add_player_alias(cursor, player_name, player_id)
+        return player_id
+    
+    def add_player_alias(self, cursor, player_name, player_id):
+        # The first player a spelling was seen for keeps it
+        alias = normalize_player_alias(player_name)
+        by_alias = (self._player_index or self._load_player_index(cursor))[1]
+        if alias and alias not in by_alias:
+            cursor.execute("INSERT OR IGNORE INTO dim_player_aliases (alias, player_id) VALUES (?, ?)",
+                           (alias, player_id))
+            by_alias[alias] = player_id
+    
+    def _write_player_aliases(self, cursor, rows, team_ids):
+        # Scorecard and commentary spellings ("Kohli") of the XI players they resolved to
+        for slot, player_name, profile_id, observed in rows["player_aliases"]:
+            player_id = self.get_or_create_player(cursor, player_name, team_ids[slot], profile_id)
+            self.add_player_alias(cursor, observed, player_id)
     
     def get_or_create_venue(self, cursor, venue_text):
         if not venue_text:
@@ -217,197 +878,462 @@ class CricketDataWarehouse:
         
         cursor.execute("INSERT INTO dim_venues (venue_name, city, full_venue) VALUES (?, ?, ?)",
                       (venue_name, city, venue_text))
-        return cursor.lastrowid
+        venue_id = cursor.lastrowid
+        self._index_name(cursor, "venue", venue_id, venue_text)
+        return venue_id
+    
+    def get_or_create_date(self, cursor, date_row):
+        if not date_row:
+            return None
+        cursor.execute("""
+            INSERT OR IGNORE INTO dim_dates (
+                date_id, full_date, day, month, month_name, year, season, weekday, weekday_name
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, date_row)
+        return date_row[0]
     
     def get_match_type_id(self, cursor, match_title):
         if not match_title:
             return None
-        title_lower = match_title.lower()
-        
-        if 't20i' in title_lower or 't20' in title_lower:
-            match_type = 'T20I'
-        elif 'odi' in title_lower:
-            match_type = 'ODI'
-        elif 'test' in title_lower:
-            match_type = 'Test'
-        else:
-            match_type = 'T20'
-        
+        return self._match_type_id(cursor, classify_match_type(match_title))
+    
+    def _match_type_id(self, cursor, match_type):
+        if not match_type:
+            return None
         cursor.execute("SELECT match_type_id FROM dim_match_types WHERE match_type = ?", (match_type,))
         row = cursor.fetchone()
         return row[0] if row else None
     
     def parse_score(self, score_text):
-        if not score_text:
-            return None, None, None
-        
-        match = re.search(r'(\d+)/(\d+)\s*\(?([\d.]+)?\s*[Oo]v\)?', str(score_text))
-        if match:
-            return int(match.group(1)), int(match.group(2)), float(match.group(3)) if match.group(3) else None
-        
-        match = re.search(r'(\d+)', str(score_text))
-        if match:
-            return int(match.group(1)), None, None
-        
-        return None, None, None
+        return parse_score(score_text)
     
     def parse_batting_stats(self, entry):
-        runs = self._safe_int(entry.get('runs', 0))
-        balls = self._safe_int(entry.get('balls', 0))
-        fours = self._safe_int(entry.get('fours', entry.get('4s', 0)))
-        sixes = self._safe_int(entry.get('sixes', entry.get('6s', 0)))
-        sr = self._safe_float(entry.get('strike_rate', entry.get('sr', 0)))
-        
-        dismissal = entry.get('dismissal', '')
-        is_not_out = 'not out' in str(dismissal).lower() if dismissal else False
-        
-        return runs, balls, fours, sixes, sr, is_not_out, dismissal
+        return parse_batting_stats(entry)
     
     def parse_bowling_stats(self, entry):
-        overs = self._safe_float(entry.get('overs', 0))
-        maidens = self._safe_int(entry.get('maidens', 0))
-        runs = self._safe_int(entry.get('runs', 0))
-        wickets = self._safe_int(entry.get('wickets', 0))
-        economy = self._safe_float(entry.get('economy', 0))
-        return overs, maidens, runs, wickets, economy
+        return parse_bowling_stats(entry)
     
     def _safe_int(self, val):
-        try:
-            return int(val)
-        except:
-            return 0
+        return _safe_int(val)
     
     def _safe_float(self, val):
-        try:
-            return float(val)
-        except:
-            return 0.0
+        return _safe_float(val)
     
-    def load_json_data(self, json_path):
+    def load_json_data(self, json_path, workers=LOAD_WORKERS, batch_size=LOAD_BATCH_SIZE):
         cursor = self.connect()
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            matches = json.load(f)
+        # JSON or .msgpack records, whichever the scraper wrote
+        with metrics.span("load.read_matches"):
+            matches = read_matches(json_path)
         
         print(f"Loading {len(matches)} matches...")
-        loaded, skipped = 0, 0
+        self.load_matches(cursor, matches, json_path, workers, batch_size)
+        self.write_rescrape_list(cursor)
+    
+    def load_matches(self, cursor, matches, source, workers=LOAD_WORKERS, batch_size=LOAD_BATCH_SIZE):
+        loaded, skipped, backfilled = 0, 0, 0
+        self._load_player_index(cursor)
+        self._load_team_index(cursor)
         
-        for match in matches:
-            match_info = match.get('match_info', {})
-            playing_11 = match.get('playing_11', {})
-            scorecard = match.get('scorecard', [])
-            
-            match_key = match.get('match_url', f"{match_info.get('team1_name')}_{match_info.get('team2_name')}_{match.get('match_title')}")
-            match_title = match.get('match_title', match_info.get('match_title', 'Unknown'))
-            
-            # Skip duplicates
-            cursor.execute("SELECT match_id FROM fact_matches WHERE match_key = ?", (match_key,))
-            if cursor.fetchone():
+        # Transform runs in worker processes, this connection is the only writer
+        for rows in iter_transformed(matches, workers):
+            with metrics.span("load.write_match"):
+                written = self._write_match(cursor, rows)
+            if written:
+                loaded += 1
+                if loaded % batch_size == 0:
+                    with metrics.span("load.commit"):
+                        self.conn.commit()
+            else:
                 skipped += 1
-                continue
-            
-            # Get dimension IDs
-            team1_id = self.get_or_create_team(cursor, match_info.get('team1_name'))
-            team2_id = self.get_or_create_team(cursor, match_info.get('team2_name'))
-            winner_id = self.get_or_create_team(cursor, match_info.get('winner'))
-            venue_id = self.get_or_create_venue(cursor, match_info.get('venue'))
-            match_type_id = self.get_match_type_id(cursor, match.get('match_title', ''))
-            
-            # Parse scores
-            t1_runs, t1_wkts, t1_overs = self.parse_score(match_info.get('team1_score'))
-            t2_runs, t2_wkts, t2_overs = self.parse_score(match_info.get('team2_score'))
+                backfilled += self._backfill_date(cursor, rows)
+        
+        if loaded or backfilled:
+            self.record_load(cursor, source, loaded)
+        with metrics.span("load.commit"):
+            self.conn.commit()
+        metrics.count("load.matches_loaded", loaded)
+        metrics.count("load.matches_skipped", skipped)
+        metrics.count("load.dates_backfilled", backfilled)
+        print(f"Loaded: {loaded}, Skipped: {skipped}" + (f", Dates backfilled: {backfilled}" if backfilled else ""))
+        return loaded, skipped
+    
+    def _backfill_date(self, cursor, rows):
+        # Matches loaded before dim_dates existed get their date when the JSON is loaded again
+        if not rows["match_date"]:
+            return 0
+        cursor.execute("UPDATE fact_matches SET date_id = ? WHERE match_key = ? AND date_id IS NULL",
+                       (rows["match_date"][0], rows["match_key"]))
+        updated = cursor.rowcount
+        if updated:
+            self.get_or_create_date(cursor, rows["match_date"])
+        return updated
+    
+    def rescrape_list(self, cursor):
+        # {match_url: [sections]} of every match with a failed check
+        cursor.execute("""
+            SELECT DISTINCT m.match_key, f.section
+            FROM etl_validation_flags f JOIN fact_matches m ON m.match_id = f.match_id
+            ORDER BY m.match_id, f.section
+        """)
+        pages = {}
+        for match_key, section in cursor.fetchall():
+            pages.setdefault(match_key, []).append(section)
+        return pages
+    
+    def write_rescrape_list(self, cursor, path=RESCRAPE_FILE):
+        pages = self.rescrape_list(cursor)
+        if pages or Path(path).exists():
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(pages, f, indent=4, ensure_ascii=False)
+        if pages:
+            print(f"Validation: {len(pages)} matches failed checks, pages to re-scrape in {path}")
+        return pages
+    
+    def _write_flags(self, cursor, match_id, flags):
+        cursor.execute("DELETE FROM etl_validation_flags WHERE match_id = ?", (match_id,))
+        cursor.executemany(
+            "INSERT INTO etl_validation_flags (match_id, section, check_name, part, detail) VALUES (?, ?, ?, ?, ?)",
+            [(match_id,) + flag for flag in flags]
+        )
+        metrics.count("load.validation_flags", len(flags))
+    
+    def record_load(self, cursor, source, matches_loaded):
+        cursor.execute("INSERT INTO etl_loads (source, matches_loaded) VALUES (?, ?)",
+                       (str(source), matches_loaded))
+    
+    def get_version(self, cursor=None):
+        cursor = cursor or self.conn.cursor()
+        try:
+            cursor.execute("SELECT COALESCE(MAX(load_id), 0) FROM etl_loads")
+        except sqlite3.OperationalError:
+            return 0
+        return cursor.fetchone()[0]
+    
+    def _write_match(self, cursor, rows):
+        # Skip duplicates unless this copy has fewer missing pages, or as many and fewer failed checks
+        cursor.execute("""
+            SELECT match_id, missing_sections,
+                   (SELECT COUNT(*) FROM etl_validation_flags f WHERE f.match_id = m.match_id)
+            FROM fact_matches m WHERE match_key = ?
+        """, (rows["match_key"],))
+        existing = cursor.fetchone()
+        match_id = None
+        if existing:
+            match_id, stored_missing, stored_flags = existing
+            if (_section_count(rows["missing_sections"]), len(rows["flags"])) >= (_section_count(stored_missing), stored_flags):
+                return False
+            if self._is_closed(cursor, match_id):
+                return False
+            self._delete_match(cursor, match_id)
+            cursor.execute("INSERT INTO etl_replacements (match_id) VALUES (?)", (match_id,))
+        
+        # Get dimension IDs
+        team1_id = self.get_or_create_team(cursor, rows["team1"])
+        team2_id = self.get_or_create_team(cursor, rows["team2"])
+        team_ids = {1: team1_id, 2: team2_id}
+        for slot, alias_name in rows["team_aliases"]:
+            self.add_team_alias(cursor, alias_name, team_ids[slot])
+        winner_id = self.get_or_create_team(cursor, rows["winner"])
+        venue_id = self.get_or_create_venue(cursor, rows["venue"])
+        match_type_id = self._match_type_id(cursor, rows["match_type"])
+        date_id = self.get_or_create_date(cursor, rows["match_date"])
+        
+        # Get POTM
+        potm_id = self.get_or_create_player(
+            cursor, rows["potm"], winner_id, rows["potm_profile_id"]
+        ) if rows["potm"] else None
+        
+        # Insert match
+        cursor.execute("""
+            INSERT INTO fact_matches (
+                match_id, match_key, match_title, team1_id, team2_id,
+                team1_score, team1_runs, team1_wickets, team1_overs,
+                team2_score, team2_runs, team2_wickets, team2_overs,
+                winner_id, result, potm_player_id, venue_id, match_type_id, missing_sections, date_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            match_id, rows["match_key"], rows["match_title"], team1_id, team2_id,
+            *rows["team1_score"], *rows["team2_score"],
+            winner_id, rows["result"], potm_id, venue_id, match_type_id, rows["missing_sections"], date_id
+        ))
+        match_id = cursor.lastrowid
+        self._index_name(cursor, "match", match_id, rows["match_title"])
+        if rows["flags"]:
+            self._write_flags(cursor, match_id, rows["flags"])
+        
+        playing_xi = []
+        for slot, player_name, designation, profile_id in rows["playing_xi"]:
+            team_id = team_ids[slot]
+            player_id = self.get_or_create_player(cursor, player_name, team_id, profile_id)
+            playing_xi.append((match_id, team_id, player_id, designation))
+        cursor.executemany("""
+            INSERT OR IGNORE INTO fact_playing_xi (match_id, team_id, player_id, designation)
+            VALUES (?, ?, ?, ?)
+        """, playing_xi)
+        
+        batting = []
+        for slot, player_name, profile_id, stats in rows["batting"]:
+            team_id = team_ids[slot]
+            player_id = self.get_or_create_player(cursor, player_name, team_id, profile_id)
+            batting.append((match_id, player_id, team_id) + stats)
+        cursor.executemany("""
+            INSERT INTO fact_batting (
+                match_id, player_id, team_id, innings_number, batting_position,
+                runs, balls, fours, sixes, strike_rate, dismissal_type, is_not_out
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, batting)
+        
+        bowling = []
+        for slot, player_name, profile_id, stats in rows["bowling"]:
+            team_id = team_ids[slot]
+            player_id = self.get_or_create_player(cursor, player_name, team_id, profile_id)
+            bowling.append((match_id, player_id, team_id) + stats)
+        cursor.executemany("""
+            INSERT INTO fact_bowling (
+                match_id, player_id, team_id, innings_number,
+                overs, maidens, runs_conceded, wickets, economy
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, bowling)
+        
+        # A Test has thousands of deliveries but only ~22 distinct players
+        player_ids = {}
+        deliveries = []
+        for bowler, batter, stats in rows["deliveries"]:
+            for player in (bowler, batter):
+                if player not in player_ids:
+                    slot, profile_id, player_name = player
+                    player_ids[player] = self.get_or_create_player(cursor, player_name, team_ids[slot], profile_id)
+            deliveries.append((match_id,) + stats[:4] + (player_ids[bowler], player_ids[batter]) + stats[4:])
+        cursor.executemany("""
+            INSERT OR IGNORE INTO fact_deliveries (
+                match_id, innings_number, over_number, ball_seq, ball_number, bowler_id, batter_id,
+                runs_batter, runs_extras, extra_type, is_wicket
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, deliveries)
+        
+        self._write_player_aliases(cursor, rows, team_ids)
+        return True
+    
+    def upsert_live_match(self, match_data, scorecard_unchanged=False):
+        # Writes only the fact rows that changed since the last poll of a live match;
+        # scorecard_unchanged says this call's scorecard page matched the last fetch
+        cursor = self.conn.cursor() if self.conn else self.connect()
+        rows = transform_match(match_data)
+        
+        cursor.execute("SELECT match_id FROM fact_matches WHERE match_key = ?", (rows["match_key"],))
+        existing = cursor.fetchone()
+        if existing is None:
+            self._write_match(cursor, rows)
+            self.record_load(cursor, f"live:{rows['match_key']}", 1)
+            self.conn.commit()
+            return True
+        
+        match_id = existing[0]
+        changed = self._update_match_scores(cursor, match_id, rows)
+        if scorecard_unchanged:
+            # Same scorecard page as the last fetch, so the innings rows cannot differ
+            if changed:
+                self.record_load(cursor, f"live:{rows['match_key']}", 1)
+            self.conn.commit()
+            return changed > 0
+        
+        team_ids = self._match_team_ids(cursor, match_id)
+        changed += self._upsert_innings_rows(
+            cursor, match_id, team_ids, rows["batting"], "fact_batting", "batting_id",
+            ["runs", "balls", "fours", "sixes", "strike_rate", "dismissal_type", "is_not_out"],
+            key_column="batting_position"
+        )
+        changed += self._upsert_innings_rows(
+            cursor, match_id, team_ids, rows["bowling"], "fact_bowling", "bowling_id",
+            ["overs", "maidens", "runs_conceded", "wickets", "economy"]
+        )
+        self._write_player_aliases(cursor, rows, team_ids)
+        
+        if changed:
+            self._write_flags(cursor, match_id, rows["flags"])
+            self.record_load(cursor, f"live:{rows['match_key']}", 1)
+        self.conn.commit()
+        return changed > 0
+    
+    def _match_team_ids(self, cursor, match_id):
+        cursor.execute("SELECT team1_id, team2_id FROM fact_matches WHERE match_id = ?", (match_id,))
+        team1_id, team2_id = cursor.fetchone()
+        return {1: team1_id, 2: team2_id}
+    
+    def _update_match_scores(self, cursor, match_id, rows):
+        winner_id = self.get_or_create_team(cursor, rows["winner"])
+        values = (*rows["team1_score"], *rows["team2_score"], winner_id, rows["result"])
+        cursor.execute("""
+            UPDATE fact_matches SET
+                team1_score = ?, team1_runs = ?, team1_wickets = ?, team1_overs = ?,
+                team2_score = ?, team2_runs = ?, team2_wickets = ?, team2_overs = ?,
+                winner_id = ?, result = ?
+            WHERE match_id = ? AND NOT (
+                team1_score IS ? AND team1_runs IS ? AND team1_wickets IS ? AND team1_overs IS ? AND
+                team2_score IS ? AND team2_runs IS ? AND team2_wickets IS ? AND team2_overs IS ? AND
+                winner_id IS ? AND result IS ?
+            )
+        """, values + (match_id,) + values)
+        return cursor.rowcount
+    
+    def _upsert_innings_rows(self, cursor, match_id, team_ids, new_rows, table, id_column,
+                             stat_columns, key_column=None):
+        # Rows are keyed by (innings, batting position) or (innings, player); only
+        # rows whose values differ are updated, inserted or deleted.
+        key_sql = key_column or "player_id"
+        cursor.execute(
+            f"SELECT {id_column}, innings_number, {key_sql}, player_id, team_id, {', '.join(stat_columns)} "
+            f"FROM {table} WHERE match_id = ?", (match_id,)
+        )
+        stored = {(row[1], row[2]): (row[0], tuple(row[3:])) for row in cursor.fetchall()}
+        
+        wanted = {}
+        for slot, player_name, profile_id, stats in new_rows:
+            team_id = team_ids[slot]
+            player_id = self.get_or_create_player(cursor, player_name, team_id, profile_id)
+            innings = stats[0]
+            if key_column:
+                key, values = (innings, stats[1]), stats[2:]
+            else:
+                key, values = (innings, player_id), stats[1:]
+            wanted[key] = (player_id, team_id) + tuple(values)
+        
+        changed = 0
+        columns = ["player_id", "team_id"] + stat_columns
+        for key, values in wanted.items():
+            if key in stored:
+                row_id, old_values = stored[key]
+                if old_values == values:
+                    continue
+                cursor.execute(
+                    f"UPDATE {table} SET {', '.join(c + ' = ?' for c in columns)} WHERE {id_column} = ?",
+                    values + (row_id,)
+                )
+            else:
+                key_columns = ["innings_number"] + ([key_column] if key_column else [])
+                key_values = key if key_column else key[:1]
+                all_columns = ["match_id"] + key_columns + columns
+                cursor.execute(
+                    f"INSERT INTO {table} ({', '.join(all_columns)}) VALUES ({', '.join('?' * len(all_columns))})",
+                    (match_id,) + tuple(key_values) + values
+                )
+            changed += 1
+        
+        for key, (row_id, _) in stored.items():
+            if key not in wanted:
+                cursor.execute(f"DELETE FROM {table} WHERE {id_column} = ?", (row_id,))
+                changed += 1
+        return changed
+    
+    def _is_closed(self, cursor, match_id):
+        # A match whose season has been moved to a read-only shard is never replaced
+        cursor.execute(f"""
+            SELECT 1 FROM fact_matches m
+            JOIN dim_dates d ON d.date_id = m.date_id
+            JOIN etl_shards s ON {SEASON_YEAR_SQL} BETWEEN s.first_year AND s.first_year + s.span_years - 1
+            WHERE m.match_id = ?
+        """, (match_id,))
+        return cursor.fetchone() is not None
+    
+    def close_seasons(self, keep=SHARD_KEEP_OPEN, span=SHARD_SPAN_YEARS):
+        # Closes every season year but the latest `keep`, a shard of `span` years at a time
+        cursor = self.connect()
+        cursor.execute(f"""
+            SELECT DISTINCT {SEASON_YEAR_SQL} FROM fact_matches m JOIN dim_dates d ON d.date_id = m.date_id
+            ORDER BY 1
+        """)
+        years = [row[0] for row in cursor.fetchall()]
+        open_years = set(years[-keep:]) if keep else set()
+        closed = {first_year for first_year, *_ in read_shards(self.conn)}
+        
+        shards = []
+        for first_year in sorted({year - year % span for year in years}):
+            covered = set(range(first_year, first_year + span))
+            if first_year not in closed and not covered & open_years:
+                shards.append(self.close_shard(first_year, span))
+        return shards
+    
+    def close_shard(self, first_year, span=SHARD_SPAN_YEARS):
+        # Moves the per-innings facts of `span` season years from `first_year` into
+        # their own file, then compacts it and makes it read-only
+        cursor = self.connect()
+        shards = read_shards(self.conn)
+        if any(first_year == shard[0] for shard in shards):
+            raise ValueError(f"season {shard_label(first_year, span)} is already closed")
+        limit = self.conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        if len(shards) >= limit:
+            raise ValueError(f"SQLite attaches at most {limit} files; raise SHARD_SPAN_YEARS for wider shards")
+        
+        season_matches = f"""
+            SELECT m.match_id FROM fact_matches m JOIN dim_dates d ON d.date_id = m.date_id
+            WHERE {SEASON_YEAR_SQL} BETWEEN {int(first_year)} AND {int(first_year + span - 1)}
+        """
+        cursor.execute(f"SELECT MIN(date_id), MAX(date_id), COUNT(*) FROM fact_matches WHERE match_id IN ({season_matches})")
+        first_date_id, last_date_id, matches = cursor.fetchone()
+        if not matches:
+            raise ValueError(f"no matches in season {shard_label(first_year, span)}")
+        
+        path = shard_path(self.db_path, first_year, span)
+        if path.exists():
+            # Left over from an attempt that never committed
+            os.chmod(path, 0o644)
+            path.unlink()
+        schema = shard_schema(first_year)
+        cursor.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+        try:
+            fact_rows = 0
+            for table in SHARDED_TABLES:
+                cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+                cursor.execute(re.sub(rf"\b{table}\b", f"{schema}.{table}", cursor.fetchone()[0], count=1))
+                cursor.execute(f"INSERT INTO {schema}.{table} SELECT * FROM main.{table} "
+                               f"WHERE match_id IN ({season_matches})")
+                fact_rows += cursor.rowcount
+                cursor.execute(f"DELETE FROM main.{table} WHERE match_id IN ({season_matches})")
             
-            # Get POTM
-            potm_name = match_info.get('player_of_match', '')
-            potm_id = self.get_or_create_player(cursor, potm_name, winner_id) if potm_name else None
+            # Indexes are built once over the copied rows
+            cursor.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN (%s)"
+                % ", ".join("?" * len(SHARDED_TABLES)), SHARDED_TABLES
+            )
+            for name, sql in cursor.fetchall():
+                cursor.execute(re.sub(rf"\b{name}\b", f"{schema}.{name}", sql, count=1))
             
-            # Insert match
             cursor.execute("""
-                INSERT INTO fact_matches (
-                    match_key, match_title, team1_id, team2_id,
-                    team1_score, team1_runs, team1_wickets, team1_overs,
-                    team2_score, team2_runs, team2_wickets, team2_overs,
-                    winner_id, result, potm_player_id, venue_id, match_type_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                match_key, match_title, team1_id, team2_id,
-                match_info.get('team1_score'), t1_runs, t1_wkts, t1_overs,
-                match_info.get('team2_score'), t2_runs, t2_wkts, t2_overs,
-                winner_id, match_info.get('result'), potm_id, venue_id, match_type_id
-            ))
-            match_id = cursor.lastrowid
-            
-            # Build player-team mapping from Playing XI
-            player_team_map = {}
-            
-            for team_key in ['team1', 'team2']:
-                team_id = team1_id if team_key == 'team1' else team2_id
-                team_data = playing_11.get(team_key, {})
-                
-                players = team_data.get('players', []) if isinstance(team_data, dict) else (team_data if isinstance(team_data, list) else [])
-                
-                for player_entry in players:
-                    if isinstance(player_entry, dict):
-                        player_name = player_entry.get('name', '')
-                        designation = player_entry.get('designation', 'Player')
-                    else:
-                        player_name = str(player_entry) if player_entry else ''
-                        designation = 'Player'
-                    
-                    if player_name:
-                        player_team_map[player_name.strip().lower()] = team_id
-                        player_id = self.get_or_create_player(cursor, player_name, team_id)
-                        cursor.execute("""
-                            INSERT OR IGNORE INTO fact_playing_xi (match_id, team_id, player_id, designation)
-                            VALUES (?, ?, ?, ?)
-                        """, (match_id, team_id, player_id, designation))
-            
-            # Load batting data
-            for inn_idx, innings in enumerate(scorecard, 1):
-                for bat_pos, bat_entry in enumerate(innings.get('batting', []), 1):
-                    player_name = bat_entry.get('batsman', bat_entry.get('player', ''))
-                    if not player_name:
-                        continue
-                    
-                    player_key = player_name.strip().lower()
-                    bat_team_id = player_team_map.get(player_key, team1_id if inn_idx % 2 == 1 else team2_id)
-                    player_id = self.get_or_create_player(cursor, player_name, bat_team_id)
-                    
-                    runs, balls, fours, sixes, sr, is_not_out, dismissal = self.parse_batting_stats(bat_entry)
-                    
-                    cursor.execute("""
-                        INSERT INTO fact_batting (
-                            match_id, player_id, team_id, innings_number, batting_position,
-                            runs, balls, fours, sixes, strike_rate, dismissal_type, is_not_out
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (match_id, player_id, bat_team_id, inn_idx, bat_pos,
-                          runs, balls, fours, sixes, sr, dismissal, is_not_out))
-            
-            # Load bowling data
-            for inn_idx, innings in enumerate(scorecard, 1):
-                for bowl_entry in innings.get('bowling', []):
-                    player_name = bowl_entry.get('bowler', bowl_entry.get('player', ''))
-                    if not player_name:
-                        continue
-                    
-                    player_key = player_name.strip().lower()
-                    bowl_team_id = player_team_map.get(player_key, team2_id if inn_idx % 2 == 1 else team1_id)
-                    player_id = self.get_or_create_player(cursor, player_name, bowl_team_id)
-                    
-                    overs, maidens, runs, wickets, economy = self.parse_bowling_stats(bowl_entry)
-                    
-                    cursor.execute("""
-                        INSERT INTO fact_bowling (
-                            match_id, player_id, team_id, innings_number,
-                            overs, maidens, runs_conceded, wickets, economy
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (match_id, player_id, bowl_team_id, inn_idx,
-                          overs, maidens, runs, wickets, economy))
-            
-            loaded += 1
+                INSERT INTO etl_shards (first_year, span_years, path, first_date_id, last_date_id, matches, fact_rows)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (first_year, span, path.name, first_date_id, last_date_id, matches, fact_rows))
+            self.record_load(cursor, f"close:{shard_label(first_year, span)}", 0)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            cursor.execute(f"DETACH DATABASE {schema}")
+            path.unlink(missing_ok=True)
+            raise
+        cursor.execute(f"DETACH DATABASE {schema}")
         
-        self.conn.commit()
-        print(f"Loaded: {loaded}, Skipped: {skipped}")
+        # Closed seasons are not written again: compact the file and drop write permission
+        shard = sqlite3.connect(path)
+        shard.execute("VACUUM")
+        shard.close()
+        os.chmod(path, 0o444)
+        print(f"Closed season {shard_label(first_year, span)}: {matches:,} matches, "
+              f"{fact_rows:,} rows -> {path.name}")
+        return {"season": shard_label(first_year, span), "path": str(path), "matches": matches,
+                "fact_rows": fact_rows, "bytes": path.stat().st_size}
+    
+    def export_snapshot(self, out_dir=EXPORT_DIR, file_format=None, batch_rows=EXPORT_BATCH_ROWS, full=False):
+        # Columnar files of every table; snapshot imports pyarrow, so only when asked
+        from snapshot import SnapshotExporter
+        
+        return SnapshotExporter(self.db_path, out_dir, file_format, batch_rows).export(full)
+    
+    def _delete_match(self, cursor, match_id):
+        for table in ("fact_batting", "fact_bowling", "fact_playing_xi", "fact_deliveries",
+                      "etl_validation_flags", "fact_matches"):
+            cursor.execute(f"DELETE FROM {table} WHERE match_id = ?", (match_id,))
+        cursor.execute("DELETE FROM search_index WHERE rowid = ?",
+                       (match_id * len(SEARCH_KINDS) + SEARCH_KINDS["match"],))
     
     def print_summary(self):
         cursor = self.connect()
@@ -419,17 +1345,32 @@ class CricketDataWarehouse:
         tables = [
             ('dim_teams', 'Teams'),
             ('dim_players', 'Players'),
+            ('dim_player_aliases', 'Player Aliases'),
+            ('dim_team_aliases', 'Team Aliases'),
             ('dim_venues', 'Venues'),
+            ('dim_dates', 'Dates'),
             ('fact_matches', 'Matches'),
             ('fact_batting', 'Batting Records'),
             ('fact_bowling', 'Bowling Records'),
-            ('fact_playing_xi', 'Playing XI Records')
+            ('fact_playing_xi', 'Playing XI Records'),
+            ('fact_deliveries', 'Deliveries'),
+            ('etl_validation_flags', 'Validation Flags')
         ]
         
+        # Sharded tables are counted across main and every closed season's file
+        shards = attach_shards(self.conn, self.db_path)
+        # A warehouse from an older version may predate a table until its next load
+        cursor.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")
+        existing = {row[0] for row in cursor.fetchall()}
         for table, label in tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            count = cursor.fetchone()[0]
+            if table not in existing:
+                continue
+            schemas = ["main"] + [schema for schema, _, _ in shards] if table in SHARDED_TABLES else ["main"]
+            count = sum(cursor.execute(f"SELECT COUNT(*) FROM {schema}.{table}").fetchone()[0]
+                        for schema in schemas)
             print(f"  {label:25}: {count:,}")
+        if shards:
+            print(f"  {'Closed Season Files':25}: {len(shards):,}")
         
         print("="*50)
 
@@ -453,6 +1394,7 @@ def main():
         return
     
     warehouse.close()
+    metrics.write_all()
     print("\nData warehouse ready")
 
 
@@ -1,8 +1,48 @@
 # WebDriver management
 
+import threading
 from selenium import webdriver
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
-from config import PAGE_LOAD_TIMEOUT, WEBDRIVER_WAIT
+from config import (
+    PAGE_LOAD_TIMEOUT, WEBDRIVER_WAIT, DRIVER_RECYCLE_NAVIGATIONS, DRIVER_RECYCLE_RSS_MB,
+    DRIVER_WARM_STANDBY, DRIVER_STANDBY_LEAD
+)
+from metrics import metrics
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Error text Chrome/chromedriver give once the browser behind a session is gone
+DEAD_SESSION_MARKERS = [
+    "invalid session id", "session deleted", "chrome not reachable", "disconnected",
+    "no such window", "target window already closed", "connection refused", "max retries exceeded"
+]
+
+
+def is_dead_session(error):
+    if isinstance(error, InvalidSessionIdException):
+        return True
+    return any(marker in str(error).lower() for marker in DEAD_SESSION_MARKERS)
+
+
+class ManagedDriver:
+    # Stands in for the WebDriver so callers keep working across browser restarts
+    
+    def __init__(self, manager):
+        self._manager = manager
+    
+    def get(self, url):
+        self._manager.navigate(url)
+    
+    def open_tabs(self, urls):
+        return self._manager.open_tabs(urls)
+    
+    def __getattr__(self, name):
+        return getattr(self._manager.driver, name)
 
 
 class DriverManager:
@@ -10,32 +50,146 @@ class DriverManager:
     def __init__(self):
         self.driver = None
         self.wait = None
+        self.proxy = ManagedDriver(self)
+        self.headless = False
+        self.navigations = 0
+        self._standby = None
+        self._standby_thread = None
+        self._standby_failed = False
     
-    def setup(self, headless=False):
+    def _create_driver(self):
         options = webdriver.ChromeOptions()
         options.add_argument("--start-maximized")
         options.add_argument("--disable-blink-features=AutomationControlled")
         options.add_argument("--disable-gpu")
         options.add_argument("--no-sandbox")
-        if headless:
+        if self.headless:
             options.add_argument("--headless=new")
         options.page_load_strategy = "eager"
         
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
-        self.wait = WebDriverWait(self.driver, WEBDRIVER_WAIT)
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        return driver
+    
+    def setup(self, headless=False):
+        self.headless = headless
+        self.driver = self._create_driver()
+        self.navigations = 0
+        self._standby_failed = False
+        self.wait = WebDriverWait(self.proxy, WEBDRIVER_WAIT)
+        
+        return self.proxy, self.wait
+    
+    def navigate(self, url):
+        self._maybe_recycle()
+        try:
+            self.driver.get(url)
+        except WebDriverException as e:
+            if not is_dead_session(e):
+                raise
+            print(f"    Browser session lost ({str(e).strip()[:50]}), restarting")
+            metrics.count("driver.dead_session")
+            self._swap()
+            self.driver.get(url)
+        self.navigations += 1
+    
+    def open_tabs(self, urls):
+        # window.open returns at once, so the pages load side by side in one browser.
+        # Recycling is checked first so a swap never strands open tabs; the main
+        # window's handle is read after it, so it belongs to the browser in use.
+        # Returns (main handle, one handle per url).
+        self._maybe_recycle()
+        main_window = self.driver.current_window_handle
+        handles = []
+        with metrics.span("driver.open_tabs"):
+            for url in urls:
+                known = set(self.driver.window_handles)
+                self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+                handles.append(next(h for h in self.driver.window_handles if h not in known))
+        self.navigations += len(urls)
+        return main_window, handles
+    
+    def _maybe_recycle(self):
+        if DRIVER_WARM_STANDBY and self.navigations >= DRIVER_RECYCLE_NAVIGATIONS - DRIVER_STANDBY_LEAD:
+            self._start_standby()
         
-        return self.driver, self.wait
+        if self.navigations >= DRIVER_RECYCLE_NAVIGATIONS:
+            reason = f"{self.navigations} navigations"
+        elif DRIVER_RECYCLE_RSS_MB and self.navigations % 10 == 0 and self.browser_rss_mb() > DRIVER_RECYCLE_RSS_MB:
+            reason = f"{self.browser_rss_mb():.0f} MB RSS"
+        else:
+            return
+        print(f"    Recycling browser after {reason}")
+        metrics.count("driver.recycled")
+        self._swap()
+    
+    def browser_rss_mb(self):
+        # chromedriver plus every Chrome process it spawned
+        if psutil is None or self.driver is None:
+            return 0
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            procs = [root] + root.children(recursive=True)
+            return sum(p.memory_info().rss for p in procs) / (1024 * 1024)
+        except Exception:
+            return 0
+    
+    def _start_standby(self):
+        # One failed start turns the standby off for the session; otherwise every
+        # navigation before the recycle would wait out another start-up timeout
+        if self._standby is not None or self._standby_thread is not None or self._standby_failed:
+            return
+        
+        def warm():
+            try:
+                self._standby = self._create_driver()
+            except Exception as e:
+                self._standby_failed = True
+                metrics.count("driver.standby_failed")
+                print(f"    Could not start standby browser, recycling cold from now on: {e}")
+            finally:
+                self._standby_thread = None
+        
+        self._standby_thread = threading.Thread(target=warm, daemon=True)
+        self._standby_thread.start()
+    
+    def _swap(self):
+        old = self.driver
+        thread = self._standby_thread
+        if thread is not None:
+            thread.join()
+        
+        with metrics.span("driver.swap"):
+            if self._standby is not None:
+                self.driver, self._standby = self._standby, None
+            else:
+                self.driver = self._create_driver()
+        self.navigations = 0
+        
+        if old is not None:
+            # Closing Chrome can take seconds, keep it off the critical path
+            threading.Thread(target=self._quit_quietly, args=(old,), daemon=True).start()
+    
+    def _quit_quietly(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
     
     def quit(self):
+        if self._standby_thread is not None:
+            self._standby_thread.join()
+        if self._standby:
+            self._quit_quietly(self._standby)
+            self._standby = None
         if self.driver:
-            self.driver.quit()
+            self._quit_quietly(self.driver)
             self.driver = None
             self.wait = None
     
     def get(self, url):
         if self.driver:
-            self.driver.get(url)
+            self.navigate(url)
     
     def get_page_source(self):
         if self.driver:
@@ -1,23 +1,50 @@
 # Extractors package
 
+from . import match_info, playing_xi, scorecard, commentary
+
 from .match_info import (
     create_empty_match_data,
     extract_title_and_teams,
     extract_scores,
     extract_result,
     extract_player_of_match,
-    extract_match_facts
+    extract_match_facts,
+    parse_match_facts
+)
+from .playing_xi import extract_playing_xi, parse_playing_xi
+from .scorecard import extract_scorecard, parse_scorecard_lines
+from .commentary import (
+    extract_commentary,
+    load_full_commentary,
+    expand_commentary,
+    parse_commentary_lines,
+    EXTRA_TYPES
 )
-from .playing_xi import extract_playing_xi
-from .scorecard import extract_scorecard
+
+# Every extractor with the page it reads and the match_data fields it fills
+EXTRACTORS = {
+    **match_info.EXTRACTORS,
+    **playing_xi.EXTRACTORS,
+    **scorecard.EXTRACTORS,
+    **commentary.EXTRACTORS
+}
 
 __all__ = [
+    'EXTRACTORS',
     'create_empty_match_data',
     'extract_title_and_teams',
     'extract_scores',
     'extract_result',
     'extract_player_of_match',
     'extract_match_facts',
+    'parse_match_facts',
     'extract_playing_xi',
-    'extract_scorecard'
+    'parse_playing_xi',
+    'extract_scorecard',
+    'parse_scorecard_lines',
+    'extract_commentary',
+    'load_full_commentary',
+    'expand_commentary',
+    'parse_commentary_lines',
+    'EXTRA_TYPES'
 ]
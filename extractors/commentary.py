@@ -0,0 +1,144 @@
+# Commentary extractor - ball-by-ball deliveries from the full commentary page
+
+import re
+import time
+from selenium.webdriver.common.by import By
+
+from config import WAIT_TIME, COMMENTARY_MAX_PAGES, COMMENTARY_PAGE_WAIT
+from metrics import metrics
+
+
+BALL_RE = re.compile(r"^(\d{1,3})\.(\d)$")
+DELIVERY_RE = re.compile(r"^(.+?) to (.+?), (.+)$")
+RUNS_RE = re.compile(r"^(\d+) runs?$")
+EXTRA_RE = re.compile(r"^(\d+ )?(wides?|no balls?|leg byes?|byes?)$")
+LOAD_MORE_XPATH = "//*[contains(text(), 'Load More')]"
+
+# Integer codes stored in deliveries and fact_deliveries.extra_type
+EXTRA_TYPES = {"wide": 1, "no ball": 2, "bye": 3, "leg bye": 4}
+BOUNDARY_RUNS = {"four": 4, "six": 6, "no run": 0}
+
+EXTRACTORS = {
+    "commentary": ("commentary", ("commentary",), ())
+}
+
+
+def commentary_url(match_url):
+    return match_url.replace("live-cricket-scores", "live-cricket-full-commentary")
+
+
+def extract_commentary(driver, match_url, match_data):
+    page_text = load_full_commentary(driver, commentary_url(match_url))
+    lines = [l.strip() for l in page_text.split('\n') if l.strip()]
+
+    with metrics.span("parse.commentary_lines", "commentary"):
+        parse_commentary_lines(lines, match_data)
+
+
+def load_full_commentary(driver, url):
+    # The feed opens on the latest overs; each "Load More" appends older ones
+    with metrics.span("driver.get", "commentary"):
+        driver.get(url)
+    with metrics.span("sleep", "commentary"):
+        time.sleep(WAIT_TIME)
+    return expand_commentary(driver)
+
+
+def expand_commentary(driver):
+    # Clicks "Load More" on the open commentary page until no older balls appear
+    with metrics.span("page.text", "commentary"):
+        page_text = driver.find_element(By.TAG_NAME, "body").text
+    balls = _count_balls(page_text)
+    for _ in range(COMMENTARY_MAX_PAGES):
+        buttons = driver.find_elements(By.XPATH, LOAD_MORE_XPATH)
+        if not buttons:
+            break
+        try:
+            with metrics.span("commentary.load_more", "commentary"):
+                buttons[0].click()
+                time.sleep(COMMENTARY_PAGE_WAIT)
+        except Exception:
+            break
+
+        with metrics.span("page.text", "commentary"):
+            page_text = driver.find_element(By.TAG_NAME, "body").text
+        loaded = _count_balls(page_text)
+        if loaded == balls:
+            break
+        balls = loaded
+
+    metrics.count("commentary.deliveries_loaded", balls)
+    return page_text
+
+
+def _count_balls(page_text):
+    return sum(1 for line in page_text.split('\n') if BALL_RE.match(line.strip()))
+
+
+def parse_commentary_lines(lines, match_data):
+    # Lines run newest first; over numbers restarting mark an earlier innings
+    feed = []
+    for i, line in enumerate(lines[:-1]):
+        ball_match = BALL_RE.match(line)
+        delivery_match = DELIVERY_RE.match(lines[i + 1]) if ball_match else None
+        if delivery_match:
+            feed.append((int(ball_match.group(1)), int(ball_match.group(2)), delivery_match))
+
+    deliveries = []
+    innings, last_over, seq = 1, None, 0
+    for over, ball, delivery_match in reversed(feed):
+        if last_over is not None and over < last_over:
+            innings += 1
+        seq = seq + 1 if over == last_over else 1
+        last_over = over
+
+        runs, extras, extra_type, wicket = parse_outcome(delivery_match.group(3))
+        deliveries.append({
+            "innings": innings,
+            "over": over,
+            "ball": ball,
+            "seq": seq,
+            "bowler": delivery_match.group(1).strip(),
+            "batter": delivery_match.group(2).strip(),
+            "runs": runs,
+            "extras": extras,
+            "extra_type": extra_type,
+            "wicket": wicket
+        })
+
+    match_data["commentary"] = deliveries
+
+
+def parse_outcome(text):
+    # "FOUR, ...", "2 runs, ...", "wide, ...", "leg byes, 1 run, ...", "out Caught by X!! ..."
+    parts = [p.strip() for p in text.lower().split(",")[:2]]
+    runs, extras, extra_type, wicket = 0, 0, 0, 0
+
+    if parts[0].startswith("out"):
+        return runs, extras, extra_type, 1
+
+    extra_match = EXTRA_RE.match(parts[0])
+    if extra_match:
+        kind = extra_match.group(2).rstrip("s")
+        extra_type = EXTRA_TYPES[kind]
+        count = int(extra_match.group(1)) if extra_match.group(1) else 1
+        parts = parts[1:]
+        if kind in ("wide", "no ball"):
+            extras = count
+        elif parts:
+            extras = _runs(parts[0])
+            parts = []
+
+    if parts:
+        if parts[0].startswith("out"):
+            wicket = 1
+        else:
+            runs = _runs(parts[0])
+    return runs, extras, extra_type, wicket
+
+
+def _runs(token):
+    if token in BOUNDARY_RUNS:
+        return BOUNDARY_RUNS[token]
+    runs_match = RUNS_RE.match(token)
+    return int(runs_match.group(1)) if runs_match else 0
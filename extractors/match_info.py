@@ -6,9 +6,22 @@ from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 
 from config import WAIT_TIME, TEAM_ABBREVIATIONS
-from utils import (
-    is_valid_player_name, match_team_abbreviation, extract_score_from_text
-)
+from metrics import metrics
+from utils import TeamIndex, is_valid_player_name, extract_score_from_text
+
+
+# Built once per process; the squads extractor adds the headers it sees
+TEAMS = TeamIndex(TEAM_ABBREVIATIONS)
+
+
+# Extractor -> (page it reads, fields it fills, extractors that must run first)
+EXTRACTORS = {
+    "title_and_teams": ("scores", ("match_title", "team1_name", "team2_name"), ()),
+    "scores": ("scores", ("team1_score", "team2_score"), ("title_and_teams",)),
+    "result": ("scores", ("result", "winner"), ()),
+    "player_of_match": ("scores", ("player_of_match",), ()),
+    "match_facts": ("facts", ("venue", "date", "toss", "umpires", "match_referee"), ())
+}
 
 
 def create_empty_match_data(match_url):
@@ -33,7 +46,9 @@ def create_empty_match_data(match_url):
             "team1": {"name": "", "players": []},
             "team2": {"name": "", "players": []}
         },
-        "scorecard": []
+        "scorecard": [],
+        "commentary": [],
+        "missing_sections": []
     }
 
 
@@ -54,13 +69,12 @@ def extract_title_and_teams(driver, match_data):
         teams_part = title.split(",")[0]
         teams = teams_part.lower().replace(" vs ", " vs ").split(" vs ")
         if len(teams) >= 2:
-            match_data["match_info"]["team1_name"] = teams[0].strip().title()
-            match_data["match_info"]["team2_name"] = teams[1].strip().title()
+            match_data["match_info"]["team1_name"] = TEAMS.display(teams[0])
+            match_data["match_info"]["team2_name"] = TEAMS.display(teams[1])
 
 
 def extract_scores(lines, match_data):
-    team1_name = match_data["match_info"]["team1_name"]
-    team2_name = match_data["match_info"]["team2_name"]
+    slots = TEAMS.slots(match_data["match_info"]["team1_name"], match_data["match_info"]["team2_name"])
     
     for i, line in enumerate(lines):
         if re.match(r'^[A-Z][A-Z0-9a-z\s]{0,14}$', line) and i + 1 < len(lines):
@@ -70,9 +84,7 @@ def extract_scores(lines, match_data):
             score = extract_score_from_text(next_line)
             
             if score:
-                team_match = match_team_abbreviation(
-                    team_abbr, team1_name, team2_name, TEAM_ABBREVIATIONS
-                )
+                team_match = slots.get(TEAMS.resolve(team_abbr))
                 
                 if team_match == 'team1' and not match_data["match_info"]["team1_score"]:
                     match_data["match_info"]["team1_score"] = score
@@ -91,7 +103,7 @@ def extract_result(lines, match_data):
             if not match_data["match_info"]["result"]:
                 match_data["match_info"]["result"] = line.strip()
                 if " won by " in line_lower:
-                    match_data["match_info"]["winner"] = line.split(" won by ")[0].strip()
+                    match_data["match_info"]["winner"] = TEAMS.display(line.split(" won by ")[0])
             break
 
 
@@ -118,12 +130,19 @@ def extract_player_of_match(lines, match_data):
 
 def extract_match_facts(driver, match_url, match_data):
     info_url = match_url.replace("live-cricket-scores", "cricket-match-facts")
-    driver.get(info_url)
-    time.sleep(2)
+    with metrics.span("driver.get", "facts"):
+        driver.get(info_url)
+    with metrics.span("sleep", "facts"):
+        time.sleep(2)
     
-    page_text = driver.find_element(By.TAG_NAME, "body").text
+    with metrics.span("page.text", "facts"):
+        page_text = driver.find_element(By.TAG_NAME, "body").text
     lines = [l.strip() for l in page_text.split('\n') if l.strip()]
     
+    parse_match_facts(lines, match_data)
+
+
+def parse_match_facts(lines, match_data):
     for i, line in enumerate(lines):
         line_lower = line.lower()
         
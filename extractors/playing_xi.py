@@ -5,15 +5,34 @@ from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 
 from config import WAIT_TIME
-from utils import clean_player_name, get_designation, remove_markers, is_valid_player_name
+from .match_info import TEAMS
+from metrics import metrics
+from utils import (
+    clean_player_name, get_designation, remove_markers, is_valid_player_name, extract_profile_id
+)
+
+
+EXTRACTORS = {
+    "playing_xi": ("squads", ("playing_11",), ())
+}
 
 
 def extract_playing_xi(driver, match_url, match_data):
     squads_url = match_url.replace("live-cricket-scores", "cricket-match-squads")
-    driver.get(squads_url)
-    time.sleep(WAIT_TIME)
+    with metrics.span("driver.get", "squads"):
+        driver.get(squads_url)
+    with metrics.span("sleep", "squads"):
+        time.sleep(WAIT_TIME)
     
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    with metrics.span("page.source", "squads"):
+        page_source = driver.page_source
+    
+    parse_playing_xi(page_source, match_data)
+
+
+def parse_playing_xi(page_source, match_data):
+    with metrics.span("parse.soup", "squads"):
+        soup = BeautifulSoup(page_source, "html.parser")
     
     team_sections = soup.select("div.cb-col-50.cb-col")
     
@@ -38,7 +57,8 @@ def extract_playing_xi(driver, match_url, match_data):
                     seen_names.add(clean_name)
                     team_info["players"].append({
                         "name": clean_name,
-                        "designation": designation
+                        "designation": designation,
+                        "profile_id": extract_profile_id(link.get("href"))
                     })
         
         team_info["players"] = team_info["players"][:11]
@@ -67,7 +87,8 @@ def _extract_players_fallback(soup, match_data):
                 seen_names.add(clean_name)
                 all_players.append({
                     "name": clean_name,
-                    "designation": designation
+                    "designation": designation,
+                    "profile_id": extract_profile_id(link.get("href"))
                 })
     
     if len(all_players) >= 11:
@@ -79,12 +100,18 @@ def _extract_players_fallback(soup, match_data):
     return []
 
 
+def _team_name(header, match_name):
+    # The title's spelling wins; a header the index does not know becomes an alias of it
+    if header and match_name:
+        TEAMS.add(header, match_name)
+    return match_name or TEAMS.display(header)
+
+
 def _assign_teams(teams_data, match_data):
-    if len(teams_data) >= 2:
-        match_data["playing_11"]["team1"] = teams_data[0]
-        match_data["playing_11"]["team1"]["name"] = match_data["match_info"]["team1_name"] or teams_data[0]["name"]
-        match_data["playing_11"]["team2"] = teams_data[1]
-        match_data["playing_11"]["team2"]["name"] = match_data["match_info"]["team2_name"] or teams_data[1]["name"]
-    elif len(teams_data) == 1:
-        match_data["playing_11"]["team1"] = teams_data[0]
-        match_data["playing_11"]["team1"]["name"] = match_data["match_info"]["team1_name"] or teams_data[0]["name"]
+    for team_key, team_info in zip(("team1", "team2"), teams_data):
+        match_data["playing_11"][team_key] = team_info
+        header = team_info["name"]
+        team_info["name"] = _team_name(header, match_data["match_info"][f"{team_key}_name"])
+        # Kept so the loader, a separate process, learns the same alias
+        if header and header != team_info["name"]:
+            team_info["squad_header"] = header
@@ -2,22 +2,34 @@
 
 import re
 import time
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 
 from config import WAIT_TIME
+from metrics import metrics
 from utils import remove_markers, is_valid_player_name, parse_dismissal, is_numeric
 
 
+EXTRACTORS = {
+    "scorecard": ("scorecard", ("scorecard",), ())
+}
+
+
 def extract_scorecard(driver, match_url, match_data):
     scorecard_url = match_url.replace("live-cricket-scores", "live-cricket-scorecard")
-    driver.get(scorecard_url)
-    time.sleep(WAIT_TIME)
+    with metrics.span("driver.get", "scorecard"):
+        driver.get(scorecard_url)
+    with metrics.span("sleep", "scorecard"):
+        time.sleep(WAIT_TIME)
     
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    page_text = driver.find_element(By.TAG_NAME, "body").text
+    with metrics.span("page.text", "scorecard"):
+        page_text = driver.find_element(By.TAG_NAME, "body").text
     lines = [l.strip() for l in page_text.split('\n') if l.strip()]
     
+    with metrics.span("parse.scorecard_lines", "scorecard"):
+        parse_scorecard_lines(lines, match_data)
+
+
+def parse_scorecard_lines(lines, match_data):
     innings_headers = _find_innings_headers(lines)
     _fill_missing_scores(innings_headers, match_data)
     
@@ -60,6 +72,7 @@ def _parse_innings(lines, innings_num, batter_idx, innings_headers, bowler_indic
         "batting_team": "",
         "total_score": "",
         "total_overs": "",
+        "extras": "",
         "batting": [],
         "bowling": []
     }
@@ -76,6 +89,7 @@ def _parse_innings(lines, innings_num, batter_idx, innings_headers, bowler_indic
     innings_info["batting"] = _parse_batting(lines, batter_idx)
     
     bowling_idx = _find_bowling_index(batter_idx, bowler_indices)
+    innings_info["extras"] = _parse_extras(lines, batter_idx, bowling_idx or len(lines))
     if bowling_idx:
         innings_info["bowling"] = _parse_bowling(lines, bowling_idx)
     
@@ -147,6 +161,15 @@ def _parse_batting_entry(lines, start_idx):
     }
 
 
+def _parse_extras(lines, batter_idx, end_idx):
+    # "Extras" is followed by the count, e.g. "12" or "12 (b 0, lb 3, w 8, nb 1, p 0)"
+    for i in range(batter_idx, min(end_idx, len(lines) - 1)):
+        if lines[i] == "Extras":
+            count = re.match(r'^(\d+)', lines[i + 1])
+            return count.group(1) if count else ""
+    return ""
+
+
 def _find_bowling_index(batter_idx, bowler_indices):
     for bi in bowler_indices:
         if bi > batter_idx:
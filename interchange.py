@@ -0,0 +1,124 @@
+# Match file formats - the scraper's output and the loader's input
+#
+# Indented JSON stays the default. A path ending in .msgpack holds one record per
+# match instead: a 4-byte big-endian length followed by the msgpack map. Batting
+# and bowling figures are stored as numbers rather than strings, so the loader
+# reads them typed, and records are decoded one at a time.
+
+import json
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+MSGPACK_SUFFIX = ".msgpack"
+MAGIC = b"CBMP\x01"
+LENGTH = struct.Struct(">I")
+
+# Scorecard fields the extractor fills with numeric text
+NUMERIC_FIELDS = {
+    "batting": ("runs", "balls", "fours", "sixes", "strike_rate"),
+    "bowling": ("overs", "maidens", "runs", "wickets", "economy")
+}
+
+
+def is_msgpack(path):
+    return str(path).endswith(MSGPACK_SUFFIX)
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise ImportError("the .msgpack format needs msgpack (pip install msgpack)")
+
+
+def _number(value):
+    # Only text that prints back unchanged is converted, so "07" or "12.50" stay strings
+    if not isinstance(value, str) or not value[-1:].isdigit():
+        return value
+    try:
+        number = int(value)
+    except ValueError:
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+    return number if str(number) == value else value
+
+
+def _convert_scorecard(match, convert):
+    # A converted copy; the caller's match is left as it was
+    if not match.get("scorecard"):
+        return match
+    scorecard = []
+    for innings in match["scorecard"]:
+        innings = dict(innings)
+        for section, fields in NUMERIC_FIELDS.items():
+            if innings.get(section):
+                innings[section] = [
+                    {key: convert(value) if key in fields else value for key, value in entry.items()}
+                    for entry in innings[section]
+                ]
+        scorecard.append(innings)
+    return {**match, "scorecard": scorecard}
+
+
+def typed(match):
+    return _convert_scorecard(match, _number)
+
+
+def untyped(match):
+    # Back to the extractor's strings, as written to JSON
+    return _convert_scorecard(match, lambda value: value if isinstance(value, str) else str(value))
+
+
+def write_matches(path, matches):
+    if not is_msgpack(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([untyped(match) for match in matches], f, indent=4, ensure_ascii=False)
+        return
+
+    _require_msgpack()
+    packer = msgpack.Packer(use_bin_type=True)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        for match in matches:
+            record = packer.pack(typed(match))
+            f.write(LENGTH.pack(len(record)))
+            f.write(record)
+
+
+def iter_matches(path):
+    if not is_msgpack(path):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+
+    _require_msgpack()
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a match record file")
+        while True:
+            header = f.read(LENGTH.size)
+            if not header:
+                return
+            if len(header) < LENGTH.size:
+                raise ValueError(f"{path} ends in a truncated record")
+            size, = LENGTH.unpack(header)
+            record = f.read(size)
+            if len(record) < size:
+                raise ValueError(f"{path} ends in a truncated record")
+            yield msgpack.unpackb(record, raw=False)
+
+
+def read_matches(path):
+    return list(iter_matches(path))
+
+
+def convert(source, target):
+    # Either direction; the target's suffix picks the format
+    matches = read_matches(source)
+    write_matches(target, matches)
+    return len(matches)
@@ -0,0 +1,165 @@
+# Live match tracker - polls in-progress matches and upserts changed rows
+
+import heapq
+import time
+from selenium.webdriver.common.by import By
+
+from config import (
+    DATABASE_FILE, HEADLESS, WAIT_TIME, LIVE_POLL_FAST, LIVE_POLL_NORMAL, LIVE_POLL_SLOW,
+    LIVE_POLL_BREAK, LIVE_DISCOVERY_INTERVAL, LIVE_BREAK_MARKERS
+)
+from metrics import metrics
+from page_cache import content_hash
+from collector import collect_live_matches
+from scraper import scrape_match
+from extractors import extract_result, parse_scorecard_lines
+from cricket_datawarehouse import CricketDataWarehouse, classify_match_type
+
+
+OVERS_LIMIT = {"T20I": 20, "T20": 20, "ODI": 50}
+
+
+def _overs_to_float(overs):
+    try:
+        return float(overs)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def next_poll_interval(match_data, lines):
+    text = " ".join(lines[:60]).lower()
+    if any(marker in text for marker in LIVE_BREAK_MARKERS):
+        return LIVE_POLL_BREAK
+
+    scorecard = match_data["scorecard"]
+    if not scorecard:
+        return LIVE_POLL_NORMAL
+
+    current = scorecard[-1]
+    overs = _overs_to_float(current.get("total_overs"))
+    wickets = int(current["total_score"].split("/")[1]) if "/" in current.get("total_score", "") else 0
+    limit = OVERS_LIMIT.get(classify_match_type(match_data["match_title"]))
+
+    if wickets >= 8:
+        return LIVE_POLL_FAST
+    if limit is None:
+        # Tests have no innings end in sight until the tail is in
+        return LIVE_POLL_SLOW if overs < 60 else LIVE_POLL_NORMAL
+    remaining = limit - overs
+    if remaining <= 2 or (limit == 50 and remaining <= 5):
+        return LIVE_POLL_FAST
+    return LIVE_POLL_NORMAL
+
+
+class LiveTracker:
+
+    def __init__(self, driver, warehouse):
+        self.driver = driver
+        self.warehouse = warehouse
+        self.matches = {}
+        self.schedule = []
+        self.next_discovery = 0
+        self.page_hashes = {}
+
+    def discover(self, max_matches):
+        for url in collect_live_matches(self.driver):
+            if url not in self.matches and len(self.matches) < max_matches:
+                self.track(url)
+        self.next_discovery = time.monotonic() + LIVE_DISCOVERY_INTERVAL
+
+    def track(self, url):
+        # One full scrape for teams and Playing XI, then scorecard-only polls
+        match_data = scrape_match(self.driver, url)
+        # Only this scrape's pages can be unchanged; polls must not inherit the marker
+        unchanged = match_data.pop("unchanged_sections", None) or []
+        self.matches[url] = match_data
+        self.warehouse.upsert_live_match(match_data, scorecard_unchanged="scorecard" in unchanged)
+        print(f"    Tracking {match_data['match_title'][:50]}")
+        heapq.heappush(self.schedule, (time.monotonic() + LIVE_POLL_NORMAL, url))
+
+    def poll(self, url):
+        match_data = self.matches[url]
+        scorecard_url = url.replace("live-cricket-scores", "live-cricket-scorecard")
+
+        with metrics.span("driver.get", "live_scorecard"):
+            self.driver.get(scorecard_url)
+        time.sleep(WAIT_TIME)
+        with metrics.span("page.text", "live_scorecard"):
+            page_text = self.driver.find_element(By.TAG_NAME, "body").text
+        lines = [l.strip() for l in page_text.split('\n') if l.strip()]
+
+        # Most polls land between balls, so an identical page skips parsing and the upsert
+        page_hash = content_hash(page_text)
+        if self.page_hashes.get(url) == page_hash:
+            metrics.count("live.polls")
+            metrics.count("page.unchanged.live_scorecard")
+            return next_poll_interval(match_data, lines)
+        self.page_hashes[url] = page_hash
+
+        # Scores are re-derived from the innings headers on every poll
+        match_data["match_info"]["team1_score"] = ""
+        match_data["match_info"]["team2_score"] = ""
+        match_data["scorecard"] = []
+        with metrics.span("parse.scorecard_lines", "live_scorecard"):
+            parse_scorecard_lines(lines, match_data)
+            extract_result(lines, match_data)
+
+        with metrics.span("load.live_upsert"):
+            changed = self.warehouse.upsert_live_match(match_data)
+        metrics.count("live.polls")
+        if changed:
+            metrics.count("live.updates")
+
+        info = match_data["match_info"]
+        if info["result"]:
+            print(f"    Finished: {info['result']}")
+            del self.matches[url]
+            self.page_hashes.pop(url, None)
+            return None
+
+        interval = next_poll_interval(match_data, lines)
+        print(f"    {match_data['match_title'][:40]} | {info['team1_score']} v {info['team2_score']} "
+              f"| {'updated' if changed else 'no change'} | next in {interval}s")
+        return interval
+
+    def run(self, max_matches=10):
+        self.discover(max_matches)
+        while self.matches:
+            if time.monotonic() >= self.next_discovery:
+                self.discover(max_matches)
+
+            due, url = heapq.heappop(self.schedule)
+            time.sleep(max(0, min(due, self.next_discovery) - time.monotonic()))
+            if time.monotonic() < due:
+                heapq.heappush(self.schedule, (due, url))
+                continue
+            try:
+                interval = self.poll(url)
+            except Exception as e:
+                print(f"    Poll failed: {str(e)[:60]}")
+                interval = LIVE_POLL_NORMAL
+            if interval is not None:
+                heapq.heappush(self.schedule, (time.monotonic() + interval, url))
+        print("\nNo live matches left to track")
+
+
+def main():
+    from driver import driver_manager
+
+    print("CRICBUZZ LIVE TRACKER")
+    print("=" * 60)
+    warehouse = CricketDataWarehouse(DATABASE_FILE)
+    warehouse.create_schema()
+    try:
+        driver, wait = driver_manager.setup(headless=HEADLESS)
+        LiveTracker(driver, warehouse).run()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        driver_manager.quit()
+        warehouse.close()
+        metrics.write_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,30 @@
 # Main entry point
 
+import argparse
 import json
+import os
+import socket
+import threading
 import time
+from pathlib import Path
 
-from config import OUTPUT_FILE
+from config import OUTPUT_FILE, HEADLESS, QUEUE_HEARTBEAT, RESCRAPE_FILE
+from metrics import metrics
+from interchange import read_matches, write_matches
 from driver import driver_manager
 from collector import collect_international_matches
-from scraper import scrape_match
+from scraper import scrape_match, rescrape_missing, plan_fetch, parse_fields, ALL_FIELDS
 
 
-def main():
+def main(fields=None):
     print("CRICBUZZ SCRAPER")
     print("=" * 60)
+    if fields:
+        print(f"Fields: {', '.join(fields)} -> pages: {', '.join(plan_fetch(fields))}")
     
     try:
         # Setup WebDriver
-        driver, wait = driver_manager.setup()
+        driver, wait = driver_manager.setup(headless=HEADLESS)
         
         # Collect match URLs
         match_urls = collect_international_matches(driver, wait)
@@ -25,7 +34,7 @@ def main():
             return
         
         # Scrape each match
-        all_matches = scrape_all_matches(driver, match_urls)
+        all_matches = scrape_all_matches(driver, match_urls, fields)
         
         # Save results
         save_results(all_matches)
@@ -34,23 +43,28 @@ def main():
         print(f"\nError: {e}")
     finally:
         driver_manager.quit()
+        metrics.write_all()
 
 
-def scrape_all_matches(driver, match_urls):
+def scrape_all_matches(driver, match_urls, fields=None):
     all_matches = []
     
     for idx, url in enumerate(match_urls, start=1):
         print(f"\n[{idx}/{len(match_urls)}] Scraping...")
         
+        metrics.begin_match(url)
         try:
-            match_data = scrape_match(driver, url)
+            match_data = scrape_match(driver, url, fields=fields)
             print_match_summary(match_data)
             all_matches.append(match_data)
+            metrics.end_match("ok")
             
         except Exception as e:
             print(f"    Error: {str(e)[:60]}")
+            metrics.end_match("failed", e)
         
-        time.sleep(2)
+        with metrics.span("sleep", "between_matches"):
+            time.sleep(2)
     
     return all_matches
 
@@ -61,19 +75,138 @@ def print_match_summary(match_data):
     print(f"    {match_data['match_title'][:50]}...")
     print(f"    {info['team1_name']} {info['team1_score']} vs {info['team2_name']} {info['team2_score']}")
     print(f"    Winner: {info['winner']} | POTM: {info['player_of_match']}")
+    if match_data.get("missing_sections"):
+        print(f"    Missing: {', '.join(match_data['missing_sections'])}")
     
 
 
 def save_results(all_matches):
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(all_matches, f, indent=4, ensure_ascii=False)
+    with metrics.span("save.matches"):
+        write_matches(OUTPUT_FILE, all_matches)
     
     print("\n" + "=" * 60)
     print("SCRAPING COMPLETE!")
     print("=" * 60)
     print(f"Total matches: {len(all_matches)}")
+    partial = sum(1 for m in all_matches if m.get("missing_sections"))
+    if partial:
+        print(f"Partial matches: {partial} (run with --retry-missing to complete them)")
     print(f"Saved to: {OUTPUT_FILE}")
 
 
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_matches(queue, job="default"):
+    try:
+        driver, wait = driver_manager.setup(headless=HEADLESS)
+        match_urls = collect_international_matches(driver, wait)
+    finally:
+        driver_manager.quit()
+    added = queue.enqueue(match_urls, job)
+    print(f"\nQueued {added} new matches for job '{job}' ({len(match_urls) - added} already queued)")
+
+
+def scrape_from_queue(queue, worker=None, job="default", fields=None):
+    # Any number of these can run against one queue, on one box or several
+    worker = worker or default_worker_id()
+    print(f"Worker {worker} on job '{job}'")
+    scraped = 0
+    try:
+        driver, wait = driver_manager.setup(headless=HEADLESS)
+        while True:
+            lease = queue.lease(worker, job)
+            if lease is None:
+                break
+            print(f"\n[{lease.attempt}] Scraping {lease.url.split('/')[-1][:50]}...")
+            
+            stop = threading.Event()
+            beat = threading.Thread(target=_keep_lease, args=(queue, lease, stop), daemon=True)
+            beat.start()
+            metrics.begin_match(lease.url)
+            try:
+                match_data = scrape_match(driver, lease.url, fields=fields)
+                print_match_summary(match_data)
+                if queue.complete(lease, match_data):
+                    scraped += 1
+                    metrics.end_match("ok")
+                else:
+                    print("    Lease lost to another worker, result discarded")
+                    metrics.end_match("lease_lost")
+            except Exception as e:
+                print(f"    Error: {str(e)[:60]}")
+                queue.fail(lease, e)
+                metrics.end_match("failed", e)
+            finally:
+                stop.set()
+                beat.join()
+            
+            with metrics.span("sleep", "between_matches"):
+                time.sleep(2)
+    finally:
+        driver_manager.quit()
+        metrics.write_all()
+    print(f"\nWorker {worker} done: {scraped} matches, queue {queue.status(job)}")
+
+
+def _keep_lease(queue, lease, stop):
+    while not stop.wait(QUEUE_HEARTBEAT):
+        if not queue.heartbeat(lease):
+            return
+
+
+def export_queue_results(queue, job="default"):
+    # Completed matches of a job, in the same file format as a single-process run
+    save_results(queue.results(job))
+
+
+def retry_missing():
+    if not Path(OUTPUT_FILE).exists():
+        print(f"Error: {OUTPUT_FILE} not found")
+        return
+    
+    all_matches = read_matches(OUTPUT_FILE)
+    
+    # Pages the last warehouse load flagged as inconsistent are fetched again too
+    if Path(RESCRAPE_FILE).exists():
+        with open(RESCRAPE_FILE, "r", encoding="utf-8") as f:
+            flagged = json.load(f)
+        for match_data in all_matches:
+            for section in flagged.get(match_data.get("match_url"), []):
+                if section not in match_data.setdefault("missing_sections", []):
+                    match_data["missing_sections"].append(section)
+    
+    partial = [m for m in all_matches if m.get("missing_sections")]
+    print(f"Re-fetching missing sections for {len(partial)} matches")
+    if not partial:
+        return
+    
+    try:
+        driver, wait = driver_manager.setup(headless=HEADLESS)
+        for idx, match_data in enumerate(partial, start=1):
+            print(f"\n[{idx}/{len(partial)}] {', '.join(match_data['missing_sections'])}")
+            rescrape_missing(driver, match_data)
+            print_match_summary(match_data)
+        save_results(all_matches)
+    finally:
+        driver_manager.quit()
+        metrics.write_all()
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape completed international matches")
+    parser.add_argument("--retry-missing", action="store_true", help="re-fetch only the pages missing from the last run")
+    parser.add_argument("--fields", type=parse_fields,
+                        help=f"comma-separated fields to fetch, loading only the pages they need ({', '.join(ALL_FIELDS)})")
+    parser.add_argument("--metrics", action="store_true",
+                        help="time every stage into run_report.json and the Prometheus textfile")
+    parser.add_argument("--memory-profile", action="store_true",
+                        help="trace allocations per stage into the run report (slow)")
+    args = parser.parse_args()
+    if args.metrics or args.memory_profile:
+        metrics.enable(memory=args.memory_profile)
+    if args.retry_missing:
+        retry_missing()
+    else:
+        main(args.fields)
@@ -0,0 +1,164 @@
+# Memory profiling - tracemalloc per metrics span, top allocation sites and peak RSS
+#
+# Opt-in (CRICBUZZ_MEMORY_PROFILE=1 or --memory-profile): tracing every allocation
+# makes a run several times slower. Each span records how far memory rose above
+# what was live when it started (peak) and what it left allocated (retained). The
+# first few calls of each stage also diff snapshots taken on either side, which
+# attributes what the stage retained to source lines. tracemalloc has one peak per
+# process, so spans running on several threads at once get approximate peaks.
+
+import sys
+import threading
+import tracemalloc
+
+from config import MEMORY_PROFILE_SAMPLES, MEMORY_PROFILE_TOP
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+MB = 1024 * 1024
+
+
+def peak_rss_bytes():
+    # Highest resident set size of this process so far; None when neither source exists
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+def _site(stat):
+    frame = stat.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+class MemoryProfiler:
+
+    def __init__(self, samples=MEMORY_PROFILE_SAMPLES, top=MEMORY_PROFILE_TOP):
+        self.samples = samples
+        self.top = top
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._owns_tracing = False
+        self._peak = 0
+
+    def start(self):
+        # An interpreter started with -X tracemalloc=N keeps its deeper tracebacks
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        self.stages = {}
+        self._peak = 0
+        tracemalloc.reset_peak()
+
+    def stop(self):
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _top(self, stats, key):
+        # Snapshot.filter_traces matches every trace in Python, far slower than
+        # dropping the profiler's own lines from the grouped statistics
+        own = (tracemalloc.__file__, __file__)
+        return [stat for stat in stats if stat.traceback[0].filename not in own and key(stat) > 0][:self.top]
+
+    def enter(self, key):
+        with self._lock:
+            stage = self.stages.get(key)
+            if stage is None:
+                stage = self.stages[key] = {"calls": 0, "sampled": 0, "peak": 0, "retained": 0, "sites": {}}
+            sample = stage["sampled"] < self.samples
+            if sample:
+                stage["sampled"] += 1
+
+        # tracemalloc keeps one peak, so each span resets it and hands the peak
+        # it interrupted to the enclosing span
+        current, peak = tracemalloc.get_traced_memory()
+        stack = self._stack()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        self._peak = max(self._peak, peak)
+        tracemalloc.reset_peak()
+
+        before = None
+        if sample:
+            # Taken after the hand-over, so the snapshot counts towards no span
+            before = tracemalloc.take_snapshot()
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        stack.append([current, 0, before])
+
+    def exit(self, key):
+        current, peak = tracemalloc.get_traced_memory()
+        stack = self._stack()
+        start, inner_peak, before = stack.pop()
+        peak = max(peak, inner_peak)
+        sites = []
+        if before is not None:
+            sites = self._top(tracemalloc.take_snapshot().compare_to(before, "lineno"), lambda stat: stat.size_diff)
+
+        with self._lock:
+            stage = self.stages[key]
+            stage["calls"] += 1
+            stage["peak"] = max(stage["peak"], peak - start)
+            stage["retained"] += current - start
+            for stat in sites:
+                size, count = stage["sites"].get(_site(stat), (0, 0))
+                stage["sites"][_site(stat)] = (size + stat.size_diff, count + stat.count_diff)
+
+        # The closing snapshot's own allocations must not count towards the enclosing span
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        self._peak = max(self._peak, peak)
+        tracemalloc.reset_peak()
+
+    def report(self):
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        rss = peak_rss_bytes()
+        live = []
+        if tracemalloc.is_tracing():
+            live = self._top(tracemalloc.take_snapshot().statistics("lineno"), lambda stat: stat.size)
+        with self._lock:
+            stages = [
+                {"stage": stage, "page": page, "calls": s["calls"],
+                 "peak_mb": round(s["peak"] / MB, 3), "retained_mb": round(s["retained"] / MB, 3),
+                 "sites": [{"site": site, "kb": round(size / 1024, 1), "blocks": count}
+                           for site, (size, count) in sorted(s["sites"].items(), key=lambda i: -i[1][0])[:self.top]]}
+                for (stage, page), s in sorted(self.stages.items(), key=lambda i: -i[1]["peak"])
+            ]
+        return {
+            "peak_rss_mb": round(rss / MB, 1) if rss is not None else None,
+            "traced_peak_mb": round(max(self._peak, peak) / MB, 3),
+            "traced_current_mb": round(current / MB, 3),
+            "stages": stages,
+            "live_sites": [{"site": _site(stat), "kb": round(stat.size / 1024, 1), "blocks": stat.count}
+                           for stat in live]
+        }
+
+    def print_summary(self, report=None, stages=5):
+        report = report or self.report()
+        rss = f"{report['peak_rss_mb']} MB" if report["peak_rss_mb"] is not None else "unknown"
+        print(f"Memory: peak RSS {rss}, traced peak {report['traced_peak_mb']:.1f} MB, "
+              f"{report['traced_current_mb']:.1f} MB still allocated")
+        for s in report["stages"][:stages]:
+            name = f"{s['stage']}[{s['page']}]" if s["page"] else s["stage"]
+            top = f", most retained at {s['sites'][0]['site']}" if s["sites"] else ""
+            print(f"  {name:32} peak {s['peak_mb']:>8.2f} MB, retained {s['retained_mb']:>8.2f} MB{top}")
@@ -0,0 +1,215 @@
+# Run metrics - lightweight stage spans, counters and run reports
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+from config import METRICS_ENABLED, MEMORY_PROFILE, RUN_REPORT_FILE, PROMETHEUS_FILE
+
+
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("metrics", "key", "start")
+
+    def __init__(self, metrics, key):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._record(self.key, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+class _MemorySpan(_Span):
+    # The profiler's bookkeeping stays outside the timed part of the span
+    __slots__ = ()
+
+    def __enter__(self):
+        self.metrics.memory.enter(self.key)
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        self.metrics.memory.exit(self.key)
+        return False
+
+
+class RunMetrics:
+
+    def __init__(self, enabled=METRICS_ENABLED, memory=MEMORY_PROFILE):
+        self.enabled = enabled
+        self.memory = None
+        self._lock = threading.Lock()
+        self.reset()
+        if memory:
+            self.enable(memory=True)
+
+    def reset(self):
+        self.started_at = time.time()
+        self.stages = {}
+        self.counters = {}
+        self.matches = []
+        self._current = None
+
+    def enable(self, memory=False):
+        self.enabled = True
+        self.reset()
+        if memory:
+            # tracemalloc is only imported and started for a profiled run
+            from memory_profile import MemoryProfiler
+
+            if self.memory is None:
+                self.memory = MemoryProfiler()
+            self.memory.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.memory is not None:
+            self.memory.stop()
+            self.memory = None
+
+    def span(self, stage, page=""):
+        # Disabled spans share one no-op context manager
+        if not self.enabled:
+            return _NULL_SPAN
+        if self.memory is not None:
+            return _MemorySpan(self, (stage, page))
+        return _Span(self, (stage, page))
+
+    def count(self, event, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[event] = self.counters.get(event, 0) + n
+            if self._current is not None:
+                events = self._current["events"]
+                events[event] = events.get(event, 0) + n
+
+    def begin_match(self, match_url):
+        if not self.enabled:
+            return
+        self._current = {"match_url": match_url, "status": "running",
+                         "started": time.perf_counter(), "stages": {}, "events": {}}
+
+    def end_match(self, status="ok", error=None):
+        if not self.enabled or self._current is None:
+            return
+        match = self._current
+        match["status"] = status
+        match["seconds"] = round(time.perf_counter() - match.pop("started"), 4)
+        match["stages"] = {k: round(v, 4) for k, v in match["stages"].items()}
+        if error:
+            match["error"] = str(error)[:200]
+        with self._lock:
+            self.matches.append(match)
+            self._current = None
+
+    def _record(self, key, elapsed, failed):
+        with self._lock:
+            stage = self.stages.get(key)
+            if stage is None:
+                stage = self.stages[key] = {"count": 0, "failures": 0, "total": 0.0,
+                                            "min": elapsed, "max": elapsed}
+            stage["count"] += 1
+            stage["total"] += elapsed
+            stage["min"] = min(stage["min"], elapsed)
+            stage["max"] = max(stage["max"], elapsed)
+            if failed:
+                stage["failures"] += 1
+            if self._current is not None:
+                name = f"{key[0]}[{key[1]}]" if key[1] else key[0]
+                self._current["stages"][name] = self._current["stages"].get(name, 0.0) + elapsed
+
+    def report(self):
+        with self._lock:
+            stages = [
+                {"stage": stage, "page": page, "count": s["count"], "failures": s["failures"],
+                 "total_s": round(s["total"], 4), "mean_s": round(s["total"] / s["count"], 4),
+                 "min_s": round(s["min"], 4), "max_s": round(s["max"], 4)}
+                for (stage, page), s in sorted(self.stages.items(), key=lambda i: -i[1]["total"])
+            ]
+            statuses = {}
+            for match in self.matches:
+                statuses[match["status"]] = statuses.get(match["status"], 0) + 1
+            report = {
+                "started_at": self.started_at,
+                "duration_s": round(time.time() - self.started_at, 3),
+                "matches": statuses,
+                "stages": stages,
+                "counters": dict(self.counters),
+                "per_match": list(self.matches)
+            }
+        if self.memory is not None:
+            report["memory"] = self.memory.report()
+        return report
+
+    def write_report(self, path=RUN_REPORT_FILE, report=None):
+        _atomic_write(path, json.dumps(report or self.report(), indent=4))
+
+    def write_prometheus(self, path=PROMETHEUS_FILE, report=None):
+        report = report or self.report()
+        lines = [
+            "# HELP cricbuzz_run_duration_seconds Wall time of the last run",
+            "# TYPE cricbuzz_run_duration_seconds gauge",
+            f"cricbuzz_run_duration_seconds {report['duration_s']}",
+            "# HELP cricbuzz_matches_total Matches processed in the last run by status",
+            "# TYPE cricbuzz_matches_total gauge"
+        ]
+        lines += [f'cricbuzz_matches_total{{status="{status}"}} {n}' for status, n in report["matches"].items()]
+
+        for metric, field, help_text in (
+            ("cricbuzz_stage_seconds_total", "total_s", "Time spent in each pipeline stage"),
+            ("cricbuzz_stage_calls_total", "count", "Calls of each pipeline stage"),
+            ("cricbuzz_stage_failures_total", "failures", "Failed calls of each pipeline stage"),
+            ("cricbuzz_stage_max_seconds", "max_s", "Slowest single call of each pipeline stage")
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {'gauge' if metric.endswith('max_seconds') else 'counter'}")
+            for s in report["stages"]:
+                lines.append(f'{metric}{{stage="{s["stage"]}",page="{s["page"]}"}} {s[field]}')
+
+        lines.append("# HELP cricbuzz_events_total Counted pipeline events")
+        lines.append("# TYPE cricbuzz_events_total counter")
+        lines += [f'cricbuzz_events_total{{event="{event}"}} {n}' for event, n in report["counters"].items()]
+
+        memory = report.get("memory")
+        if memory:
+            if memory["peak_rss_mb"] is not None:
+                lines.append("# HELP cricbuzz_peak_rss_bytes Highest resident set size of the last run")
+                lines.append("# TYPE cricbuzz_peak_rss_bytes gauge")
+                lines.append(f"cricbuzz_peak_rss_bytes {int(memory['peak_rss_mb'] * 1024 * 1024)}")
+            lines.append("# HELP cricbuzz_stage_peak_bytes Most memory one call of each stage allocated at once")
+            lines.append("# TYPE cricbuzz_stage_peak_bytes gauge")
+            lines += [f'cricbuzz_stage_peak_bytes{{stage="{s["stage"]}",page="{s["page"]}"}} '
+                      f'{int(s["peak_mb"] * 1024 * 1024)}' for s in memory["stages"]]
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+    def write_all(self):
+        if not self.enabled:
+            return
+        # One report, so the memory snapshot is taken once
+        report = self.report()
+        self.write_report(report=report)
+        self.write_prometheus(report=report)
+        print(f"Run report: {RUN_REPORT_FILE}, {PROMETHEUS_FILE}")
+        if self.memory is not None:
+            self.memory.print_summary(report["memory"])
+
+
+def _atomic_write(path, text):
+    # Textfile collectors must never see a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+metrics = RunMetrics()
@@ -0,0 +1,270 @@
+# Mock Cricbuzz server - serves recorded or synthetic pages for offline benchmarks
+
+import argparse
+import html
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from config import MOCK_HOST, MOCK_PORT, FIXTURES_DIR, TEAM_ABBREVIATIONS
+from synthetic_data import synthetic_match, generate_commentary
+
+
+FIRST_MATCH_ID = 100000
+
+# URL path prefix -> page type, mirroring the rewrites in the extractors
+PAGE_TYPES = {
+    "live-cricket-scores": "scores",
+    "cricket-match-facts": "facts",
+    "cricket-match-squads": "squads",
+    "live-cricket-scorecard": "scorecard",
+    "live-cricket-full-commentary": "commentary"
+}
+RECENT_PATH = "/cricket-match/live-scores/recent-matches"
+FAILURE_MODES = ("error", "hang", "drop")
+
+
+def _page(body):
+    return f"<!DOCTYPE html><html><head><meta charset='utf-8'></head><body>{body}</body></html>"
+
+
+def _div(text):
+    return f"<div>{html.escape(str(text))}</div>"
+
+
+def _team_abbr(team):
+    for abbr, name in TEAM_ABBREVIATIONS.items():
+        if name == team.lower():
+            return abbr.upper()
+    return team[:3].upper()
+
+
+def _short_score(score_text):
+    # "250/8 (50 Ov)" -> "250-8 (50)", the form the live page shows
+    match = re.match(r"(\d+)/(\d+) \(([\d.]+) Ov\)", score_text)
+    return f"{match.group(1)}-{match.group(2)} ({match.group(3)})" if match else score_text
+
+
+def render_recent(match_ids):
+    links = []
+    for match_id in match_ids:
+        match = synthetic_match(match_id - FIRST_MATCH_ID)
+        slug = match["match_url"].rsplit("/", 1)[-1]
+        text = f"{match['match_title']} {match['match_info']['result']}"
+        links.append(f"<div><a href='/live-cricket-scores/{match_id}/{slug}'>{html.escape(text)}</a></div>")
+    return _page("<div>International</div><div>Domestic</div>" + "".join(links))
+
+
+def render_scores(match):
+    info = match["match_info"]
+    body = [f"<h1>{html.escape(match['match_title'])} - Live Cricket Score</h1>"]
+    for team, score in ((info["team1_name"], info["team1_score"]), (info["team2_name"], info["team2_score"])):
+        body += [_div(_team_abbr(team)), _div(_short_score(score))]
+    body += [_div(info["result"]), _div("Player of the Match"), _div(info["player_of_match"])]
+    return _page("".join(body))
+
+
+def render_facts(match):
+    info = match["match_info"]
+    body = [_div("Match Info")]
+    for label, key in (("Match", None), ("Date", "date"), ("Toss", "toss"), ("Venue", "venue"),
+                       ("Umpires", "umpires"), ("Match Referee", "match_referee")):
+        body += [_div(label), _div(info[key] if key else match["match_title"])]
+    return _page("".join(body))
+
+
+def render_squads(match):
+    sections = []
+    for team_key in ("team1", "team2"):
+        team = match["playing_11"][team_key]
+        links = "".join(
+            f"<a href='/profiles/{p['profile_id']}/{p['name'].lower().replace(' ', '-')}'>"
+            f"{html.escape(p['name'])}</a>"
+            for p in team["players"]
+        )
+        sections.append(f"<div class='cb-col cb-col-50'><span class='cb-font-20'>"
+                        f"{html.escape(team['name'])}</span>{links}</div>")
+    return _page("".join(sections))
+
+
+def render_scorecard(match):
+    body = []
+    for innings in match["scorecard"]:
+        runs, wickets = innings["total_score"].split("/")
+        body.append(_div(f"{innings['batting_team']} Innings {runs}-{wickets} ({innings['total_overs']} Ov)"))
+        body += [_div(h) for h in ("Batter", "R", "B", "4s", "6s", "SR")]
+        for entry in innings["batting"]:
+            body += [_div(entry[k]) for k in ("batsman", "dismissal", "runs", "balls", "fours", "sixes", "strike_rate")]
+        body += [_div("Extras"), _div(innings.get("extras", "0")),
+                 _div("Total"), _div(f"{runs}-{wickets} ({innings['total_overs']} Ov)")]
+        body += [_div(h) for h in ("Bowler", "O", "M", "R", "W", "NB", "WD", "ECO")]
+        for entry in innings["bowling"]:
+            body += [_div(entry[k]) for k in ("bowler", "overs", "maidens", "runs", "wickets")]
+            body += [_div("0"), _div("0"), _div(entry["economy"])]
+    return _page("".join(body))
+
+
+def _outcome_text(delivery):
+    if delivery["wicket"]:
+        return "out Bowled!!"
+    if delivery["extra_type"]:
+        return "wide"
+    runs = delivery["runs"]
+    return {0: "no run", 1: "1 run", 4: "FOUR", 6: "SIX"}.get(runs, f"{runs} runs")
+
+
+def render_commentary(match):
+    # Newest ball first, the whole feed on one page (no "Load More")
+    body = []
+    for delivery in reversed(generate_commentary(match)):
+        body += [_div(f"{delivery['over']}.{delivery['ball']}"),
+                 _div(f"{delivery['bowler']} to {delivery['batter']}, {_outcome_text(delivery)}, on a length")]
+    return _page("".join(body))
+
+
+RENDERERS = {
+    "scores": render_scores,
+    "facts": render_facts,
+    "squads": render_squads,
+    "scorecard": render_scorecard,
+    "commentary": render_commentary
+}
+
+
+@lru_cache(maxsize=4096)
+def synthetic_page(page_type, match_id):
+    return RENDERERS[page_type](synthetic_match(match_id - FIRST_MATCH_ID))
+
+
+class MockCricbuzzServer:
+
+    def __init__(self, host=MOCK_HOST, port=MOCK_PORT, matches=20, latency=0.0, jitter=0.0,
+                 fail_rate=0.0, fail_mode="error", fixtures_dir=FIXTURES_DIR, seed=0):
+        self.host = host
+        self.port = port
+        self.match_ids = list(range(FIRST_MATCH_ID, FIRST_MATCH_ID + matches))
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.fail_mode = fail_mode
+        self.fixtures_dir = Path(fixtures_dir)
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def recent_url(self):
+        return f"http://{self.host}:{self.port}{RECENT_PATH}"
+
+    def fixture(self, page_type, match_id=None):
+        name = f"{page_type}/{match_id}.html" if match_id else f"{page_type}.html"
+        path = self.fixtures_dir / name
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def resolve(self, path):
+        if path.startswith(RECENT_PATH):
+            return self.fixture("recent") or render_recent(self.match_ids)
+
+        parts = path.strip("/").split("/")
+        if len(parts) >= 2 and parts[0] in PAGE_TYPES and parts[1].isdigit():
+            page_type, match_id = PAGE_TYPES[parts[0]], int(parts[1])
+            recorded = self.fixture(page_type, match_id)
+            if recorded:
+                return recorded
+            if match_id >= FIRST_MATCH_ID:
+                return synthetic_page(page_type, match_id)
+        return None
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                server.requests += 1
+                delay = server.latency + server.rng.uniform(0, server.jitter)
+                if delay:
+                    time.sleep(delay)
+
+                if server.fail_rate and server.rng.random() < server.fail_rate:
+                    server.failures += 1
+                    if server.fail_mode == "hang":
+                        time.sleep(3600)
+                    if server.fail_mode == "drop":
+                        self.close_connection = True
+                        return
+                    self.send_error(503, "Injected failure")
+                    return
+
+                page = server.resolve(self.path.split("?")[0])
+                if page is None:
+                    self.send_error(404)
+                    return
+                payload = page.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+def record_fixtures(driver, match_urls, fixtures_dir=FIXTURES_DIR):
+    # Save live pages so the mock server can replay them byte for byte
+    out = Path(fixtures_dir)
+    for match_url in match_urls:
+        match_id = re.search(r"/live-cricket-scores/(\d+)/", match_url).group(1)
+        for prefix, page_type in PAGE_TYPES.items():
+            driver.get(match_url.replace("live-cricket-scores", prefix))
+            time.sleep(2)
+            path = out / page_type / f"{match_id}.html"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(driver.page_source, encoding="utf-8")
+        print(f"    Recorded {match_id}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Cricbuzz-shaped pages locally")
+    parser.add_argument("--host", default=MOCK_HOST)
+    parser.add_argument("--port", type=int, default=MOCK_PORT)
+    parser.add_argument("--matches", type=int, default=20, help="matches on the recent page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency up to this many seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests to fail")
+    parser.add_argument("--fail-mode", choices=FAILURE_MODES, default="error")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory of recorded pages")
+    args = parser.parse_args(argv)
+
+    server = MockCricbuzzServer(args.host, args.port, args.matches, args.latency, args.jitter,
+                                args.fail_rate, args.fail_mode, args.fixtures).start()
+    print(f"Mock Cricbuzz serving {args.matches} matches at {server.recent_url}")
+    print(f"Run the scraper with CRICBUZZ_RECENT_URL={server.recent_url}")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Page cache - content hashes per URL and page type to skip unchanged pages
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+
+from config import PAGE_CACHE_ENABLED, PAGE_CACHE_FILE
+
+
+# Text that changes on every load without the match data changing
+VOLATILE_PATTERNS = [
+    re.compile(r"\b\d+\s*(?:sec|secs|min|mins|hr|hrs|hour|hours)\s+ago\b", re.I),
+    re.compile(r"\b\d{1,2}:\d{2}(?::\d{2})?\s*(?:am|pm)?\b", re.I),
+    re.compile(r"\s+")
+]
+
+
+def normalize_page_text(text):
+    text = text or ""
+    for pattern in VOLATILE_PATTERNS[:-1]:
+        text = pattern.sub("", text)
+    return VOLATILE_PATTERNS[-1].sub(" ", text).strip()
+
+
+def content_hash(text):
+    return hashlib.blake2b(normalize_page_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PageCache:
+
+    def __init__(self, db_path=PAGE_CACHE_FILE):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_hashes (
+                url TEXT NOT NULL,
+                page_type TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                section_json TEXT,
+                fetched_at REAL,
+                PRIMARY KEY (url, page_type)
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    def lookup(self, url, page_type, page_hash):
+        # Returns the section stored with an identical page, or None
+        row = self.conn.execute(
+            "SELECT content_hash, section_json FROM page_hashes WHERE url = ? AND page_type = ?",
+            (url, page_type)
+        ).fetchone()
+        if row and row[0] == page_hash and row[1] is not None:
+            return json.loads(row[1])
+        return None
+
+    def store(self, url, page_type, page_hash, section):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO page_hashes (url, page_type, content_hash, section_json, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (url, page_type, page_hash, json.dumps(section, ensure_ascii=False), time.time())
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+_shared = None
+
+
+def get_page_cache():
+    global _shared
+    if not PAGE_CACHE_ENABLED:
+        return None
+    if _shared is None:
+        _shared = PageCache()
+    return _shared
@@ -0,0 +1,225 @@
+# Query service - read-only JSON over HTTP on top of the warehouse query API
+#
+# Every response carries the warehouse version (MAX(load_id) in etl_loads) as
+# its ETag. A client that sends it back in If-None-Match gets a 304 without a
+# query, and encoded responses are cached in process until the next load.
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from config import DATABASE_FILE, MAX_LIMIT, QUERY_POOL_SIZE, SERVICE_HOST, SERVICE_PORT, SERVICE_CACHE_SIZE
+from cricket_datawarehouse import OutdatedWarehouseError
+from warehouse_queries import ResultCache, WarehouseQueries
+
+
+# SQLite integers are signed 64-bit; binding anything larger raises OverflowError
+INT64_MAX = 2 ** 63 - 1
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _int(params, name, default=None):
+    value = params.get(name, default)
+    try:
+        value = None if value is None else int(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+    if value is not None and abs(value) > INT64_MAX:
+        raise HTTPError(400, f"{name} is out of range")
+    return value
+
+
+def _count(params, name, default=None):
+    # Row counts and windows: SQLite reads LIMIT -1 as every row, and an unbounded
+    # count lets one request read a whole table
+    value = _int(params, name, default)
+    if value is not None and not 1 <= value <= MAX_LIMIT:
+        raise HTTPError(400, f"{name} must be between 1 and {MAX_LIMIT}")
+    return value
+
+
+def _id(text):
+    if not text.isdigit() or int(text) > INT64_MAX:
+        raise HTTPError(404, "not found")
+    return int(text)
+
+
+class QueryService:
+
+    def __init__(self, db_path=DATABASE_FILE, host=SERVICE_HOST, port=SERVICE_PORT,
+                 pool_size=QUERY_POOL_SIZE, cache_size=SERVICE_CACHE_SIZE):
+        self.host = host
+        self.port = port
+        self.queries = WarehouseQueries(db_path=db_path, pool_size=pool_size)
+        self.responses = ResultCache(cache_size)
+        self.requests = 0
+        self.not_modified = 0
+        self.httpd = None
+        self.thread = None
+        self._stats = None
+        self._stats_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def leaderboard(self, metric, params):
+        # stats pulls in numpy, so it is only imported for the first leaderboard;
+        # the engine's column arrays are shared, one request refreshes them at a time
+        with self._stats_lock:
+            if self._stats is None:
+                try:
+                    from stats import StatsEngine
+                except ImportError as e:
+                    raise HTTPError(501, str(e))
+                self._stats = StatsEngine(self.queries)
+            kwargs = {name: _int(params, name) for name in ("match_type_id", "min_innings") if name in params}
+            kwargs.update((name, _count(params, name)) for name in ("top", "window") if name in params)
+            try:
+                return self._stats.leaderboard(metric, params.get("by", "player"), **kwargs)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+
+    def route(self, path, params):
+        # /matches/<id>, /matches?start=&end=[&team=], /players/<id>, /players?name=,
+        # /teams/<id>, /teams/<id>/h2h/<id>, /venues/<id>, /search?q=, /leaders/<metric>, /version
+        parts = [p for p in path.split("/") if p]
+        queries = self.queries
+        if parts == ["version"]:
+            return {"version": queries.version}
+        if parts == ["matches"]:
+            if "start" not in params or "end" not in params:
+                raise HTTPError(400, "start and end are required")
+            try:
+                return queries.matches_between(params["start"], params["end"], _int(params, "team"))
+            except ValueError:
+                raise HTTPError(400, "start and end must be YYYY-MM-DD")
+        if parts == ["players"]:
+            if "name" not in params:
+                raise HTTPError(400, "name is required")
+            return queries.find_player(params["name"])
+        if parts == ["search"]:
+            try:
+                return queries.search(params.get("q", ""), params.get("kind"), _count(params, "limit", 10))
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+        if len(parts) == 2 and parts[0] == "leaders":
+            return self.leaderboard(parts[1], params)
+        if len(parts) == 2 and parts[0] == "matches":
+            result = queries.match(_id(parts[1]))
+        elif len(parts) == 2 and parts[0] == "players":
+            result = queries.player(_id(parts[1]), _int(params, "match_type_id"))
+        elif len(parts) == 2 and parts[0] == "teams":
+            result = queries.team(_id(parts[1]), _count(params, "last", 10))
+        elif len(parts) == 4 and parts[0] == "teams" and parts[2] == "h2h":
+            result = queries.head_to_head(_id(parts[1]), _id(parts[3]))
+        elif len(parts) == 2 and parts[0] == "venues":
+            result = queries.venue_records(_id(parts[1]), _count(params, "top", 5))
+        else:
+            raise HTTPError(404, "not found")
+        if result is None:
+            raise HTTPError(404, "not found")
+        return result
+
+    def respond(self, target, if_none_match=None):
+        # (status, etag, body); the body is None for a 304
+        self.requests += 1
+        try:
+            version = self.queries.check_version()
+        except OutdatedWarehouseError as e:
+            # No version to tag the answer with until a load upgrades the file
+            return 503, None, json.dumps({"error": str(e)}).encode("utf-8")
+        etag = f'"{version}"'
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            self.not_modified += 1
+            return 304, etag, None
+
+        cached = self.responses.get(target)
+        if cached is not None and cached[0] == version:
+            return 200, etag, cached[1]
+
+        url = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            status, result = 200, self.route(url.path, params)
+        except HTTPError as e:
+            status, result = e.status, {"error": str(e)}
+        except Exception as e:
+            # A bug must still answer, or the client waits on a dropped connection
+            print(f"Error serving {target}: {e!r}")
+            status, result = 500, {"error": "internal error"}
+        body = json.dumps(result, ensure_ascii=False, default=str).encode("utf-8")
+        if status == 200:
+            self.responses.put(target, (version, body))
+        return status, etag, body
+
+    def start(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so a client pays for one TCP connection, not one per request;
+            # headers and body go out as separate writes, which Nagle would hold for an ACK
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status, etag, body = service.respond(self.path, self.headers.get("If-None-Match"))
+                self.send_response(status)
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+                if body is None:
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+        if self._stats:
+            self._stats.close()
+        self.queries.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve warehouse queries as JSON over HTTP")
+    parser.add_argument("--db", default=DATABASE_FILE, help="warehouse database")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--pool-size", type=int, default=QUERY_POOL_SIZE, help="read-only connections")
+    args = parser.parse_args(argv)
+
+    service = QueryService(args.db, args.host, args.port, args.pool_size).start()
+    print(f"Warehouse queries at {service.url} (e.g. {service.url}/matches/1)")
+    try:
+        service.thread.join()
+    except KeyboardInterrupt:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Retry and circuit breaker helpers for page loads
+
+import random
+import time
+
+from config import PAGE_RETRIES, RETRY_BACKOFF, BREAKER_THRESHOLD, BREAKER_COOLDOWN
+from metrics import metrics
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+
+    def __init__(self, name, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self):
+        if self.opened_at is None:
+            return False
+        # After the cooldown one trial call is let through (half-open)
+        return time.monotonic() - self.opened_at < self.cooldown
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            if self.opened_at is None:
+                print(f"    Circuit open for '{self.name}' pages ({self.failures} consecutive failures)")
+                metrics.count(f"breaker.open.{self.name}")
+            self.opened_at = time.monotonic()
+
+
+class BreakerRegistry:
+
+    def __init__(self):
+        self.breakers = {}
+
+    def get(self, name):
+        if name not in self.breakers:
+            self.breakers[name] = CircuitBreaker(name)
+        return self.breakers[name]
+
+
+def call_with_retry(fn, breaker, retries=PAGE_RETRIES, backoff=RETRY_BACKOFF, reset=None):
+    if breaker.is_open:
+        metrics.count(f"breaker.skipped.{breaker.name}")
+        raise CircuitOpenError(f"circuit open for {breaker.name}")
+
+    for attempt in range(1, retries + 1):
+        try:
+            result = fn()
+            breaker.record_success()
+            return result
+        except Exception as e:
+            breaker.record_failure()
+            metrics.count(f"retry.failed.{breaker.name}")
+            if attempt == retries or breaker.is_open:
+                raise
+            delay = backoff * 2 ** (attempt - 1) * random.uniform(0.8, 1.2)
+            print(f"    {breaker.name} page failed ({str(e)[:40]}), retry {attempt}/{retries - 1} in {delay:.1f}s")
+            if reset:
+                reset()
+            time.sleep(delay)
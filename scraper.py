@@ -3,36 +3,319 @@
 import time
 from selenium.webdriver.common.by import By
 
-from config import WAIT_TIME
+from config import WAIT_TIME, SCRAPE_COMMENTARY, PARALLEL_TABS
+from metrics import metrics
+from page_cache import content_hash, get_page_cache
+from resilience import BreakerRegistry, CircuitOpenError, call_with_retry
 from extractors import (
+    EXTRACTORS,
     create_empty_match_data,
     extract_title_and_teams,
     extract_scores,
     extract_result,
     extract_player_of_match,
-    extract_match_facts,
-    extract_playing_xi,
-    extract_scorecard
+    parse_match_facts,
+    parse_playing_xi,
+    parse_scorecard_lines,
+    load_full_commentary,
+    expand_commentary,
+    parse_commentary_lines
 )
 
 
-def scrape_match(driver, match_url):
-    match_data = create_empty_match_data(match_url)
+# Page sections in load order, each backed by one Cricbuzz page
+SECTIONS = ["scores", "facts", "squads", "scorecard"] + (["commentary"] if SCRAPE_COMMENTARY else [])
+
+SECTION_PAGES = {
+    "scores": "live-cricket-scores",
+    "facts": "cricket-match-facts",
+    "squads": "cricket-match-squads",
+    "scorecard": "live-cricket-scorecard",
+    "commentary": "live-cricket-full-commentary"
+}
+
+SECTION_WAIT = {"facts": 2}
+
+# match_data keys outside match_info
+TOP_LEVEL_FIELDS = {"match_title", "playing_11", "scorecard", "commentary"}
+
+breakers = BreakerRegistry()
+
+
+def section_url(match_url, section):
+    return match_url.replace("live-cricket-scores", SECTION_PAGES[section])
+
+
+def load_page(driver, url, section):
+    if section == "commentary":
+        return load_full_commentary(driver, url)
+    with metrics.span("driver.get", section):
+        driver.get(url)
+    with metrics.span("sleep", section):
+        time.sleep(SECTION_WAIT.get(section, WAIT_TIME))
+    with metrics.span("page.text", section):
+        return driver.find_element(By.TAG_NAME, "body").text
+
+
+def _run_title_and_teams(driver, lines, match_data):
+    extract_title_and_teams(driver, match_data)
+
+
+def _run_playing_xi(driver, lines, match_data):
+    with metrics.span("page.source", "squads"):
+        page_source = driver.page_source
+    parse_playing_xi(page_source, match_data)
+
+
+EXTRACTOR_RUNNERS = {
+    "title_and_teams": _run_title_and_teams,
+    "scores": lambda driver, lines, match_data: extract_scores(lines, match_data),
+    "result": lambda driver, lines, match_data: extract_result(lines, match_data),
+    "player_of_match": lambda driver, lines, match_data: extract_player_of_match(lines, match_data),
+    "match_facts": lambda driver, lines, match_data: parse_match_facts(lines, match_data),
+    "playing_xi": _run_playing_xi,
+    "scorecard": lambda driver, lines, match_data: parse_scorecard_lines(lines, match_data),
+    "commentary": lambda driver, lines, match_data: parse_commentary_lines(lines, match_data)
+}
+
+ALL_FIELDS = [field for _, fields, _ in EXTRACTORS.values() for field in fields]
+
+SECTION_EXTRACTORS = {
+    section: [name for name, (page, _, _) in EXTRACTORS.items() if page == section] for section in SECTION_PAGES
+}
+
+
+def plan_fetch(fields=None):
+    # {section: [extractor, ...]} covering the requested fields with the fewest pages
+    if not fields:
+        return {section: SECTION_EXTRACTORS[section] for section in SECTIONS}
     
-    # Get match page
-    driver.get(match_url)
-    time.sleep(WAIT_TIME)
+    unknown = set(fields) - set(ALL_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))} (choose from {', '.join(ALL_FIELDS)})")
     
-    page_text = driver.find_element(By.TAG_NAME, "body").text
+    wanted = {name for name, (_, produced, _) in EXTRACTORS.items() if set(produced) & set(fields)}
+    pending = list(wanted)
+    while pending:
+        for required in EXTRACTORS[pending.pop()][2]:
+            if required not in wanted:
+                wanted.add(required)
+                pending.append(required)
+    
+    plan = {}
+    for name, (page, _, _) in EXTRACTORS.items():
+        if name in wanted:
+            plan.setdefault(page, []).append(name)
+    return {section: plan[section] for section in SECTION_PAGES if section in plan}
+
+
+def parse_fields(text):
+    # "--fields result,winner" -> ["result", "winner"]
+    return [field.strip() for field in text.split(",") if field.strip()] if text else None
+
+
+def _get_field(match_data, field):
+    return match_data[field] if field in TOP_LEVEL_FIELDS else match_data["match_info"][field]
+
+
+def _set_field(match_data, field, value):
+    if field in TOP_LEVEL_FIELDS:
+        match_data[field] = value
+    else:
+        match_data["match_info"][field] = value
+
+
+def _plan_fields(extractors):
+    return [field for name in extractors for field in EXTRACTORS[name][1]]
+
+
+def _has_data(fields, match_data):
+    # An error page has an h1 too, so a title counts only once it named two teams
+    for field in fields:
+        value = _get_field(match_data, field)
+        if field == "playing_11":
+            value = value["team1"]["players"]
+        if value and field != "match_title":
+            return True
+    return False
+
+
+def _section_is_empty(driver, section, lines, extractors, match_data):
+    # An error page loads without raising, so a page counts as failed when nothing its
+    # section extracts is on it. A planned field may be genuinely empty (no result yet),
+    # so the page's other extractors are tried on a scratch copy before giving up.
+    if _has_data(_plan_fields(extractors), match_data):
+        return False
+    others = [name for name in SECTION_EXTRACTORS[section] if name not in extractors]
+    if not others:
+        return True
+    probe = create_empty_match_data(match_data["match_url"])
+    for name in others:
+        EXTRACTOR_RUNNERS[name](driver, lines, probe)
+    return not _has_data(_plan_fields(others), probe)
+
+
+def _reset_section(extractors, match_data):
+    empty = create_empty_match_data(match_data["match_url"])
+    for field in _plan_fields(extractors):
+        _set_field(match_data, field, _get_field(empty, field))
+
+
+def _section_snapshot(extractors, match_data):
+    return {field: _get_field(match_data, field) for field in _plan_fields(extractors)}
+
+
+def _restore_section(match_data, snapshot):
+    for field, value in snapshot.items():
+        _set_field(match_data, field, value)
+
+
+def _cache_key(section, extractors):
+    # A page parsed by only some of its extractors is cached apart from a full parse
+    if extractors == SECTION_EXTRACTORS[section]:
+        return section
+    return f"{section}:{'+'.join(extractors)}"
+
+
+def parse_section(driver, section, url, page_text, match_data, extractors):
+    # Skips parsing when the page is identical to the last fetch of this URL
     lines = [l.strip() for l in page_text.split('\n') if l.strip()]
+    cache = get_page_cache()
+    page_hash = content_hash(page_text) if cache else None
+    cache_key = _cache_key(section, extractors)
     
-    # Extract data
-    extract_title_and_teams(driver, match_data)
-    extract_scores(lines, match_data)
-    extract_result(lines, match_data)
-    extract_player_of_match(lines, match_data)
-    extract_match_facts(driver, match_url, match_data)
-    extract_playing_xi(driver, match_url, match_data)
-    extract_scorecard(driver, match_url, match_data)
+    if cache:
+        snapshot = cache.lookup(url, cache_key, page_hash)
+        if snapshot is not None:
+            _restore_section(match_data, snapshot)
+            match_data.setdefault("unchanged_sections", []).append(section)
+            metrics.count(f"page.unchanged.{section}")
+            return
+    
+    for name in extractors:
+        with metrics.span(f"extract.{name}"):
+            EXTRACTOR_RUNNERS[name](driver, lines, match_data)
+    if _section_is_empty(driver, section, lines, extractors, match_data):
+        raise ValueError(f"no {section} data")
+    if cache:
+        cache.store(url, cache_key, page_hash, _section_snapshot(extractors, match_data))
+
+
+def scrape_section(driver, section, match_data, extractors=None):
+    url = section_url(match_data["match_url"], section)
+    extractors = extractors or SECTION_EXTRACTORS[section]
+    
+    def attempt():
+        parse_section(driver, section, url, load_page(driver, url, section), match_data, extractors)
     
+    try:
+        call_with_retry(attempt, breakers.get(section),
+                        reset=lambda: _reset_section(extractors, match_data))
+        return True
+    except CircuitOpenError:
+        print(f"    Skipped {section}: circuit open")
+        return False
+    except Exception as e:
+        print(f"    Missing {section}: {str(e)[:60]}")
+        metrics.count(f"section.missing.{section}")
+        return False
+
+
+def scrape_match(driver, match_url, sections=None, fields=None):
+    match_data = create_empty_match_data(match_url)
+    plan = plan_fetch(fields)
+    if fields:
+        # Pages left out on purpose; the warehouse treats them like missing ones
+        match_data["fields"] = list(fields)
+        match_data["skipped_sections"] = [s for s in SECTIONS if s not in plan]
+    if sections:
+        plan = {s: extractors for s, extractors in plan.items() if s in sections}
+    _scrape_sections(driver, match_data, plan)
+    return match_data
+
+
+def rescrape_missing(driver, match_data):
+    # Re-fetch only the sections a previous run could not get
+    missing = list(match_data.get("missing_sections") or [])
+    if not missing:
+        return match_data
+    plan = {s: extractors for s, extractors in plan_fetch(match_data.get("fields")).items() if s in missing}
+    for extractors in plan.values():
+        _reset_section(extractors, match_data)
+    _scrape_sections(driver, match_data, plan)
     return match_data
+
+
+def _scrape_sections(driver, match_data, plan):
+    missing = [s for s in match_data.get("missing_sections", []) if s not in plan]
+    harvested = _scrape_in_tabs(driver, match_data, plan) if PARALLEL_TABS else set()
+    for section, extractors in plan.items():
+        if section not in harvested and not scrape_section(driver, section, match_data, extractors):
+            missing.append(section)
+    match_data["missing_sections"] = missing
+
+
+def _scrape_in_tabs(driver, match_data, plan):
+    # Opens every planned page at once and harvests them in order; a page that
+    # fails here falls back to the sequential path with its retries
+    sections = [s for s in plan if not breakers.get(s).is_open]
+    if len(sections) < 2 or not hasattr(driver, "open_tabs"):
+        return set()
+    
+    try:
+        main_window, handles = driver.open_tabs([section_url(match_data["match_url"], s) for s in sections])
+    except Exception as e:
+        print(f"    Could not open tabs: {str(e)[:60]}")
+        metrics.count("tabs.open_failed")
+        _return_to_main(driver, None)
+        return set()
+    
+    harvested = set()
+    try:
+        with metrics.span("sleep", "tabs"):
+            time.sleep(max(SECTION_WAIT.get(s, WAIT_TIME) for s in sections))
+        for section, handle in zip(sections, handles):
+            if _harvest_tab(driver, section, handle, match_data, plan[section]):
+                harvested.add(section)
+    finally:
+        _return_to_main(driver, main_window)
+    return harvested
+
+
+def _return_to_main(driver, main_window):
+    # The sequential path needs a live window; if the browser was swapped or the
+    # main window is gone, any window the current browser still has will do
+    if main_window is not None:
+        try:
+            driver.switch_to.window(main_window)
+            return
+        except Exception:
+            pass
+    try:
+        driver.switch_to.window(driver.window_handles[0])
+    except Exception:
+        metrics.count("tabs.main_window_lost")
+
+
+def _harvest_tab(driver, section, handle, match_data, extractors):
+    url = section_url(match_data["match_url"], section)
+    try:
+        driver.switch_to.window(handle)
+    except Exception:
+        metrics.count(f"tabs.retry.{section}")
+        return False
+    try:
+        if section == "commentary":
+            page_text = expand_commentary(driver)
+        else:
+            with metrics.span("page.text", section):
+                page_text = driver.find_element(By.TAG_NAME, "body").text
+        parse_section(driver, section, url, page_text, match_data, extractors)
+        breakers.get(section).record_success()
+        return True
+    except Exception:
+        _reset_section(extractors, match_data)
+        metrics.count(f"tabs.retry.{section}")
+        return False
+    finally:
+        driver.close()
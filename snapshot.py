@@ -0,0 +1,232 @@
+# Snapshot export - the star schema as columnar files for analytical tools
+#
+# Each table is streamed in fixed-size row batches into Parquet or Arrow IPC
+# (zstd) with its SQLite column types, or into gzipped CSV when pyarrow is not
+# installed. Dimensions are rewritten on every run. Fact tables are exported
+# incrementally: each run appends one part file per table holding only the
+# matches above the last run's match_id high-water mark.
+
+import csv
+import gzip
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+from config import EXPORT_BATCH_ROWS
+from cricket_datawarehouse import attach_shards, check_schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ipc = pq = None
+
+
+DIMENSION_TABLES = (
+    "dim_teams", "dim_team_aliases", "dim_players", "dim_player_aliases", "dim_venues", "dim_match_types",
+    "dim_dates"
+)
+FACT_TABLES = ("fact_matches", "fact_batting", "fact_bowling", "fact_playing_xi", "fact_deliveries")
+MANIFEST_FILE = "export_manifest.json"
+SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv.gz"}
+
+
+def default_format():
+    return "parquet" if pa else "csv"
+
+
+def _column_type(declared):
+    # SQLite type affinity rules, reduced to the three types the schema uses
+    declared = (declared or "").upper()
+    if "INT" in declared or "BOOL" in declared:
+        return "int64"
+    if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+        return "float64"
+    return "string"
+
+
+def _last_replacement(conn):
+    # Warehouses created before etl_replacements existed have recorded none
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'etl_replacements'").fetchone()
+    if exists is None:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(replacement_id), 0) FROM etl_replacements").fetchone()[0]
+
+
+def _columns(conn, table):
+    return [(row[1], _column_type(row[2])) for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+class _CsvWriter:
+
+    def __init__(self, path, columns):
+        # Level 6 is within 2% of gzip's default 9 in size at a quarter of the time
+        self._file = gzip.open(path, "wt", compresslevel=6, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _ in columns])
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowWriter:
+
+    def __init__(self, path, columns, file_format):
+        types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string()}
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+        else:
+            options = ipc.IpcWriteOptions(compression="zstd")
+            self._writer = ipc.new_file(path, self._schema, options=options)
+
+    def write(self, rows):
+        # Rows to columns; one Parquet row group or IPC record batch per fetched batch
+        columns = list(zip(*rows))
+        self._writer.write_batch(pa.record_batch(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self._schema)],
+            schema=self._schema
+        ))
+
+    def close(self):
+        self._writer.close()
+
+
+def _writer(path, columns, file_format):
+    if file_format == "csv":
+        return _CsvWriter(path, columns)
+    return _ArrowWriter(path, columns, file_format)
+
+
+def _copy(conn, sql, params, path, columns, file_format, batch_rows):
+    # Streams one query into one file; returns the rows written
+    cursor = conn.execute(sql, params)
+    tmp = path.with_name(path.name + ".tmp")
+    writer = _writer(tmp, columns, file_format)
+    written = 0
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            writer.write(rows)
+            written += len(rows)
+    finally:
+        writer.close()
+    os.replace(tmp, path)
+    return written
+
+
+class SnapshotExporter:
+
+    def __init__(self, db_path, out_dir, file_format=None, batch_rows=EXPORT_BATCH_ROWS):
+        file_format = file_format or default_format()
+        if file_format not in SUFFIXES:
+            raise ValueError(f"unknown format {file_format!r}, use one of {', '.join(SUFFIXES)}")
+        if file_format != "csv" and pa is None:
+            raise ImportError(f"the {file_format} format needs pyarrow (pip install pyarrow), or use csv")
+        self.db_path = db_path
+        self.out_dir = Path(out_dir)
+        self.file_format = file_format
+        self.batch_rows = batch_rows
+
+    def _connect(self):
+        # Read-only, with closed seasons attached so fact tables cover every season
+        conn = sqlite3.connect(Path(self.db_path).resolve().as_uri() + "?mode=ro", uri=True)
+        attach_shards(conn, self.db_path)
+        return conn
+
+    def _manifest(self):
+        path = self.out_dir / MANIFEST_FILE
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _needs_full(self, conn, manifest):
+        # The part files can only grow: a format change, a deleted or replaced match
+        # or a live update of an exported match means exporting everything again
+        if manifest is None or manifest["format"] != self.file_format:
+            return True
+        high_water = manifest["high_water_match_id"]
+        count = conn.execute("SELECT COUNT(*) FROM fact_matches WHERE match_id <= ?", (high_water,)).fetchone()[0]
+        if count != manifest["matches"]:
+            return True
+        # A replaced match keeps its match_id, so only etl_replacements shows it changed
+        if _last_replacement(conn) > manifest.get("replacement_id", 0):
+            replaced = conn.execute(
+                "SELECT 1 FROM etl_replacements WHERE replacement_id > ? AND match_id <= ? LIMIT 1",
+                (manifest.get("replacement_id", 0), high_water)
+            ).fetchone()
+            if replaced is not None:
+                return True
+        updated = conn.execute("""
+            SELECT 1 FROM etl_loads l JOIN fact_matches m ON l.source = 'live:' || m.match_key
+            WHERE l.load_id > ? AND m.match_id <= ?
+            LIMIT 1
+        """, (manifest["version"], high_water)).fetchone()
+        return updated is not None
+
+    def export(self, full=False):
+        conn = self._connect()
+        try:
+            check_schema(conn)
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            # One read transaction, so every table comes from the same warehouse version
+            conn.execute("BEGIN")
+            manifest = self._manifest()
+            if full or self._needs_full(conn, manifest):
+                if manifest:
+                    for table in manifest["tables"].values():
+                        for part in table.get("parts", []):
+                            (self.out_dir / part).unlink(missing_ok=True)
+                manifest = {"format": self.file_format, "runs": 0, "high_water_match_id": 0, "tables": {}}
+
+            run = manifest["runs"] + 1
+            high_water = manifest["high_water_match_id"]
+            new_high_water, matches, version = conn.execute("""
+                SELECT COALESCE(MAX(match_id), 0), COUNT(*), (SELECT COALESCE(MAX(load_id), 0) FROM etl_loads)
+                FROM fact_matches
+            """).fetchone()
+            replacement_id = _last_replacement(conn)
+            suffix = SUFFIXES[self.file_format]
+            written = {}
+
+            for table in DIMENSION_TABLES:
+                columns = _columns(conn, table)
+                path = self.out_dir / f"{table}{suffix}"
+                rows = _copy(conn, f"SELECT * FROM {table}", (), path, columns, self.file_format, self.batch_rows)
+                manifest["tables"][table] = {"columns": columns, "file": path.name, "rows": rows}
+                written[table] = rows
+
+            for table in FACT_TABLES:
+                columns = _columns(conn, table)
+                entry = manifest["tables"].setdefault(table, {"columns": columns, "parts": [], "rows": 0})
+                if new_high_water <= high_water:
+                    written[table] = 0
+                    continue
+                (self.out_dir / table).mkdir(exist_ok=True)
+                part = f"{table}/part-{run:05d}{suffix}"
+                rows = _copy(conn, f"SELECT * FROM {table} WHERE match_id > ? AND match_id <= ?",
+                             (high_water, new_high_water), self.out_dir / part, columns,
+                             self.file_format, self.batch_rows)
+                entry["parts"].append(part)
+                entry["rows"] += rows
+                written[table] = rows
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        manifest.update(runs=run, high_water_match_id=new_high_water, matches=matches, version=version,
+                        replacement_id=replacement_id)
+        tmp = self.out_dir / (MANIFEST_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(tmp, self.out_dir / MANIFEST_FILE)
+        return {"format": self.file_format, "run": run, "from_match_id": high_water,
+                "high_water_match_id": new_high_water, "rows": written}
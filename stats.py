@@ -0,0 +1,205 @@
+# Statistics engine - grouped NumPy metrics over the batting and bowling facts
+#
+# The fact columns are read into arrays once per warehouse version (the same
+# etl_loads version the query cache uses). Every leaderboard after that is a
+# sort and a few running sums instead of a query or a Python loop per player.
+
+from config import DATABASE_FILE, STATS_FORM_WINDOW, STATS_MIN_INNINGS
+from warehouse_queries import WarehouseQueries
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# NULL keys become -1 so every column fits one int64 array
+FACT_COLUMNS = {
+    "batting": ("""
+        SELECT b.player_id, COALESCE(b.team_id, -1), COALESCE(m.match_type_id, -1),
+               b.match_id, COALESCE(b.innings_number, 0),
+               b.runs, b.balls, b.fours, b.sixes, b.is_not_out
+        FROM fact_batting b JOIN fact_matches m ON m.match_id = b.match_id
+    """, ("player_id", "team_id", "match_type_id", "match_id", "innings_number",
+          "runs", "balls", "fours", "sixes", "not_outs")),
+    "bowling": ("""
+        SELECT w.player_id, COALESCE(w.team_id, -1), COALESCE(m.match_type_id, -1),
+               w.match_id, COALESCE(w.innings_number, 0),
+               CAST(w.overs AS INTEGER) * 6
+                   + CAST(ROUND((w.overs - CAST(w.overs AS INTEGER)) * 10) AS INTEGER),
+               w.maidens, w.runs_conceded, w.wickets
+        FROM fact_bowling w JOIN fact_matches m ON m.match_id = w.match_id
+    """, ("player_id", "team_id", "match_type_id", "match_id", "innings_number",
+          "balls", "maidens", "runs_conceded", "wickets"))
+}
+
+NAME_QUERIES = {
+    "player": "SELECT player_id, player_name FROM dim_players",
+    "team": "SELECT team_id, team_name FROM dim_teams",
+    "match_type": "SELECT match_type_id, match_type FROM dim_match_types"
+}
+
+# Leaderboard metric -> (fact table, lower is better)
+METRICS = {
+    "runs": ("batting", False),
+    "batting_average": ("batting", False),
+    "strike_rate": ("batting", False),
+    "boundary_pct": ("batting", False),
+    "form": ("batting", False),
+    "wickets": ("bowling", False),
+    "economy": ("bowling", True),
+    "bowling_average": ("bowling", True),
+    "bowling_strike_rate": ("bowling", True)
+}
+
+
+def _check_window(window):
+    # A window under one innings divides by zero or indexes before the group
+    if window < 1:
+        raise ValueError(f"window must be at least 1, got {window}")
+
+
+def _ratio(numerator, denominator, scale=1.0):
+    # NaN where the denominator is zero, e.g. a batter never dismissed
+    out = np.full(len(numerator), np.nan)
+    np.divide(numerator * scale, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def _value(value):
+    if isinstance(value, float):
+        return None if value != value else round(value, 2)
+    return value
+
+
+class StatsEngine:
+
+    def __init__(self, queries=None, db_path=DATABASE_FILE):
+        if np is None:
+            raise ImportError("the statistics engine needs numpy (pip install numpy)")
+        self._owns_queries = queries is None
+        self.queries = queries or WarehouseQueries(db_path=db_path)
+        self.version = None
+        self.columns = {}
+        self.names = {}
+        self._tables = {}
+
+    def close(self):
+        if self._owns_queries:
+            self.queries.close()
+
+    def refresh(self):
+        # Re-reads the fact columns only when a load has committed since the last read
+        version = self.queries.check_version()
+        if self.columns and version == self.version:
+            return
+        with self.queries.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            for table, (sql, names) in FACT_COLUMNS.items():
+                rows = cursor.execute(sql).fetchall()
+                data = np.array(rows, dtype=np.int64).reshape(len(rows), len(names))
+                # Kept in match order so a stable sort by group leaves each group chronological
+                data = data[np.lexsort((data[:, names.index("innings_number")], data[:, names.index("match_id")]))]
+                self.columns[table] = {name: data[:, i] for i, name in enumerate(names)}
+            self.names = {key: dict(cursor.execute(sql).fetchall()) for key, sql in NAME_QUERIES.items()}
+        self._tables.clear()
+        self.version = version
+
+    def _select(self, table, match_type_id):
+        cols = self.columns[table]
+        if match_type_id is None:
+            return cols
+        mask = cols["match_type_id"] == match_type_id
+        return {name: values[mask] for name, values in cols.items()}
+
+    def _groups(self, cols, by):
+        # Rows sorted by group, still chronological within it, so each group is one slice
+        order = np.argsort(cols[f"{by}_id"], kind="stable")
+        keys = cols[f"{by}_id"][order]
+        ids, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        return order, ids, starts, counts
+
+    def table(self, table, by="player", match_type_id=None, window=STATS_FORM_WINDOW):
+        # Every metric of one fact table per player, team or match type, as arrays
+        if by not in NAME_QUERIES:
+            raise ValueError(f"cannot group by {by!r}, use one of {', '.join(NAME_QUERIES)}")
+        _check_window(window)
+        self.refresh()
+        key = (table, by, match_type_id, window)
+        if key in self._tables:
+            return self._tables[key]
+
+        cols = self._select(table, match_type_id)
+        order, ids, starts, counts = self._groups(cols, by)
+        ends = starts + counts
+
+        def running(name):
+            return np.concatenate(([0], np.cumsum(cols[name][order])))
+
+        def total(name):
+            # Group sums are differences of one running total over the sorted rows
+            cumulative = running(name)
+            return cumulative[ends] - cumulative[starts]
+
+        result = {"id": ids, "innings": counts}
+        if table == "batting":
+            runs, balls = total("runs"), total("balls")
+            fours, sixes, not_outs = total("fours"), total("sixes"), total("not_outs")
+            outs = counts - not_outs
+            result.update(runs=runs, balls=balls, fours=fours, sixes=sixes, not_outs=not_outs,
+                          batting_average=_ratio(runs, outs),
+                          strike_rate=_ratio(runs, balls, 100.0),
+                          boundary_pct=_ratio(4 * fours + 6 * sixes, runs, 100.0))
+
+            # Form: runs per innings over each group's last `window` innings
+            cumulative = running("runs")
+            window_starts = np.maximum(starts, ends - window)
+            result["form"] = (cumulative[ends] - cumulative[window_starts]) / (ends - window_starts)
+        else:
+            balls, runs_conceded, wickets = total("balls"), total("runs_conceded"), total("wickets")
+            result.update(balls=balls, maidens=total("maidens"), runs_conceded=runs_conceded, wickets=wickets,
+                          economy=_ratio(runs_conceded, balls, 6.0),
+                          bowling_average=_ratio(runs_conceded, wickets),
+                          bowling_strike_rate=_ratio(balls, wickets))
+
+        self._tables[key] = result
+        return result
+
+    def leaderboard(self, metric, by="player", match_type_id=None, top=10,
+                    min_innings=STATS_MIN_INNINGS, window=STATS_FORM_WINDOW):
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r}, use one of {', '.join(METRICS)}")
+        table, ascending = METRICS[metric]
+        result = self.table(table, by, match_type_id, window)
+
+        # Groups without a value for the metric (NaN) are left off
+        values = result[metric].astype(float)
+        eligible = np.flatnonzero((result["innings"] >= min_innings) & ~np.isnan(values))
+        ranked = eligible[np.argsort(values[eligible] if ascending else -values[eligible], kind="stable")]
+
+        names = self.names[by]
+        rows = []
+        for i in ranked[:top]:
+            group_id = int(result["id"][i])
+            row = {f"{by}_id": group_id, "name": names.get(group_id)}
+            row.update((name, _value(column[i].item())) for name, column in result.items() if name != "id")
+            rows.append(row)
+        return rows
+
+    def form_series(self, player_id, window=STATS_FORM_WINDOW, match_type_id=None):
+        # Rolling runs per innings over a player's innings in match order
+        _check_window(window)
+        self.refresh()
+        cols = self._select("batting", match_type_id)
+        rows = np.flatnonzero(cols["player_id"] == player_id)
+        runs = cols["runs"][rows]
+
+        running = np.concatenate(([0], np.cumsum(runs)))
+        position = np.arange(1, len(runs) + 1)
+        window_starts = np.maximum(0, position - window)
+        rolling = (running[position] - running[window_starts]) / (position - window_starts)
+        return [
+            {"match_id": int(match_id), "runs": int(r), "form": round(float(f), 2)}
+            for match_id, r, f in zip(cols["match_id"][rows], runs, rolling)
+        ]
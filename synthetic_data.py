@@ -0,0 +1,300 @@
+# Synthetic match generator - produces scraper-shaped match JSON at any scale
+
+import json
+import random
+from datetime import date, timedelta
+
+from config import TEAM_ABBREVIATIONS
+
+
+FIRST_NAMES = [
+    "Aarav", "Ben", "Chris", "Dinesh", "Ethan", "Faheem", "Glenn", "Hasan", "Imran", "Jason",
+    "Kane", "Liam", "Mitchell", "Najib", "Oliver", "Pathum", "Quinton", "Rashid", "Shai", "Tom",
+    "Usman", "Virat", "Wanindu", "Yasir", "Zak"
+]
+LAST_NAMES = [
+    "Ahmed", "Brook", "Carey", "De Silva", "Edwards", "Fernando", "Green", "Hope", "Iqbal",
+    "Joseph", "Khan", "Latham", "Marsh", "Nabi", "Omar", "Patel", "Rahman", "Sharma", "Taylor",
+    "Umar", "Vettori", "Williams", "Yadav", "Zampa", "Mendis", "Santner", "Root", "Smith"
+]
+VENUES = [
+    "Wankhede Stadium, Mumbai", "Eden Gardens, Kolkata", "Melbourne Cricket Ground, Melbourne",
+    "Sydney Cricket Ground, Sydney", "Lord's, London", "The Oval, London", "Eden Park, Auckland",
+    "Newlands, Cape Town", "Gaddafi Stadium, Lahore", "R Premadasa Stadium, Colombo",
+    "Shere Bangla National Stadium, Dhaka", "Kensington Oval, Bridgetown", "Dubai International Stadium, Dubai",
+    "Harare Sports Club, Harare", "Malahide Cricket Club Ground, Dublin", "The Grange, Edinburgh"
+]
+# (match type, weight, overs per innings, innings per match)
+FORMATS = [("T20I", 50, 20, 2), ("ODI", 35, 50, 2), ("Test", 15, 90, 4)]
+DISMISSALS = ["c {f} b {b}", "b {b}", "lbw b {b}", "c & b {b}", "st {f} b {b}", "run out ({f})"]
+ORDINALS = {1: "st", 2: "nd", 3: "rd"}
+SYLLABLES = ["ra", "ka", "mo", "li", "to", "sen", "dar", "vi", "ne", "go", "han", "pu", "el", "si", "ba", "wen"]
+SQUAD_SIZE = 16
+
+
+def build_squads(rng):
+    squads = {}
+    for team_idx, team in enumerate(sorted(set(TEAM_ABBREVIATIONS.values()))):
+        name = team.upper() if len(team) <= 3 else team.title()
+        players, seen = [], set()
+        while len(players) < SQUAD_SIZE:
+            player = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            if player not in seen:
+                seen.add(player)
+                players.append({"name": player, "profile_id": 10000 + team_idx * 100 + len(players)})
+        squads[name] = players
+    return squads
+
+
+def _ordinal(n):
+    suffix = "th" if 10 <= n % 100 <= 20 else ORDINALS.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def _split_overs(rng, balls, bowlers, max_balls):
+    # Deal balls over by over so no bowler exceeds the format's quota
+    per_bowler = [0] * len(bowlers)
+    remaining = balls
+    idx = 0
+    while remaining > 0:
+        if per_bowler[idx] + 6 <= max_balls or all(b + 6 > max_balls for b in per_bowler):
+            over = min(6, remaining)
+            per_bowler[idx] += over
+            remaining -= over
+        idx = (idx + rng.randint(1, 2)) % len(bowlers)
+    return per_bowler
+
+
+def _balls_to_overs(balls):
+    return f"{balls // 6}.{balls % 6}" if balls % 6 else str(balls // 6)
+
+
+def generate_innings(rng, batting_xi, bowling_xi, overs_limit, innings_no, batting_team):
+    wickets = rng.choices(range(11), weights=[1, 1, 2, 3, 5, 6, 8, 9, 10, 9, 12])[0]
+    max_balls = overs_limit * 6
+    balls = max_balls if wickets < 10 else rng.randint(max_balls // 3, max_balls)
+    rate = {20: 8.2, 50: 5.6}.get(overs_limit, 3.3)
+    total = max(wickets * 3, int(rng.gauss(rate, 1.0) * balls / 6))
+    extras = rng.randint(0, max(1, total // 20))
+
+    batters_used = min(11, wickets + 2)
+    weights = [rng.random() ** 2 * (12 - pos) for pos in range(batters_used)]
+    scale = (total - extras) / sum(weights)
+    runs = [int(w * scale) for w in weights]
+    runs[0] += (total - extras) - sum(runs)
+
+    bowlers = bowling_xi[-rng.randint(5, 6):]
+    fielders = bowling_xi
+    batting = []
+    for pos in range(batters_used):
+        player = batting_xi[pos]["name"]
+        r = runs[pos]
+        b = max(1, int(r * rng.uniform(0.6, 1.6)))
+        out = pos < wickets
+        dismissal = rng.choice(DISMISSALS).format(
+            f=rng.choice(fielders)["name"].split()[-1], b=rng.choice(bowlers)["name"].split()[-1]
+        ) if out else "not out"
+        batting.append({
+            "batsman": player,
+            "dismissal": dismissal,
+            "runs": str(r),
+            "balls": str(b),
+            "fours": str(r // 9),
+            "sixes": str(r // 25),
+            "strike_rate": f"{100 * r / b:.2f}"
+        })
+
+    quota = max_balls // 5 if overs_limit <= 50 else max_balls
+    bowler_balls = _split_overs(rng, balls, bowlers, quota)
+    conceded_weights = [rng.uniform(0.5, 1.5) * nb for nb in bowler_balls]
+    conceded_total = sum(conceded_weights) or 1
+    wicket_split = [0] * len(bowlers)
+    for _ in range(sum(1 for e in batting if not e["dismissal"].startswith(("run out", "not out")))):
+        wicket_split[rng.randrange(len(bowlers))] += 1
+
+    bowling = []
+    for idx, bowler in enumerate(bowlers):
+        if not bowler_balls[idx]:
+            continue
+        conceded = int((total - extras) * conceded_weights[idx] / conceded_total)
+        bowling.append({
+            "bowler": bowler["name"],
+            "overs": _balls_to_overs(bowler_balls[idx]),
+            "maidens": str(rng.randint(0, 1 if overs_limit <= 50 else 6)),
+            "runs": str(conceded),
+            "wickets": str(wicket_split[idx]),
+            "economy": f"{6 * conceded / bowler_balls[idx]:.2f}"
+        })
+
+    return {
+        "innings": f"Innings {innings_no}",
+        "batting_team": batting_team,
+        "total_score": f"{total}/{wickets}",
+        "total_overs": _balls_to_overs(balls),
+        "extras": str(extras),
+        "batting": batting,
+        "bowling": bowling
+    }
+
+
+def generate_match(rng, squads, match_no, match_date):
+    team1, team2 = rng.sample(sorted(squads), 2)
+    match_type, _, overs_limit, innings_count = rng.choices(FORMATS, weights=[f[1] for f in FORMATS])[0]
+    xi = {team: rng.sample(squads[team], 11) for team in (team1, team2)}
+    title = f"{team1} vs {team2}, {_ordinal(match_no % 5 + 1)} {match_type}"
+    match_id = 100000 + match_no
+
+    scorecard = []
+    for inn in range(innings_count):
+        batting_team, bowling_team = (team1, team2) if inn % 2 == 0 else (team2, team1)
+        scorecard.append(generate_innings(
+            rng, xi[batting_team], xi[bowling_team], overs_limit, inn + 1, batting_team
+        ))
+
+    totals = {team1: 0, team2: 0}
+    for inn, innings in enumerate(scorecard):
+        totals[team1 if inn % 2 == 0 else team2] += int(innings["total_score"].split("/")[0])
+    winner = team1 if totals[team1] >= totals[team2] else team2
+    margin = abs(totals[team1] - totals[team2]) or 1
+    potm = max(
+        (e for inn in scorecard for e in inn["batting"] if any(p["name"] == e["batsman"] for p in xi[winner])),
+        key=lambda e: int(e["runs"])
+    )["batsman"]
+
+    def score_text(innings):
+        return f"{innings['total_score']} ({innings['total_overs']} Ov)"
+
+    slug = f"{team1}-vs-{team2}-{match_no}".lower().replace(" ", "-")
+    return {
+        "match_url": f"https://www.cricbuzz.com/live-cricket-scores/{match_id}/{slug}",
+        "match_title": title,
+        "match_info": {
+            "team1_name": team1,
+            "team1_score": score_text(scorecard[0]),
+            "team2_name": team2,
+            "team2_score": score_text(scorecard[1]),
+            "venue": rng.choice(VENUES),
+            "date": match_date.strftime("%A, %B %d, %Y"),
+            "toss": f"{rng.choice((team1, team2))} won the toss and opt to {rng.choice(('bat', 'bowl'))}",
+            "result": f"{winner} won by {margin} runs",
+            "winner": winner,
+            "player_of_match": potm,
+            "umpires": "A Umpire, B Umpire",
+            "match_referee": "C Referee"
+        },
+        "playing_11": {
+            "team1": {"name": team1, "players": [dict(p, designation="Player") for p in xi[team1]]},
+            "team2": {"name": team2, "players": [dict(p, designation="Player") for p in xi[team2]]}
+        },
+        "scorecard": scorecard
+    }
+
+
+def generate_commentary(match, seed=0):
+    # Ball-by-ball feed matching each innings' total, wickets and overs, in the
+    # shape parse_commentary_lines produces. Its own RNG keeps the match stream unchanged.
+    rng = random.Random(seed * 1000003 + int(match["match_url"].split("/")[-2]))
+    surnames = [p["name"].split()[-1] for team in match["playing_11"].values() for p in team["players"]]
+
+    def short(name):
+        # Commentary uses surnames unless two players in the match share one
+        surname = name.split()[-1]
+        return surname if surnames.count(surname) == 1 else name
+
+    deliveries = []
+    for inn_no, innings in enumerate(match["scorecard"], 1):
+        total, wickets = (int(x) for x in innings["total_score"].split("/"))
+        whole, _, part = innings["total_overs"].partition(".")
+        legal = int(whole) * 6 + int(part or 0)
+        extras = int(innings.get("extras", 0))
+        if not legal:
+            continue
+
+        out_balls = set(rng.sample(range(legal), min(wickets, legal)))
+        bat_runs = [0] * legal
+        remaining = total - extras
+        while remaining > 0:
+            shot = min(remaining, rng.choice((1, 1, 1, 2, 4, 4, 6)))
+            ball = rng.randrange(legal)
+            if ball not in out_balls and bat_runs[ball] + shot <= 6:
+                bat_runs[ball] += shot
+                remaining -= shot
+            elif all(b in out_balls or r >= 6 for b, r in enumerate(bat_runs)):
+                break
+        wides = {}
+        for _ in range(extras):
+            ball = rng.randrange(legal)
+            wides[ball] = wides.get(ball, 0) + 1
+
+        batters = [short(e["batsman"]) for e in innings["batting"]]
+        bowlers = [short(e["bowler"]) for e in innings["bowling"]]
+        striker, non_striker, next_in = 0, 1, 2
+        for ball in range(legal):
+            over, in_over = divmod(ball, 6)
+            bowler = bowlers[over % len(bowlers)]
+            for _ in range(wides.get(ball, 0)):
+                deliveries.append((inn_no, over, in_over + 1, bowler, batters[striker], 0, 1, 1, 0))
+            out = ball in out_balls
+            deliveries.append((inn_no, over, in_over + 1, bowler, batters[striker], bat_runs[ball], 0, 0, int(out)))
+            if out and next_in < len(batters):
+                striker, next_in = next_in, next_in + 1
+            if bat_runs[ball] % 2:
+                striker, non_striker = non_striker, striker
+            if in_over == 5:
+                striker, non_striker = non_striker, striker
+
+    feed, last = [], None
+    for innings, over, ball, bowler, batter, runs, extra, extra_type, wicket in deliveries:
+        seq = feed[-1]["seq"] + 1 if last == (innings, over) else 1
+        last = (innings, over)
+        feed.append({"innings": innings, "over": over, "ball": ball, "seq": seq, "bowler": bowler,
+                     "batter": batter, "runs": runs, "extras": extra, "extra_type": extra_type,
+                     "wicket": wicket})
+    return feed
+
+
+def generate_matches(count, seed=0, start=date(2015, 1, 1), commentary=False):
+    rng = random.Random(seed)
+    squads = build_squads(rng)
+    match_date = start
+    for match_no in range(count):
+        match_date += timedelta(days=rng.choice((0, 0, 1, 1, 2)))
+        match = generate_match(rng, squads, match_no, match_date)
+        if commentary:
+            match["commentary"] = generate_commentary(match, seed)
+        yield match
+
+
+def generate_player_names(count, seed=0):
+    # Unique made-up names for sizing the player dimension well past real squads
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        surname = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        names.add(f"{rng.choice(FIRST_NAMES)} {surname}")
+    return sorted(names)
+
+
+def synthetic_match(match_no, seed=0, start=date(2015, 1, 1)):
+    # Deterministic single match, used by the mock server to render pages on demand
+    squads = build_squads(random.Random(seed))
+    rng = random.Random(seed * 1000003 + match_no)
+    return generate_match(rng, squads, match_no, start + timedelta(days=match_no // 2))
+
+
+def write_synthetic_json(path, count, seed=0):
+    # Streams matches so very large files never sit fully in memory
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for idx, match in enumerate(generate_matches(count, seed)):
+            if idx:
+                f.write(",\n")
+            json.dump(match, f, ensure_ascii=False)
+        f.write("]\n")
+    print(f"Wrote {count:,} synthetic matches to {path}")
+
+
+if __name__ == "__main__":
+    import sys
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    write_synthetic_json(sys.argv[2] if len(sys.argv) > 2 else "synthetic_data.json", count)
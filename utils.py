@@ -38,6 +38,72 @@ def remove_markers(name):
                 .strip())
 
 
+def extract_profile_id(href):
+    if not href:
+        return None
+    match = re.search(r'/profiles/(\d+)', href)
+    return int(match.group(1)) if match else None
+
+
+def normalize_player_alias(name):
+    if not name:
+        return ""
+    return " ".join(remove_markers(name).replace(".", " ").lower().split())
+
+
+def normalize_team_alias(name):
+    # "U.A.E.", "Sri-Lanka" and " india " -> "uae", "sri lanka", "india"
+    return " ".join(re.sub(r"[^\w\s]", " ", (name or "").replace(".", "")).lower().split())
+
+
+def team_display_name(name):
+    # Short names are acronyms ("UAE", "USA"), everything else is title case
+    name = " ".join(name.split())
+    return name.upper() if len(name) <= 3 else name.title()
+
+
+class TeamIndex:
+    # Every known spelling of a team -> its canonical alias, so resolving a name
+    # is one dictionary lookup; names never seen resolve to their own alias
+
+    def __init__(self, abbreviations=None):
+        self._canonical = {}
+        for abbr, name in (abbreviations or {}).items():
+            self.add(name, name)
+            self.add(abbr, name)
+
+    def add(self, alias, name):
+        # The first spelling registered for an alias wins
+        alias = normalize_team_alias(alias)
+        if alias:
+            self._canonical.setdefault(alias, self.resolve(name))
+
+    def resolve(self, name):
+        alias = normalize_team_alias(name)
+        return self._canonical.get(alias, alias)
+
+    def display(self, name):
+        # Known teams are spelled from their canonical alias, others keep their punctuation
+        alias = normalize_team_alias(name)
+        return team_display_name(self._canonical.get(alias) or name or "")
+
+    def slots(self, team1_name, team2_name):
+        # Alias -> "team1" / "team2" for one match: each side's canonical alias, its
+        # first three letters and its initials, which covers "IND" and "HK" alike
+        slots = {}
+        for slot, name in (("team1", team1_name), ("team2", team2_name)):
+            alias = self.resolve(name)
+            if alias:
+                for key in (alias, alias[:3], "".join(word[0] for word in alias.split())):
+                    slots.setdefault(key, slot)
+        return slots
+
+
+def search_match_expression(text):
+    # Every word becomes a quoted prefix term, so "vir koh" finds "Virat Kohli"
+    return " ".join(f'"{term}"*' for term in re.findall(r"\w+", (text or "").lower()))
+
+
 def is_valid_player_name(name):
     if not name or len(name) < 3:
         return False
@@ -72,35 +138,6 @@ def is_numeric(text):
         return False
 
 
-def match_team_abbreviation(abbr, team1_name, team2_name, abbr_map):
-    abbr_lower = abbr.lower()
-    team1_lower = team1_name.lower()
-    team2_lower = team2_name.lower()
-    mapped_name = abbr_map.get(abbr_lower, abbr_lower)
-    
-    is_team1 = (
-        abbr_lower in team1_lower or 
-        team1_lower in abbr_lower or 
-        mapped_name in team1_lower or 
-        team1_lower in mapped_name or
-        abbr_lower == team1_lower[:3]
-    )
-    
-    is_team2 = (
-        abbr_lower in team2_lower or 
-        team2_lower in abbr_lower or
-        mapped_name in team2_lower or 
-        team2_lower in mapped_name or
-        abbr_lower == team2_lower[:3]
-    )
-    
-    if is_team1:
-        return 'team1'
-    elif is_team2:
-        return 'team2'
-    return None
-
-
 def extract_score_from_text(text):
     # Pattern: runs/wickets(overs)
     score_match = re.match(r'^(\d+)[/-](\d+)\s*\(([\d.]+)\)?', text)
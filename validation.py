@@ -0,0 +1,69 @@
+# Match validation - consistency checks run over each scraped match at load
+#
+# Every flag names the page (scraper section) its data came from, so a bad
+# scorecard is re-fetched on its own instead of re-running the whole match.
+
+from config import VALIDATION_XI_SIZE
+
+
+def _int(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _balls(overs):
+    # "48.2" overs -> 290 balls
+    whole, _, part = str(overs or "0").partition(".")
+    return (_int(whole) or 0) * 6 + (_int(part[:1]) or 0)
+
+
+def _team_size(team_data):
+    players = team_data.get("players", []) if isinstance(team_data, dict) else team_data
+    return len(players) if isinstance(players, list) else 0
+
+
+def validate_match(match):
+    # (section, check, innings number or team slot, detail) for each failed check;
+    # pages that were never fetched are left to missing_sections
+    flags = []
+    not_fetched = set(match.get("missing_sections") or []) | set(match.get("skipped_sections") or [])
+
+    if "scorecard" not in not_fetched:
+        for innings_no, innings in enumerate(match.get("scorecard") or [], 1):
+            flags += _check_innings(innings_no, innings)
+
+    playing_11 = match.get("playing_11") or {}
+    if "squads" not in not_fetched and playing_11:
+        for slot, team_key in ((1, "team1"), (2, "team2")):
+            size = _team_size(playing_11.get(team_key, {}))
+            if size != VALIDATION_XI_SIZE:
+                flags.append(("squads", "xi_size", slot, f"{size} players"))
+    return flags
+
+
+def _check_innings(innings_no, innings):
+    flags = []
+    total, _, wickets = str(innings.get("total_score") or "").partition("/")
+    total, wickets = _int(total), _int(wickets)
+    batting = innings.get("batting") or []
+    bowling = innings.get("bowling") or []
+
+    if total is not None:
+        batted = sum(_int(entry.get("runs")) or 0 for entry in batting)
+        extras = _int(innings.get("extras"))
+        # Older scrapes have no extras, so the batters alone may only fall short of the total
+        if (extras is not None and batted + extras != total) or (extras is None and batted > total):
+            flags.append(("scorecard", "batting_total", innings_no,
+                          f"batters {batted} + extras {extras if extras is not None else '?'} vs total {total}"))
+
+    if wickets is not None and len(batting) < min(11, wickets + 2):
+        flags.append(("scorecard", "batters", innings_no, f"{len(batting)} batters for {wickets} wickets"))
+
+    innings_balls = _balls(innings.get("total_overs"))
+    bowled = sum(_balls(entry.get("overs")) for entry in bowling)
+    if innings_balls and bowled != innings_balls:
+        flags.append(("scorecard", "bowling_overs", innings_no,
+                      f"bowlers {bowled} balls vs innings {innings_balls}"))
+    return flags
@@ -0,0 +1,420 @@
+# Warehouse query API - prepared analytical queries over the star schema
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from queue import Queue
+
+from config import DATABASE_FILE, QUERY_POOL_SIZE, QUERY_CACHE_SIZE, SEARCH_CANDIDATES
+from cricket_datawarehouse import SEARCH_KINDS, attach_shards, check_schema, read_shards, shard_schema
+from utils import normalize_player_alias, search_match_expression
+
+
+# Statements are kept as constants so every pooled connection reuses its
+# prepared statement cache instead of recompiling per call.
+QUERIES = {
+    "find_player": """
+        SELECT p.player_id, p.player_name, t.team_name
+        FROM dim_player_aliases a
+        JOIN dim_players p ON p.player_id = a.player_id
+        LEFT JOIN dim_teams t ON t.team_id = p.team_id
+        WHERE a.alias = ?
+    """,
+    "player": """
+        SELECT p.player_id, p.player_name, p.cricbuzz_id, p.team_id, t.team_name
+        FROM dim_players p
+        LEFT JOIN dim_teams t ON t.team_id = p.team_id
+        WHERE p.player_id = ?
+    """,
+    "team": "SELECT team_id, team_name FROM dim_teams WHERE team_id = ?",
+    "match": """
+        SELECT m.match_id, m.match_title, d.full_date, mt.match_type, v.full_venue AS venue,
+               m.team1_id, t1.team_name AS team1, m.team1_score,
+               m.team2_id, t2.team_name AS team2, m.team2_score,
+               m.winner_id, m.result, p.player_name AS player_of_match
+        FROM fact_matches m
+        LEFT JOIN dim_dates d ON d.date_id = m.date_id
+        LEFT JOIN dim_match_types mt ON mt.match_type_id = m.match_type_id
+        LEFT JOIN dim_venues v ON v.venue_id = m.venue_id
+        LEFT JOIN dim_teams t1 ON t1.team_id = m.team1_id
+        LEFT JOIN dim_teams t2 ON t2.team_id = m.team2_id
+        LEFT JOIN dim_players p ON p.player_id = m.potm_player_id
+        WHERE m.match_id = ?
+    """,
+    "match_batting": """
+        SELECT b.innings_number, b.batting_position, b.player_id, p.player_name,
+               b.runs, b.balls, b.fours, b.sixes, b.strike_rate, b.dismissal_type, b.is_not_out
+        FROM fact_batting b
+        JOIN dim_players p ON p.player_id = b.player_id
+        WHERE b.match_id = ?
+        ORDER BY b.innings_number, b.batting_position
+    """,
+    "match_bowling": """
+        SELECT w.innings_number, w.player_id, p.player_name,
+               w.overs, w.maidens, w.runs_conceded, w.wickets, w.economy
+        FROM fact_bowling w
+        JOIN dim_players p ON p.player_id = w.player_id
+        WHERE w.match_id = ?
+        ORDER BY w.innings_number, w.bowling_id
+    """,
+    "player_batting": """
+        SELECT COUNT(DISTINCT b.match_id) AS matches,
+               COUNT(*) AS innings,
+               SUM(b.runs) AS runs,
+               SUM(b.balls) AS balls,
+               MAX(b.runs) AS highest,
+               SUM(b.is_not_out) AS not_outs,
+               SUM(b.fours) AS fours,
+               SUM(b.sixes) AS sixes,
+               SUM(CASE WHEN b.runs >= 50 AND b.runs < 100 THEN 1 ELSE 0 END) AS fifties,
+               SUM(CASE WHEN b.runs >= 100 THEN 1 ELSE 0 END) AS hundreds
+        FROM fact_batting b
+        JOIN fact_matches m ON m.match_id = b.match_id
+        WHERE b.player_id = ? AND (? IS NULL OR m.match_type_id = ?)
+    """,
+    "player_bowling": """
+        SELECT COUNT(*) AS innings,
+               SUM(w.overs) AS overs,
+               SUM(CAST(w.overs AS INTEGER) * 6
+                   + ROUND((w.overs - CAST(w.overs AS INTEGER)) * 10)) AS balls,
+               SUM(w.maidens) AS maidens,
+               SUM(w.runs_conceded) AS runs_conceded,
+               SUM(w.wickets) AS wickets,
+               MAX(w.wickets) AS best_wickets
+        FROM fact_bowling w
+        JOIN fact_matches m ON m.match_id = w.match_id
+        WHERE w.player_id = ? AND (? IS NULL OR m.match_type_id = ?)
+    """,
+    "team_form": """
+        SELECT m.match_id, m.match_title, m.result,
+               CASE WHEN m.team1_id = ? THEN t2.team_name ELSE t1.team_name END AS opponent,
+               CASE WHEN m.winner_id = ? THEN 'W'
+                    WHEN m.winner_id IS NULL THEN 'NR'
+                    ELSE 'L' END AS outcome
+        FROM fact_matches m
+        LEFT JOIN dim_teams t1 ON t1.team_id = m.team1_id
+        LEFT JOIN dim_teams t2 ON t2.team_id = m.team2_id
+        WHERE m.team1_id = ? OR m.team2_id = ?
+        ORDER BY m.match_id DESC
+        LIMIT ?
+    """,
+    "venue_summary": """
+        SELECT v.venue_id, v.full_venue,
+               COUNT(m.match_id) AS matches,
+               MAX(MAX(COALESCE(m.team1_runs, 0), COALESCE(m.team2_runs, 0))) AS highest_total,
+               AVG(m.team1_runs) AS avg_first_innings
+        FROM dim_venues v
+        LEFT JOIN fact_matches m ON m.venue_id = v.venue_id
+        WHERE v.venue_id = ?
+        GROUP BY v.venue_id
+    """,
+    # {totals} is one indexed join and partial sum per partition, joined by UNION ALL;
+    # SQLite cannot push a join key into the UNION ALL views over closed seasons
+    "venue_top_batters": """
+        SELECT p.player_id, p.player_name, SUM(b.runs) AS runs, SUM(b.innings) AS innings
+        FROM ({totals}) b
+        JOIN dim_players p ON p.player_id = b.player_id
+        GROUP BY p.player_id
+        ORDER BY runs DESC
+        LIMIT ?
+    """,
+    "venue_top_batters_partition": """
+        SELECT b.player_id, SUM(b.runs) AS runs, COUNT(*) AS innings
+        FROM fact_matches m JOIN {schema}.fact_batting b ON b.match_id = m.match_id
+        WHERE m.venue_id = ?
+        GROUP BY b.player_id
+    """,
+    "matches_between": """
+        SELECT m.match_id, d.full_date, d.season, m.match_title, m.result, m.winner_id
+        FROM fact_matches m
+        JOIN dim_dates d ON d.date_id = m.date_id
+        WHERE m.date_id BETWEEN ? AND ? AND (? IS NULL OR m.team1_id = ? OR m.team2_id = ?)
+        ORDER BY m.date_id, m.match_id
+    """,
+    "head_to_head": """
+        SELECT m.match_id, m.match_title, m.result, m.winner_id,
+               m.team1_score, m.team2_score
+        FROM fact_matches m
+        WHERE (m.team1_id = ? AND m.team2_id = ?) OR (m.team1_id = ? AND m.team2_id = ?)
+        ORDER BY m.match_id DESC
+    """,
+    # bm25 costs a few microseconds per hit, so a one-letter prefix over tens of
+    # thousands of names ranks only the first candidates
+    "search": """
+        SELECT search_id, name FROM (
+            SELECT rowid AS search_id, name, rank FROM search_index
+            WHERE search_index MATCH ? AND (? IS NULL OR rowid % ? = ?)
+            LIMIT ?
+        )
+        ORDER BY rank
+        LIMIT ?
+    """,
+    "top_batters_between": """
+        SELECT p.player_id, p.player_name, SUM(b.runs) AS runs, SUM(b.innings) AS innings
+        FROM ({totals}) b
+        JOIN dim_players p ON p.player_id = b.player_id
+        GROUP BY p.player_id
+        ORDER BY runs DESC
+        LIMIT ?
+    """,
+    "top_batters_between_partition": """
+        SELECT b.player_id, SUM(b.runs) AS runs, COUNT(*) AS innings
+        FROM fact_matches m JOIN {schema}.fact_batting b ON b.match_id = m.match_id
+        WHERE m.date_id BETWEEN ? AND ?
+        GROUP BY b.player_id
+    """,
+    "version": "SELECT COALESCE(MAX(load_id), 0) FROM etl_loads"
+}
+
+SEARCH_KIND_NAMES = {code: kind for kind, code in SEARCH_KINDS.items()}
+
+
+def _date_id(value):
+    value = date.fromisoformat(value) if isinstance(value, str) else value
+    return value.year * 10000 + value.month * 100 + value.day
+
+
+class ConnectionPool:
+
+    def __init__(self, db_path, size=QUERY_POOL_SIZE):
+        self.db_path = db_path
+        self.uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        self.size = size
+        self.shards = None
+        self._generation = 0
+        self._idle = Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # Closed seasons are attached to every connection, behind views named like the tables
+        conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        attach_shards(conn, self.db_path, self.shards)
+        return conn
+
+    def update_shards(self, conn):
+        # Connections opened before a season was closed are reopened on their next use
+        shards = read_shards(conn)
+        with self._lock:
+            if shards != self.shards:
+                self.shards = shards
+                self._generation += 1
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            if self._idle.empty() and self._created < self.size:
+                self._created += 1
+                self._idle.put((self._generation, self._open()))
+        generation, conn = self._idle.get()
+        if generation != self._generation:
+            conn.close()
+            generation, conn = self._generation, self._open()
+        try:
+            yield conn
+        finally:
+            self._idle.put((generation, conn))
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get()[1].close()
+        self._created = 0
+
+
+class ResultCache:
+
+    def __init__(self, max_size=QUERY_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class WarehouseQueries:
+
+    def __init__(self, warehouse=None, db_path=DATABASE_FILE,
+                 pool_size=QUERY_POOL_SIZE, cache_size=QUERY_CACHE_SIZE):
+        self.db_path = warehouse.db_path if warehouse else db_path
+        self.pool = ConnectionPool(self.db_path, pool_size)
+        self.cache = ResultCache(cache_size)
+        self.version = None
+        self._data_version = None
+        self._watcher = None
+        self._watch_lock = threading.Lock()
+
+    def close(self):
+        self.pool.close()
+        if self._watcher:
+            self._watcher.close()
+            self._watcher = None
+
+    def check_version(self):
+        # PRAGMA data_version only moves when another connection commits,
+        # so the etl_loads lookup runs once per external write.
+        with self._watch_lock:
+            if self._watcher is None:
+                self._watcher = sqlite3.connect(self.pool.uri, uri=True, check_same_thread=False)
+            data_version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                # Raises OutdatedWarehouseError until a load upgrades the file
+                check_schema(self._watcher)
+                self._data_version = data_version
+                try:
+                    version = self._watcher.execute(QUERIES["version"]).fetchone()[0]
+                except sqlite3.OperationalError:
+                    version = 0
+                if version != self.version:
+                    self.version = version
+                    self.cache.clear()
+                    self.pool.update_shards(self._watcher)
+            return self.version
+
+    def _run(self, name, params, one=False, sql=None):
+        self.check_version()
+        key = (name, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql or QUERIES[name], params).fetchall()
+
+        result = [dict(row) for row in rows]
+        if one:
+            result = result[0] if result else None
+        self.cache.put(key, result)
+        return result
+
+    def find_player(self, name):
+        return self._run("find_player", (normalize_player_alias(name),))
+
+    def search(self, text, kind=None, limit=10):
+        # Ranked prefix search over player, team, venue and match names
+        if kind is not None and kind not in SEARCH_KINDS:
+            raise ValueError(f"unknown kind {kind!r}, use one of {', '.join(SEARCH_KINDS)}")
+        expression = search_match_expression(text)
+        if not expression:
+            return []
+        code = SEARCH_KINDS.get(kind)
+        rows = self._run("search", (expression, code, len(SEARCH_KINDS), code, SEARCH_CANDIDATES, limit))
+        return [
+            {"kind": SEARCH_KIND_NAMES[row["search_id"] % len(SEARCH_KINDS)],
+             "id": row["search_id"] // len(SEARCH_KINDS), "name": row["name"]}
+            for row in rows
+        ]
+
+    def match(self, match_id):
+        # Match facts with the scorecard grouped by innings
+        match = self._run("match", (match_id,), one=True)
+        if match is None:
+            return None
+        innings = {}
+        for section in ("batting", "bowling"):
+            for row in self._run(f"match_{section}", (match_id,)):
+                entry = innings.setdefault(row["innings_number"], {"innings": row["innings_number"],
+                                                                   "batting": [], "bowling": []})
+                entry[section].append({k: v for k, v in row.items() if k != "innings_number"})
+        return dict(match, scorecard=[innings[n] for n in sorted(innings, key=lambda n: n or 0)])
+
+    def player(self, player_id, match_type_id=None):
+        profile = self._run("player", (player_id,), one=True)
+        if profile is None:
+            return None
+        return dict(profile, **self.player_career(player_id, match_type_id))
+
+    def team(self, team_id, last_n=10):
+        team = self._run("team", (team_id,), one=True)
+        if team is None:
+            return None
+        return dict(team, form=self.team_form(team_id, last_n))
+
+    def player_career(self, player_id, match_type_id=None):
+        batting = self._run("player_batting", (player_id, match_type_id, match_type_id), one=True)
+        bowling = self._run("player_bowling", (player_id, match_type_id, match_type_id), one=True)
+
+        dismissals = (batting["innings"] or 0) - (batting["not_outs"] or 0)
+        balls_bowled = bowling["balls"]
+        return {
+            "player_id": player_id,
+            "batting": dict(
+                batting,
+                average=round(batting["runs"] / dismissals, 2) if dismissals and batting["runs"] else None,
+                strike_rate=round(100 * batting["runs"] / batting["balls"], 2) if batting["balls"] else None
+            ),
+            "bowling": dict(
+                bowling,
+                economy=round(6 * bowling["runs_conceded"] / balls_bowled, 2) if balls_bowled else None,
+                average=round(bowling["runs_conceded"] / bowling["wickets"], 2) if bowling["wickets"] else None
+            )
+        }
+
+    def team_form(self, team_id, last_n=10):
+        return self._run("team_form", (team_id, team_id, team_id, team_id, last_n))
+
+    def venue_records(self, venue_id, top_n=5):
+        summary = self._run("venue_summary", (venue_id,), one=True)
+        if summary is None:
+            return None
+        top_batters = self._run_partitioned("venue_top_batters", self._partitions(), (venue_id,), (top_n,))
+        return dict(summary, top_batters=top_batters)
+
+    def matches_between(self, start, end, team_id=None):
+        # start and end are dates or ISO strings, both inclusive
+        start_id, end_id = (_date_id(d) for d in (start, end))
+        return self._run("matches_between", (start_id, end_id, team_id, team_id, team_id))
+
+    def _partitions(self, start_id=None, end_id=None):
+        # main, plus the closed seasons whose dates overlap the range (all without one)
+        self.check_version()
+        return ["main"] + [shard_schema(first_year) for first_year, _, first, last in self.pool.shards or []
+                           if start_id is None or (first <= end_id and last >= start_id)]
+
+    def _run_partitioned(self, name, schemas, params, tail):
+        # `params` bind each partition's sub-query, `tail` the outer query
+        totals = " UNION ALL ".join(QUERIES[f"{name}_partition"].format(schema=schema) for schema in schemas)
+        return self._run(name, params * len(schemas) + tail, sql=QUERIES[name].format(totals=totals))
+
+    def top_batters_between(self, start, end, top_n=10):
+        # Run scorers between two dates, reading only the partitions those dates fall in
+        start_id, end_id = (_date_id(d) for d in (start, end))
+        return self._run_partitioned("top_batters_between", self._partitions(start_id, end_id),
+                                     (start_id, end_id), (top_n,))
+
+    def head_to_head(self, team_a, team_b):
+        matches = self._run("head_to_head", (team_a, team_b, team_b, team_a))
+        wins_a = sum(1 for m in matches if m["winner_id"] == team_a)
+        wins_b = sum(1 for m in matches if m["winner_id"] == team_b)
+        return {
+            "team_a": team_a,
+            "team_b": team_b,
+            "matches": len(matches),
+            "team_a_wins": wins_a,
+            "team_b_wins": wins_b,
+            "no_result": len(matches) - wins_a - wins_b,
+            "recent": matches[:5]
+        }
@@ -0,0 +1,160 @@
+# Scrape work queue - leased match URLs shared by scraper processes
+#
+# Workers lease a URL, renew the lease with heartbeats while scraping, and
+# complete it with the scraped match. A lease that is not renewed expires and
+# the URL goes back to the queue. A completion is only accepted from the
+# current lease holder, so every match is recorded exactly once. The backend is
+# SQLite; another store only needs the same public methods.
+
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import QUEUE_FILE, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS
+
+
+class Lease:
+    __slots__ = ("job", "url", "token", "attempt")
+
+    def __init__(self, job, url, token, attempt):
+        self.job = job
+        self.url = url
+        self.token = token
+        self.attempt = attempt
+
+
+class WorkQueue:
+
+    def __init__(self, db_path=QUEUE_FILE, lease_seconds=QUEUE_LEASE_SECONDS, max_attempts=QUEUE_MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scrape_jobs (
+                    job TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_token TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    result TEXT,
+                    enqueued_at REAL,
+                    completed_at REAL,
+                    PRIMARY KEY (job, url)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON scrape_jobs(job, status, lease_expires)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the queue safe across threads and processes
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, urls, job="default"):
+        now = time.time()
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO scrape_jobs (job, url, enqueued_at) VALUES (?, ?, ?)",
+                [(job, url, now) for url in urls]
+            )
+            return conn.total_changes - before
+
+    def lease(self, worker, job="default"):
+        # BEGIN IMMEDIATE takes the write lock first, so two workers never claim the same row
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("""
+                    SELECT url, attempts FROM scrape_jobs
+                    WHERE job = ? AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))
+                    ORDER BY status DESC, enqueued_at
+                    LIMIT 1
+                """, (job, now)).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                url, attempts = row
+                if attempts >= self.max_attempts:
+                    conn.execute("""
+                        UPDATE scrape_jobs SET status = 'failed', lease_token = NULL,
+                            error = COALESCE(error, 'lease expired')
+                        WHERE job = ? AND url = ?
+                    """, (job, url))
+                    conn.execute("COMMIT")
+                    return self.lease(worker, job)
+
+                token = uuid.uuid4().hex
+                conn.execute("""
+                    UPDATE scrape_jobs SET status = 'leased', worker = ?, lease_token = ?,
+                        lease_expires = ?, attempts = attempts + 1
+                    WHERE job = ? AND url = ?
+                """, (worker, token, now + self.lease_seconds, job, url))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return Lease(job, url, token, attempts + 1)
+
+    def heartbeat(self, lease):
+        # False once the lease has been lost to another worker
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE scrape_jobs SET lease_expires = ?
+                WHERE job = ? AND url = ? AND status = 'leased' AND lease_token = ?
+            """, (time.time() + self.lease_seconds, lease.job, lease.url, lease.token))
+            return cursor.rowcount == 1
+
+    def complete(self, lease, result):
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE scrape_jobs SET status = 'done', lease_token = NULL, result = ?, error = NULL,
+                    completed_at = ?
+                WHERE job = ? AND url = ? AND status = 'leased' AND lease_token = ?
+            """, (json.dumps(result, ensure_ascii=False), time.time(), lease.job, lease.url, lease.token))
+            return cursor.rowcount == 1
+
+    def fail(self, lease, error):
+        # Back to the queue until max_attempts, then parked as failed
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE scrape_jobs
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    lease_token = NULL, lease_expires = NULL, error = ?
+                WHERE job = ? AND url = ? AND status = 'leased' AND lease_token = ?
+            """, (self.max_attempts, str(error)[:200], lease.job, lease.url, lease.token))
+            return cursor.rowcount == 1
+
+    def requeue_failed(self, job="default"):
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE scrape_jobs SET status = 'pending', attempts = 0, error = NULL
+                WHERE job = ? AND status = 'failed'
+            """, (job,))
+            return cursor.rowcount
+
+    def status(self, job="default"):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM scrape_jobs WHERE job = ? GROUP BY status", (job,)
+            ).fetchall()
+        return dict(rows)
+
+    def results(self, job="default"):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT result FROM scrape_jobs WHERE job = ? AND status = 'done' ORDER BY completed_at", (job,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]